@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Benchmark CompletePaperProcessor.format_paper_with_enhanced_info against the
+previous implementation (per-command re.sub passes, strptime per entry and +=
+assembly). The legacy code below is the reference: the benchmark
+fails if any rendered entry differs.
+
+    python benchmarks/bench_format_paper.py --papers 20000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from get_daily_arxiv_paper import CompletePaperProcessor
+from mdx_text import render_title
+from benchmarks.synthetic_docs import WORDS
+
+LATEX_SNIPPETS = ("\\textit{Fast}", "\\textbf{KV} Cache", "\\texttt{vLLM}", "\\emph{Sparse}", "\\underline{Go}",
+                  "\\alpha-Net", "\\mathcal{O}(n)", "\\textbf{\\textit{Nested}}", "<10ms", "{Braces}")
+
+
+def legacy_clean_latex_in_title(title):
+    if not title:
+        return title
+    title = re.sub(r'\\textit\{([^}]+)\}', r'*\1*', title)
+    title = re.sub(r'\\textbf\{([^}]+)\}', r'**\1**', title)
+    title = re.sub(r'\\texttt\{([^}]+)\}', r'`\1`', title)
+    title = re.sub(r'\\emph\{([^}]+)\}', r'*\1*', title)
+    title = re.sub(r'\\text\{([^}]+)\}', r'\1', title)
+    title = re.sub(r'\\textsc\{([^}]+)\}', r'\1', title)
+    title = re.sub(r'\\underline\{([^}]+)\}', r'<u>\1</u>', title)
+    title = re.sub(r'\\uline\{([^}]+)\}', r'<u>\1</u>', title)
+    title = re.sub(r'\\uuline\{([^}]+)\}', r'<u>\1</u>', title)
+    title = re.sub(r'\\uwave\{([^}]+)\}', r'<u>\1</u>', title)
+    title = re.sub(r'\\sout\{([^}]+)\}', r'~~\1~~', title)
+
+    def remove_latex_command(match):
+        return match.group(2) if match.lastindex >= 2 else ''
+    title = re.sub(r'\\([a-zA-Z]+)\{([^}]+)\}', remove_latex_command, title)
+    title = re.sub(r'\\([a-zA-Z]+)(?![a-zA-Z{])', '', title)
+    return title
+
+
+def legacy_escape_mdx(text):
+    if not text:
+        return text
+    text = text.replace('{', '\\{').replace('}', '\\}')
+    text = text.replace('<', '&lt;').replace('>', '&gt;')
+    return text
+
+
+def legacy_arxiv_prefix(date_str):
+    try:
+        dt = datetime.strptime(date_str, '%Y-%m-%d')
+        return f"[arXiv{str(dt.year)[-2:]}{dt.month:02d}{dt.day:02d}]"
+    except Exception:
+        return ""
+
+
+def legacy_format(paper, date_str=None):
+    title = legacy_escape_mdx(legacy_clean_latex_in_title(paper.get('title', 'N/A')))
+    arxiv_prefix = legacy_arxiv_prefix(date_str) if date_str is not None else ""
+    authors = legacy_escape_mdx(', '.join(paper.get('authors', [])))
+    pdf_link = paper.get('pdf_link', 'N/A')
+    tags = []
+    if paper.get('tag1'):
+        tags.append("[" + legacy_escape_mdx(paper['tag1']) + "]")
+    if paper.get('tag2'):
+        tags.append("[" + legacy_escape_mdx(paper['tag2']) + "]")
+    if paper.get('tag3'):
+        tag3_items = [t.strip() for t in paper['tag3'].split(',') if t.strip()]
+        if tag3_items:
+            tags.append('[' + ', '.join([legacy_escape_mdx(t) for t in tag3_items]) + ']')
+    tags_str = ', '.join(tags) if tags else 'TBD'
+    institution = legacy_escape_mdx(paper.get('institution', 'TBD'))
+    code = paper.get('code', 'None')
+    if code and code.lower() != 'none':
+        code = legacy_escape_mdx(code)
+    contributions = paper.get('contributions', '')
+    if contributions:
+        contributions = legacy_escape_mdx(contributions)
+    mermaid = paper.get('mermaid', '')
+    llm_summary = paper.get('llm_summary', '').strip()
+    formatted_text = f"""- **{arxiv_prefix} {title}**
+  - **tags:** {tags_str}
+  - **authors:** {authors}
+  - **institution:** {institution}
+  - **link:** {pdf_link}
+"""
+    if code and code.lower() != 'none':
+        formatted_text += f"  - **code:** {code}\n"
+    if contributions:
+        formatted_text += f"  - **contributions:** {contributions}\n"
+    thumb = paper.get('thumbnail')
+    if thumb:
+        formatted_text += f"  - **thumbnail:** {thumb}\n"
+    if llm_summary:
+        formatted_text += f"  - **Simple LLM Summary:** {legacy_escape_mdx(llm_summary)}\n"
+    if mermaid:
+        mermaid_block = "  - **Mindmap:**\n\n"
+        indented_mermaid = '\n'.join(['    ' + line for line in mermaid.split('\n')])
+        mermaid_block += f"    ```mermaid\n{indented_mermaid}\n    ```\n"
+        formatted_text += mermaid_block
+    formatted_text += "\n"
+    return formatted_text
+
+
+def make_papers(n, latex_ratio, seed=0):
+    rng = random.Random(seed)
+
+    def words(k):
+        return " ".join(rng.choice(WORDS) for _ in range(k))
+    papers = []
+    for i in range(n):
+        title = words(8).title()
+        if rng.random() < latex_ratio:
+            title += " " + rng.choice(LATEX_SNIPPETS)
+        papers.append({
+            "title": title,
+            "authors": [words(2).title() for _ in range(rng.randint(1, 8))],
+            "pdf_link": f"https://arxiv.org/pdf/2510.{i:05d}",
+            "tag1": "mlsys", "tag2": "llm inference", "tag3": f"{words(1)}, {words(2)}",
+            "institution": f"{words(2).title()} University",
+            "code": rng.choice(["None", f"https://github.com/example/{i}"]),
+            "contributions": f"1. {words(12)} <2x. 2. {words(12)} {{fast}}.",
+            "thumbnail": rng.choice([None, f"https://pub.example.r2.dev/thumbnails/{i:032x}.webp"]),
+            "llm_summary": words(40) + ".",
+            "mermaid": 'graph TB\n    A["Root"] --> B["Problem"]\n    A --> C[Method]',
+        })
+    return papers
+
+
+def run(fn, papers, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for paper in papers:
+            fn(paper)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--papers", type=int, default=20000)
+    ap.add_argument("--latex-ratio", type=float, default=0.1, help="Share of titles containing LaTeX / MDX syntax")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        processor = CompletePaperProcessor(docs_daily_path=os.path.join(tmp, "docs"),
+                                           temp_dir=os.path.join(tmp, "pdfs"), enable_llm=False)
+        papers = make_papers(args.papers, args.latex_ratio)
+        date_str = "2025-10-28"
+        for paper in papers:
+            assert processor.format_paper_with_enhanced_info(paper, date_str) == legacy_format(paper, date_str)
+
+        titles = [p["title"] for p in papers]
+        legacy_titles = run(lambda t: legacy_escape_mdx(legacy_clean_latex_in_title(t)), titles, args.repeat)
+        new_titles = run(render_title, titles, args.repeat)
+        legacy = run(lambda p: legacy_format(p, date_str), papers, args.repeat)
+        new = run(lambda p: processor.format_paper_with_enhanced_info(p, date_str), papers, args.repeat)
+
+    n = len(papers)
+    print(f"{n} entries, {args.latex_ratio:.0%} with LaTeX/MDX titles (outputs identical)")
+    print(f"title legacy : {n / legacy_titles:>12,.0f} titles/s")
+    print(f"title single : {n / new_titles:>12,.0f} titles/s  ({legacy_titles / new_titles:.1f}x)")
+    print(f"entry legacy : {n / legacy:>12,.0f} entries/s")
+    print(f"entry new    : {n / new:>12,.0f} entries/s  ({legacy / new:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Offline write-throughput benchmark for paper_store backends.
+
+Examples:
+    python benchmarks/bench_paper_store.py --rows 20000
+    python benchmarks/bench_paper_store.py --store postgresql://localhost/papers_bench
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from paper_store import open_store
+
+
+def make_rows(n, offset=0):
+    rows = []
+    for i in range(offset, offset + n):
+        rows.append({
+            "category_slug": f"cs_{'AI' if i % 2 else 'DC'}",
+            "title": f"Synthetic paper {i}",
+            "published_date": f"2025-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}",
+            "authors": "Alice, Bob, Carol",
+            "institution": "Example University",
+            "link": f"http://arxiv.org/abs/2511.{i:05d}",
+            "code_url": None,
+            "thumbnail_url": None,
+            "summary": "A short summary sentence. " * 4,
+            "contributions": "1. First. 2. Second. 3. Third.",
+            "mindmap": "graph TB\n    A --> B",
+            "tags": ["llm inference", "kv cache", "scheduling"],
+        })
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--store", default=None, help="Store URL (default: temporary sqlite file)")
+    ap.add_argument("--rows", type=int, default=10000)
+    ap.add_argument("--batch-size", type=int, default=500)
+    args = ap.parse_args()
+
+    tmp = None
+    url = args.store
+    if not url:
+        tmp = tempfile.mkdtemp()
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+
+    store = open_store(url)
+    rows = make_rows(args.rows)
+    for label in ("insert", "update"):
+        start = time.perf_counter()
+        for i in range(0, len(rows), args.batch_size):
+            store.upsert(rows[i:i + args.batch_size])
+        elapsed = time.perf_counter() - start
+        print(f"{store.name} {label}: {len(rows)} rows in {elapsed:.3f}s "
+              f"({len(rows) / elapsed:,.0f} rows/s, batch={args.batch_size})")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
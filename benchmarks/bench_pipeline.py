@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Offline end-to-end benchmark for CompletePaperProcessor.process_papers_by_date.
+
+Nothing leaves the machine: the cs/new listing is generated, PDFs come from a
+cached synthetic corpus served over local HTTP, the LLM is a mock
+OpenAI-compatible endpoint with configurable latency, R2 uploads go to a
+local S3 PUT stand-in and papers are upserted into a throwaway SQLite store.
+
+Each --workers setting runs in a fresh subprocess (clean RSS, clean imports)
+inside its own working directory, so arxiv_date.txt, docs/ and temp_pdfs/
+of the repo are never touched (--keep leaves those directories, including
+pipeline.log, for inspection).
+
+Examples:
+    python benchmarks/bench_pipeline.py --papers 40 --workers 1,4,10
+    python benchmarks/bench_pipeline.py --llm-latency 1.0 --no-thumbnails --report bench.json
+    python benchmarks/bench_pipeline.py --workers 4 --profile .cache/bench_pipeline/profile
+"""
+import argparse
+import contextlib
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from benchmarks.pipeline_fixtures import MockServices, ensure_pdf_corpus, make_listing
+from sampling_profiler import merge_folded, format_folded, write_speedscope, stage_totals
+
+DEFAULT_CORPUS_DIR = os.path.join(ROOT_DIR, ".cache", "bench_pipeline", "pdfs")
+RUN_DATE = "2025-10-28"
+SHOWN_STAGES = ("paper", "download", "extract_text", "llm", "thumbnail.union_caption", "thumbnail.caption",
+                "thumbnail.largest_image", "thumbnail.best_page", "encode", "r2_upload", "upsert")
+
+
+def run_worker(args):
+    """Child process: run one day end to end and write the metrics report."""
+    os.chdir(args.workdir)
+    import get_daily_arxiv_paper as pipeline
+    from pipeline_metrics import PipelineMetrics
+    from sampling_profiler import SamplingProfiler
+
+    with open(args.listing, "rb") as f:
+        html_content = f.read()
+    metrics = PipelineMetrics()
+    processor = pipeline.CompletePaperProcessor(enable_thumbnails=args.thumbnails, enable_llm=True,
+                                                journal_path=None, metrics=metrics)
+    profiler = SamplingProfiler() if args.profile else None
+    start = time.perf_counter()
+    with open(os.path.join(args.workdir, "pipeline.log"), "w") as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log), \
+            (profiler or contextlib.nullcontext()):
+        processor.process_papers_by_date(target_date=RUN_DATE, max_workers=args.run_workers, max_papers=None,
+                                         html_content=html_content)
+    elapsed = time.perf_counter() - start
+    if profiler:
+        profiler.write(os.path.join(args.profile, f"w{args.run_workers}"), name=f"max_workers={args.run_workers}")
+    papers = metrics.summary().get("paper", {}).get("count", 0)
+    metrics.write_report(args.out, max_workers=args.run_workers, papers=papers, seconds=round(elapsed, 3),
+                         papers_per_second=round(papers / elapsed, 3) if elapsed else None,
+                         # Linux 上 ru_maxrss 以 KB 计
+                         peak_rss_bytes=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)
+
+
+def run_setting(args, services, listing_path, workers):
+    workdir = tempfile.mkdtemp(prefix=f"bench_pipeline_w{workers}_")
+    out = os.path.join(workdir, "report.json")
+    env = dict(os.environ, **services.env(), PAPER_STORE_URL=f"sqlite:///{os.path.join(workdir, 'papers.db')}")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (ROOT_DIR, env.get("PYTHONPATH"))))
+    cmd = [sys.executable, os.path.abspath(__file__), "--worker", "--workdir", workdir, "--listing", listing_path,
+           "--run-workers", str(workers), "--out", out]
+    if not args.thumbnails:
+        cmd.append("--no-thumbnails")
+    if args.profile:
+        cmd += ["--profile", os.path.abspath(args.profile)]
+    subprocess.run(cmd, env=env, check=True)
+    with open(out) as f:
+        report = json.load(f)
+    if args.keep:
+        report["workdir"] = workdir
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def print_report(report):
+    print(f"\nmax_workers={report['max_workers']}: {report['papers']} papers in {report['seconds']:.2f}s "
+          f"-> {report['papers_per_second']:.2f} papers/s, peak RSS {report['peak_rss_bytes'] / 2 ** 20:.0f} MiB")
+    print(f"  {'stage':<26}{'count':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'total s':>10}")
+    stages = report["stages"]
+    for name in SHOWN_STAGES:
+        stats = stages.get(name)
+        if not stats or not stats["count"]:
+            continue
+        print(f"  {name:<26}{stats['count']:>6}{stats['errors']:>5}{stats['p50'] * 1000:>10.1f}"
+              f"{stats['p95'] * 1000:>10.1f}{stats['p99'] * 1000:>10.1f}{stats['total_seconds']:>10.2f}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--papers", type=int, default=30)
+    ap.add_argument("--workers", default="1,4,10", help="Comma-separated max_workers settings")
+    ap.add_argument("--pages", type=int, default=6, help="Pages per synthetic PDF")
+    ap.add_argument("--llm-latency", type=float, default=0.2, help="Mock LLM response delay in seconds")
+    ap.add_argument("--download-latency", type=float, default=0.02, help="Mock PDF download delay in seconds")
+    ap.add_argument("--no-thumbnails", dest="thumbnails", action="store_false")
+    ap.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR, help="Where generated PDFs are cached")
+    ap.add_argument("--report", default=None, help="Write all run reports to this JSON file")
+    ap.add_argument("--keep", action="store_true", help="Keep per-run working directories")
+    ap.add_argument("--profile", default=None,
+                    help="Sample stacks in every run; writes w<N>.folded/.speedscope.json and merged all.* here")
+    # internal: child process mode
+    ap.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    ap.add_argument("--workdir", help=argparse.SUPPRESS)
+    ap.add_argument("--listing", help=argparse.SUPPRESS)
+    ap.add_argument("--run-workers", type=int, help=argparse.SUPPRESS)
+    ap.add_argument("--out", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    start = time.perf_counter()
+    pdfs = ensure_pdf_corpus(args.corpus_dir, args.papers, pages=args.pages)
+    print(f"PDF corpus: {len(pdfs)} files ({sum(map(len, pdfs.values())) / 2 ** 20:.1f} MiB) "
+          f"ready in {time.perf_counter() - start:.1f}s")
+
+    reports = []
+    with MockServices(pdfs, llm_latency=args.llm_latency, download_latency=args.download_latency) as services, \
+            tempfile.TemporaryDirectory(prefix="bench_pipeline_") as tmp:
+        listing_path = os.path.join(tmp, "cs_new.html")
+        with open(listing_path, "wb") as f:
+            f.write(make_listing(args.papers, f"{services.base_url}/pdf"))
+        for workers in [int(w) for w in args.workers.split(",") if w.strip()]:
+            report = run_setting(args, services, listing_path, workers)
+            print_report(report)
+            reports.append(report)
+        print(f"\nmock services: {services.counts}")
+
+    if args.profile:
+        inputs = [os.path.join(args.profile, f"w{r['max_workers']}.folded") for r in reports]
+        samples = merge_folded(inputs)
+        with open(os.path.join(args.profile, "all.folded"), "w") as f:
+            f.write(format_folded(samples))
+        write_speedscope(samples, os.path.join(args.profile, "all.speedscope.json"), name="all runs")
+        print(f"\nprofile merged from {len(inputs)} runs into {args.profile}/all.folded; samples by stage:")
+        for stage, count in stage_totals(samples):
+            print(f"  {stage:<28}{count:>8}")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"papers": args.papers, "llm_latency": args.llm_latency, "thumbnails": args.thumbnails,
+                       "runs": reports}, f, indent=2)
+        print(f"report written to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
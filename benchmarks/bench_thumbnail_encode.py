@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Encode time and size of every thumbnail profile (thumbnail_profiles.py)
+against the previous fixed encoder (WEBP quality=70, method=6, 640px).
+
+Fixtures are the figure regions the pipeline crops from the synthetic PDF
+corpus (raster figure, bar chart, line plot, first page), rendered directly
+at each profile's width as process_single_paper does, plus any extra images
+given with --images (for example tmp_extract/*.png from
+test_pdf_image_extract.py), downscaled to the profile width first.
+
+    python benchmarks/bench_thumbnail_encode.py --papers 4 --images 'tmp_extract/*.png'
+"""
+import argparse
+import glob
+import io
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+import fitz
+from PIL import Image
+from pdf_figures import PdfScan
+from thumbnail_profiles import THUMBNAIL_PROFILES, ThumbnailProfile, encode_image, profile_supported
+from benchmarks.pipeline_fixtures import ensure_pdf_corpus, pdf_corpus_path
+
+DEFAULT_CORPUS_DIR = os.path.join(ROOT_DIR, ".cache", "bench_pipeline", "pdfs")
+LEGACY = ThumbnailProfile("legacy", "WEBP", "webp", 640, {"quality": 70, "method": 6})
+# (page index, clip) of the figures make_pdf draws; None renders the whole page
+FIGURE_REGIONS = ((1, fitz.Rect(96, 80, 516, 342)), (2, fitz.Rect(100, 90, 500, 270)),
+                  (6, fitz.Rect(90, 90, 510, 210)), (0, None))
+
+
+def render_fixtures(paths, width):
+    """PNG bytes of every figure region, rendered at width."""
+    fixtures = []
+    for path in paths:
+        with PdfScan.open(path) as scan:
+            for page_index, clip in FIGURE_REGIONS:
+                if page_index < scan.page_count:
+                    fixtures.append(scan.render_clip(page_index, clip or scan.page(page_index).rect, width))
+    return fixtures
+
+
+def load_images(pattern, width):
+    fixtures = []
+    for path in sorted(glob.glob(pattern)):
+        img = Image.open(path).convert("RGB")
+        if img.width > width:
+            img = img.resize((width, int(img.height * width / img.width)), Image.LANCZOS)
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
+        fixtures.append(buf.getvalue())
+    return fixtures
+
+
+def measure(profile, fixtures, repeat):
+    best = float("inf")
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = sum(len(encode_image(data, profile)) for data in fixtures)
+        best = min(best, time.perf_counter() - start)
+    return best / len(fixtures), size / len(fixtures)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--papers", type=int, default=4)
+    ap.add_argument("--pages", type=int, default=8)
+    ap.add_argument("--images", default=None, help="Glob of extra fixture images")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR)
+    args = ap.parse_args()
+
+    ensure_pdf_corpus(args.corpus_dir, args.papers, pages=args.pages, dense=True)
+    paths = [pdf_corpus_path(args.corpus_dir, i, args.pages, True) for i in range(args.papers)]
+
+    results = []
+    for profile in (LEGACY,) + tuple(THUMBNAIL_PROFILES.values()):
+        if not profile_supported(profile):
+            print(f"{profile.name:<10} skipped: Pillow has no {profile.format} encoder")
+            continue
+        fixtures = render_fixtures(paths, profile.width)
+        if args.images:
+            fixtures += load_images(args.images, profile.width)
+        seconds, size = measure(profile, fixtures, args.repeat)
+        results.append((profile, len(fixtures), seconds, size))
+
+    legacy_seconds, legacy_size = results[0][2], results[0][3]
+    print(f"{'profile':<10}{'width':>6}{'images':>8}{'encode ms':>11}{'KB':>8}{'vs legacy':>22}  options")
+    for profile, count, seconds, size in results:
+        print(f"{profile.name:<10}{profile.width:>6}{count:>8}{seconds * 1000:>11.1f}{size / 1024:>8.1f}"
+              f"{f'{legacy_seconds / seconds:.1f}x time, {size / legacy_size:.2f}x size':>22}  "
+              f"{profile.format} {profile.options}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Benchmark the figure-locating thumbnail strategies on long papers: the
+previous per-strategy implementations (fitz.open per strategy, get_images +
+get_image_rects per xref on every page, uncompiled caption regexes over
+every lowercased text block) against the shared PdfScan (one open per PDF,
+first pages scanned first, one get_image_info per page, one caption index
+per page shared by all strategies, a y0-sorted index over get_cdrawings
+path boxes instead of filtering every get_drawings path).
+
+The legacy strategies below are the reference: every rendered PNG must be
+byte-identical.
+
+    python benchmarks/bench_thumbnail_scan.py --papers 10 --pages 40
+    python benchmarks/bench_thumbnail_scan.py --papers 4 --scatter 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+import fitz
+from get_daily_arxiv_paper import CompletePaperProcessor
+from pdf_figures import PdfScan
+from benchmarks.pipeline_fixtures import ensure_pdf_corpus, pdf_corpus_path
+
+DEFAULT_CORPUS_DIR = os.path.join(ROOT_DIR, ".cache", "bench_pipeline", "pdfs")
+
+
+def legacy_largest_image_region(pdf_path, max_width=640):
+    doc = fitz.open(pdf_path)
+    best = None
+    for i in range(len(doc)):
+        page = doc.load_page(i)
+        for im in page.get_images(full=True):
+            for r in page.get_image_rects(im[0]):
+                w, h = r.width, r.height
+                if w < 256 or h < 256:
+                    continue
+                ar = w / h if h else 0
+                if ar < 0.4 or ar > 2.5:
+                    continue
+                if best is None or w * h > best[0]:
+                    best = (w * h, i, r)
+    if not best:
+        return None
+    _, page_index, rect = best
+    z = max_width / (rect.width or 1.0)
+    return doc.load_page(page_index).get_pixmap(matrix=fitz.Matrix(z, z), alpha=False, clip=rect).tobytes("png")
+
+
+def legacy_figure_region_by_caption(pdf_path, figure_no=1, max_width=640):
+    import re
+    doc = fitz.open(pdf_path)
+    patts = [fr"figure\s*{figure_no}\b", fr"fig\.\s*{figure_no}\b"]
+    for i in range(len(doc)):
+        page = doc.load_page(i)
+        captions = []
+        for b in page.get_text("blocks") or []:
+            t = (b[4] or "").lower()
+            if any(re.search(p, t) for p in patts):
+                captions.append((b[0], b[1], b[2], b[3]))
+        if not captions:
+            continue
+        candidates = []
+        for im in page.get_images(full=True):
+            for r in page.get_image_rects(im[0]):
+                w, h = r.width, r.height
+                if w < 256 or h < 256:
+                    continue
+                ar = w / h if h else 0
+                if ar < 0.4 or ar > 2.5:
+                    continue
+                for (cx0, cy0, cx1, cy1) in captions:
+                    overlap_x = max(0, min(r.x1, cx1) - max(r.x0, cx0))
+                    base_w = min((cx1 - cx0) or 1.0, (r.x1 - r.x0) or 1.0)
+                    dy = min(abs(r.y0 - cy1), abs(cy0 - r.y1))
+                    candidates.append(((overlap_x / base_w * 1000) - dy, i, r))
+        if candidates:
+            candidates.sort(key=lambda x: x[0], reverse=True)
+            _, page_index, rect = candidates[0]
+            z = max_width / (rect.width or 1.0)
+            return doc.load_page(page_index).get_pixmap(matrix=fitz.Matrix(z, z), alpha=False, clip=rect).tobytes("png")
+    return None
+
+
+def legacy_union_region_by_caption(pdf_path, figure_no=1, max_width=640, search_height=500, padding=5):
+    import re
+    doc = fitz.open(pdf_path)
+    patt = re.compile(rf"^(figure|fig\.?)[\s]*{figure_no}[:.]", re.I)
+    for i in range(len(doc)):
+        page = doc.load_page(i)
+        blocks = page.get_text("blocks") or []
+        blocks.sort(key=lambda b: b[1] if len(b) > 1 else 0)
+        caption_rect = None
+        for b in blocks:
+            if patt.match((b[4] or "").strip()):
+                caption_rect = fitz.Rect(b[0], b[1], b[2], b[3])
+                break
+        if not caption_rect:
+            continue
+        search_bottom = caption_rect.y0
+        search_top = max(0, search_bottom - float(search_height))
+        rects = []
+        for d in page.get_drawings() or []:
+            r = d.get("rect")
+            if r and r.y1 <= search_bottom + 10 and r.y0 >= search_top and (r.width > 5 or r.height > 5):
+                rects.append(fitz.Rect(r.x0, r.y0, r.x1, r.y1))
+        images_added = False
+        for info in page.get_image_info() or []:
+            r = fitz.Rect(info["bbox"])
+            if r.y1 <= search_bottom + 10 and r.y0 >= search_top:
+                rects.append(r)
+                images_added = True
+        if not images_added:
+            for im in page.get_images(full=True):
+                for r in page.get_image_rects(im[0]):
+                    if r.y1 <= search_bottom + 10 and r.y0 >= search_top:
+                        rects.append(r)
+        if not rects:
+            continue
+        final_rect = rects[0]
+        for r in rects[1:]:
+            final_rect |= r
+        final_rect.x0 -= float(padding)
+        final_rect.y0 -= float(padding)
+        final_rect.x1 += float(padding)
+        final_rect.y1 = search_bottom - 2.0
+        final_rect = final_rect & page.rect
+        z = max_width / (final_rect.width or 1.0)
+        return page.get_pixmap(matrix=fitz.Matrix(z, z), alpha=False, clip=final_rect).tobytes("png")
+    return None
+
+
+def legacy_chain(pdf_path, figure_no):
+    """Strategy order of process_single_paper, without the best-page fallback."""
+    return (legacy_union_region_by_caption(pdf_path, figure_no) or legacy_figure_region_by_caption(pdf_path, figure_no)
+            or legacy_largest_image_region(pdf_path))
+
+
+def timed(fn, paths, repeat):
+    best = float("inf")
+    results = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [fn(p) for p in paths]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--papers", type=int, default=10)
+    ap.add_argument("--pages", type=int, default=40)
+    ap.add_argument("--scatter", type=int, default=0, help="Marker paths in the page-3 scatter plot")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--corpus-dir", default=DEFAULT_CORPUS_DIR)
+    args = ap.parse_args()
+
+    ensure_pdf_corpus(args.corpus_dir, args.papers, pages=args.pages, dense=True, scatter=args.scatter)
+    paths = [pdf_corpus_path(args.corpus_dir, i, args.pages, True, args.scatter) for i in range(args.papers)]
+    proc = CompletePaperProcessor.__new__(CompletePaperProcessor)
+
+    def largest_new(path):
+        with PdfScan.open(path) as scan:
+            return proc.render_largest_image_region(path, scan=scan)[0]
+
+    def caption_new(path):
+        with PdfScan.open(path) as scan:
+            return proc.render_figure_region_by_caption(path, figure_no=1, scan=scan)[0]
+
+    def caption_late_new(path):
+        with PdfScan.open(path) as scan:
+            return proc.render_figure_region_by_caption(path, figure_no=9, scan=scan)[0]
+
+    def union_new(path, figure_no=1):
+        with PdfScan.open(path) as scan:
+            return proc.render_figure_union_region_by_caption(path, figure_no=figure_no, scan=scan)[0]
+
+    def chain_new(path, figure_no):
+        with PdfScan.open(path) as scan:
+            return (proc.render_figure_union_region_by_caption(path, figure_no=figure_no, scan=scan)[0]
+                    or proc.render_figure_region_by_caption(path, figure_no=figure_no, scan=scan)[0]
+                    or proc.render_largest_image_region(path, scan=scan)[0])
+
+    cases = (
+        ("largest_image", legacy_largest_image_region, largest_new),
+        ("caption fig 1", legacy_figure_region_by_caption, caption_new),
+        ("caption fig 9", lambda p: legacy_figure_region_by_caption(p, figure_no=9), caption_late_new),
+        ("union fig 1", legacy_union_region_by_caption, union_new),
+        ("union fig 2", lambda p: legacy_union_region_by_caption(p, figure_no=2), lambda p: union_new(p, 2)),
+        ("union fig 14", lambda p: legacy_union_region_by_caption(p, figure_no=14), lambda p: union_new(p, 14)),
+        ("union fig 25", lambda p: legacy_union_region_by_caption(p, figure_no=25), lambda p: union_new(p, 25)),
+        ("chain fig 1", lambda p: legacy_chain(p, 1), lambda p: chain_new(p, 1)),
+        ("chain fig 9", lambda p: legacy_chain(p, 9), lambda p: chain_new(p, 9)),
+    )
+    print(f"{len(paths)} PDFs x {args.pages} pages (dense figures, {args.scatter} scatter markers), best of {args.repeat}")
+    for name, legacy, new in cases:
+        legacy_time, legacy_out = timed(legacy, paths, args.repeat)
+        new_time, new_out = timed(new, paths, args.repeat)
+        assert legacy_out == new_out, f"{name}: output differs"
+        hits = sum(1 for out in new_out if out)
+        print(f"{name:<15} legacy {legacy_time / len(paths) * 1000:8.1f} ms/pdf   "
+              f"scan {new_time / len(paths) * 1000:8.1f} ms/pdf   ({legacy_time / new_time:.1f}x, {hits} hits, identical)")
+
+
+if __name__ == "__main__":
+    main()
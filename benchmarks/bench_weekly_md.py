@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark weekly_md.tokenize_week against the previous per-entry regex parser.
+
+The legacy parser below is the code that build_arxiv_daily_json.parse_week_md and
+migrate_to_supabase.parse_md_file used before the shared tokenizer. It is kept
+here as the reference implementation: the benchmark fails if the outputs differ.
+
+One deliberate difference is not exercised by the synthetic corpus: for an
+empty field line such as "  - **institution:**" (written when the LLM call
+fails) the legacy patterns let `\s*` run across the newline and took the next
+line's text as the value; tokenize_week returns None for it.
+
+    python benchmarks/bench_weekly_md.py --weeks 156 --papers-per-day 20
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from weekly_md import tokenize_week, RECORD_KEYS
+from benchmarks.synthetic_docs import write_synthetic_tree
+
+
+def legacy_tokenize(content):
+    week = ""
+    m = re.search(r'^#\s*([0-9\-]+)', content, re.M)
+    if m:
+        week = m.group(1).strip()
+    records = []
+    headers = list(re.finditer(r'(^|\n)##\s*(\d{4}-\d{2}-\d{2})', content))
+    for i, hm in enumerate(headers):
+        day = hm.group(2)
+        start = hm.end()
+        end = headers[i+1].start() if i+1 < len(headers) else len(content)
+        section = content[start:end]
+        tms = list(re.finditer(r'^-\s+\*\*\[[^\]]+\]\s*(.*?)\*\*', section, re.M))
+        for j, tm in enumerate(tms):
+            entry_start = tm.end()
+            entry_end = tms[j+1].start() if j+1 < len(tms) else len(section)
+            entry = section[entry_start:entry_end]
+            am = re.search(r'^\s+-\s+\*\*authors:\*\*\s*(.+)$', entry, re.M)
+            lm = re.search(r'^\s+-\s+\*\*link:\*\*\s*(\S+)', entry, re.M)
+            tmn = re.search(r'^\s+-\s+\*\*thumbnail:\*\*\s*(\S+)', entry, re.M)
+            cd = re.search(r'^\s+-\s+\*\*code:\*\*\s*(\S+)', entry, re.M)
+            im = re.search(r'^\s+-\s+\*\*institution:\*\*\s*(.+)$', entry, re.M)
+            tg = re.search(r'^\s+-\s+\*\*tags:\*\*\s*(.+)$', entry, re.M)
+            cm = re.search(r'^\s+-\s+\*\*contributions:\*\*\s*(.+)$', entry, re.M)
+            sm = re.search(r'^\s+-\s+\*\*Simple LLM Summary:\*\*\s*(.+)$', entry, re.M)
+            mm = re.search(r'^\s+-\s+\*\*Mindmap:\*\*\s*\n\s*```mermaid\n([\s\S]+?)\n\s*```', entry, re.M)
+            records.append({
+                "title": tm.group(1).strip(),
+                "day": day,
+                "authors": am.group(1).strip() if am else None,
+                "link": lm.group(1).strip() if lm else None,
+                "thumbnail": tmn.group(1).strip() if tmn else None,
+                "code": cd.group(1).strip() if cd else None,
+                "institution": im.group(1).strip() if im else None,
+                "tags": tg.group(1).strip() if tg else None,
+                "contributions": cm.group(1).strip() if cm else None,
+                "summary": sm.group(1).strip() if sm else None,
+                "mindmap": mm.group(1).strip() if mm else None,
+            })
+    return {"week": week, "records": records}
+
+
+def run(parse, contents, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for content in contents:
+            parse(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--weeks", type=int, default=156, help="Weeks per category (156 = 3 years)")
+    ap.add_argument("--papers-per-day", type=int, default=20)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        paths = write_synthetic_tree(root, weeks=args.weeks, papers_per_day=args.papers_per_day)
+        contents = []
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                contents.append(f.read())
+
+    total_bytes = sum(len(c) for c in contents)
+    papers = 0
+    for content in contents:
+        new, old = tokenize_week(content), legacy_tokenize(content)
+        assert new["week"] == old["week"], (new["week"], old["week"])
+        assert len(new["records"]) == len(old["records"])
+        for a, b in zip(new["records"], old["records"]):
+            assert [a[k] for k in RECORD_KEYS] == [b[k] for k in RECORD_KEYS], (a, b)
+        papers += len(new["records"])
+
+    legacy = run(legacy_tokenize, contents, args.repeat)
+    single = run(tokenize_week, contents, args.repeat)
+    print(f"corpus: {len(contents)} files, {papers} papers, {total_bytes / 1e6:.1f} MB (outputs identical)")
+    print(f"legacy regex : {legacy:.3f}s  ({papers / legacy:,.0f} papers/s)")
+    print(f"single-pass  : {single:.3f}s  ({papers / single:,.0f} papers/s)")
+    print(f"speedup      : {legacy / single:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Offline fixtures for end-to-end pipeline benchmarks:
+
+- a cs/new listing page in the markup _extract_paper_info_from_html parses,
+  with PDF links pointing at a local server
+- a cached corpus of synthetic PDFs (text, an embedded raster figure, vector
+  drawings and a "Figure 1:" caption) generated once with PyMuPDF
+- MockServices: one local HTTP server acting as the PDF host, an
+  OpenAI-compatible chat completions endpoint with configurable latency and
+  an S3 PUT stand-in for R2
+"""
+import json
+import os
+import random
+import threading
+import time
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.synthetic_docs import WORDS
+
+LISTING_CATEGORIES = (("cs.DC", "Distributed, Parallel, and Cluster Computing"),
+                      ("cs.AI", "Artificial Intelligence"),
+                      ("cs.LG", "Machine Learning"))
+
+LLM_REPLY = """tag1: mlsys
+tag2: llm inference
+tag3: kv cache, paged attention, scheduling
+institution: Example University
+code: https://github.com/example/bench
+contributions: 1. A scheduler for {braces}. 2. A cache layout <2x faster>. 3. An evaluation on 8 GPUs.
+summary: The paper proposes a synthetic method and shows it is fast.
+mermaid:
+```mermaid
+graph TB
+    A["Paper / 论文"] --> B["Problem / 问题"]
+    A --> C["Method / 方法"]
+    A --> D["Results / 结果"]
+```
+"""
+
+
+def arxiv_id(i):
+    return f"2510.{i:05d}"
+
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def make_listing(n, pdf_base, seed=0):
+    """cs/new listing HTML with n new submissions; PDF links are f"{pdf_base}/{id}"."""
+    rng = random.Random(seed)
+    parts = ["<html><body><div id='dlpage'><h3>New submissions</h3><dl id='articles'>"]
+    for i in range(n):
+        aid = arxiv_id(i)
+        code, name = LISTING_CATEGORIES[i % len(LISTING_CATEGORIES)]
+        authors = ", ".join(f"<a href='/a/{j}'>{escape(_sentence(rng, 2).title())}</a>" for j in range(rng.randint(1, 6)))
+        parts.append(
+            f"<dt><a name='item{i + 1}'>[{i + 1}]</a> <a href='/abs/{aid}' title='Abstract'>arXiv:{aid}</a>"
+            f" [<a href='{pdf_base}/{aid}' title='Download PDF'>pdf</a>]</dt>"
+            f"<dd><div class='meta'>"
+            f"<div class='list-title mathjax'><span class='descriptor'>Title:</span> {escape(_sentence(rng, 8).title())}</div>"
+            f"<div class='list-authors'><span class='descriptor'>Authors:</span> {authors}</div>"
+            f"<div class='list-subjects'><span class='descriptor'>Subjects:</span> <span class='primary'>{name} ({code})</span></div>"
+            f"<p class='mathjax'>{escape(_sentence(rng, 60))}.</p>"
+            f"</div></dd>"
+        )
+    parts.append("</dl></div></body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def make_pdf(path, seed, pages=6, dense=False, scatter=0):
+    """
+    A paper-like PDF: text pages, a raster figure with caption on page 2 and a vector chart on page 3.
+    dense=True adds a smaller raster figure every 4th page and a plot with thousands of paths every
+    4th page after that, like long papers with many evaluation plots.
+    scatter=N draws N separate marker paths on page 3, half around the chart above its caption and
+    half further down the page, like scatter plots exported as one path per point.
+    """
+    import fitz
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for p in range(pages):
+        page = doc.new_page(width=612, height=792)
+        y = 72
+        if p == 0:
+            page.insert_text((72, y), f"Synthetic Paper {seed}", fontsize=16)
+            y += 24
+            page.insert_text((72, y), "Example University, bench@example.edu", fontsize=9)
+            y += 24
+        if p == 1:
+            pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 480, 300), False)
+            pix.clear_with(rng.randint(40, 220))
+            for x in range(0, 480, 24):
+                pix.set_rect(fitz.IRect(x, 0, x + 12, 300), (rng.randint(0, 255), rng.randint(0, 255), 90))
+            page.insert_image(fitz.Rect(96, 80, 516, 342), pixmap=pix)
+            page.insert_text((96, 360), "Figure 1: Overview of the synthetic system.", fontsize=9)
+            y = 400
+        if p == 2:
+            shape = page.new_shape()
+            for k in range(12):
+                h = rng.randint(20, 160)
+                shape.draw_rect(fitz.Rect(110 + k * 32, 260 - h, 130 + k * 32, 260))
+            shape.finish(color=(0, 0, 0), fill=(0.3, 0.5, 0.8))
+            for k in range(scatter):
+                top = 60 if k % 2 == 0 else 420
+                shape.draw_circle(fitz.Point(90 + rng.random() * 430, top + rng.random() * 190), 3)
+                shape.finish(color=(0, 0, 0.6), fill=(0.2, 0.4, 0.9), width=0.2)
+            shape.commit()
+            page.insert_text((110, 280), "Figure 2: Throughput by batch size.", fontsize=9)
+            y = 320
+        if dense and p > 2 and p % 4 == 0:
+            pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 300, 200), False)
+            pix.clear_with(rng.randint(40, 220))
+            page.insert_image(fitz.Rect(150, 80, 450, 280), pixmap=pix)
+            page.insert_text((150, 296), f"Figure {p // 4 + 2}: Ablation.", fontsize=9)
+            y = 330
+        if dense and p > 2 and p % 4 == 2:
+            shape = page.new_shape()
+            points = [fitz.Point(100 + k * 0.2, 200 - rng.random() * 100) for k in range(2000)]
+            for a, b in zip(points, points[1:]):
+                shape.draw_line(a, b)
+            shape.finish(color=(0.8, 0.1, 0.1), width=0.3)
+            shape.commit()
+            page.insert_text((100, 220), f"Figure {p // 4 + 12}: Latency over time.", fontsize=9)
+            y = 260
+        while y < 720:
+            page.insert_text((72, y), _sentence(rng, 14), fontsize=10)
+            y += 13
+    doc.save(path, garbage=3, deflate=True)
+    doc.close()
+
+
+def pdf_corpus_path(cache_dir, i, pages=6, dense=False, scatter=0):
+    return os.path.join(cache_dir, f"{arxiv_id(i)}-p{pages}{'-dense' if dense else ''}{f'-s{scatter}' if scatter else ''}.pdf")
+
+
+def ensure_pdf_corpus(cache_dir, n, pages=6, dense=False, scatter=0):
+    """Generate (once) and return {arxiv_id: pdf bytes} for n papers."""
+    os.makedirs(cache_dir, exist_ok=True)
+    corpus = {}
+    for i in range(n):
+        aid = arxiv_id(i)
+        path = pdf_corpus_path(cache_dir, i, pages, dense, scatter)
+        if not os.path.exists(path):
+            make_pdf(path + ".tmp", seed=i, pages=pages, dense=dense, scatter=scatter)
+            os.replace(path + ".tmp", path)
+        with open(path, "rb") as f:
+            corpus[aid] = f.read()
+    return corpus
+
+
+class MockServices:
+    """
+    Local HTTP server for the pipeline's external dependencies:
+        GET  /pdf/<id>                 -> cached PDF bytes
+        POST /v1/chat/completions      -> canned LLM_REPLY after llm_latency seconds
+        PUT  /<bucket>/<key>           -> accepted and discarded (R2 / S3 stand-in)
+    """
+
+    def __init__(self, pdfs, llm_latency=0.2, download_latency=0.0):
+        self.pdfs = pdfs
+        self.llm_latency = llm_latency
+        self.download_latency = download_latency
+        self.counts = {"pdf": 0, "llm": 0, "put": 0, "put_bytes": 0}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self, bucket="bench"):
+        """Environment variables that point the pipeline at this server."""
+        return {
+            "DEEPSEEK_API_KEY": "bench",
+            "DEEPSEEK_BASE_URL": f"{self.base_url}/v1",
+            "R2_ENDPOINT_URL": self.base_url,
+            "R2_ACCESS_KEY_ID": "bench",
+            "R2_SECRET_ACCESS_KEY": "bench",
+            "R2_BUCKET": bucket,
+            "R2_PUBLIC_URL": f"{self.base_url}/{bucket}",
+        }
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self.counts[key] += value
+
+    def _handler(self):
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body=b"", content_type="application/octet-stream", headers=()):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self):
+                return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            def do_GET(self):
+                if not self.path.startswith("/pdf/"):
+                    return self._reply(404)
+                data = services.pdfs.get(self.path[len("/pdf/"):])
+                if data is None:
+                    return self._reply(404)
+                if services.download_latency:
+                    time.sleep(services.download_latency)
+                services._count("pdf")
+                self._reply(200, data, "application/pdf")
+
+            def do_POST(self):
+                request = json.loads(self._body() or b"{}")
+                if not self.path.endswith("/chat/completions"):
+                    return self._reply(404)
+                time.sleep(services.llm_latency)
+                services._count("llm")
+                prompt_chars = sum(len(m.get("content") or "") for m in request.get("messages", []))
+                reply = {
+                    "id": "chatcmpl-bench", "object": "chat.completion", "created": int(time.time()),
+                    "model": request.get("model", "bench"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": LLM_REPLY}}],
+                    "usage": {"prompt_tokens": prompt_chars // 4, "completion_tokens": len(LLM_REPLY) // 4,
+                              "total_tokens": (prompt_chars + len(LLM_REPLY)) // 4},
+                }
+                self._reply(200, json.dumps(reply).encode("utf-8"), "application/json")
+
+            def do_PUT(self):
+                body = self._body()
+                services._count("put")
+                services._count("put_bytes", len(body))
+                self._reply(200, headers=(("ETag", '"bench"'),))
+
+        return Handler
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic docs/daily tree in the same layout the pipeline writes:
+
+    <root>/<cs_XX>/<YYYYMMDD-YYYYMMDD>.md
+
+Used by the parsing and build benchmarks so they can run without the real corpus.
+"""
+import argparse
+import os
+import random
+from datetime import date, timedelta
+
+CATEGORIES = ("cs.AI", "cs.CL", "cs.CV", "cs.DC", "cs.LG", "cs.RO")
+WORDS = ("efficient", "scalable", "llm", "inference", "training", "sparse", "attention",
+         "kernel", "serving", "cache", "quantization", "agent", "diffusion", "graph",
+         "retrieval", "distributed", "memory", "pipeline", "parallel", "robust")
+
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(WORDS) for _ in range(n))
+
+
+def format_entry(rng, day, index):
+    """One paper entry, mirroring CompletePaperProcessor.format_paper_with_enhanced_info."""
+    prefix = f"[arXiv{day.strftime('%y%m%d')}]"
+    title = _sentence(rng, 8).title()
+    if rng.random() < 0.05:
+        title += " with \\textit{Latex} {Braces}"
+    arxiv_id = f"{day.strftime('%y%m')}.{index:05d}"
+    lines = [
+        f"- **{prefix} {title}**",
+        f"  - **tags:** [mlsys], [llm inference], [{_sentence(rng, 1)}, {_sentence(rng, 2)}]",
+        f"  - **authors:** {', '.join(_sentence(rng, 2).title() for _ in range(rng.randint(1, 6)))}",
+        f"  - **institution:** {_sentence(rng, 2).title()} University",
+        f"  - **link:** https://arxiv.org/pdf/{arxiv_id}",
+    ]
+    if rng.random() < 0.3:
+        lines.append(f"  - **code:** https://github.com/example/{arxiv_id}")
+    lines.append(f"  - **contributions:** 1. {_sentence(rng, 10)}. 2. {_sentence(rng, 10)}. 3. speedup <2x.")
+    if rng.random() < 0.8:
+        lines.append(f"  - **thumbnail:** https://pub.example.r2.dev/thumbnails/{rng.getrandbits(128):032x}_w640_q70.webp")
+    lines.append(f"  - **Simple LLM Summary:** {_sentence(rng, 30)}.")
+    if rng.random() < 0.7:
+        lines += [
+            "  - **Mindmap:**",
+            "",
+            "    ```mermaid",
+            "    graph TB",
+            '        A["Root"] --> B["Problem"]',
+            "        A --> C[Method]",
+            "        A --> D[Results]",
+            "    ```",
+        ]
+    return "\n".join(lines) + "\n\n"
+
+
+def write_week_file(path, category, monday, rng, papers_per_day, days=5):
+    week_range = f"{monday.strftime('%Y%m%d')}-{(monday + timedelta(days=6)).strftime('%Y%m%d')}"
+    norm = category.lower().replace(".", "")
+    parts = [f"---\nslug: /daily/{norm}/{week_range}\n---\n# {week_range} ({category})\n\n"]
+    index = 0
+    for d in range(days):
+        day = monday + timedelta(days=d)
+        parts.append(f"## {day.isoformat()}\n\n")
+        for _ in range(papers_per_day):
+            index += 1
+            parts.append(format_entry(rng, day, index))
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(parts).strip() + "\n")
+
+
+def write_synthetic_tree(root, weeks=156, categories=CATEGORIES, papers_per_day=20, end=None, seed=0):
+    """Write `weeks` weekly files per category ending at `end` (default: this week)."""
+    rng = random.Random(seed)
+    end = end or date.today()
+    last_monday = end - timedelta(days=end.weekday())
+    paths = []
+    for category in categories:
+        cat_dir = os.path.join(root, category.replace(".", "_"))
+        os.makedirs(cat_dir, exist_ok=True)
+        for w in range(weeks):
+            monday = last_monday - timedelta(weeks=w)
+            name = f"{monday.strftime('%Y%m%d')}-{(monday + timedelta(days=6)).strftime('%Y%m%d')}.md"
+            path = os.path.join(cat_dir, name)
+            write_week_file(path, category, monday, rng, papers_per_day)
+            paths.append(path)
+    return paths
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("root")
+    ap.add_argument("--weeks", type=int, default=156)
+    ap.add_argument("--papers-per-day", type=int, default=20)
+    args = ap.parse_args()
+    paths = write_synthetic_tree(args.root, weeks=args.weeks, papers_per_day=args.papers_per_day)
+    print(f"Wrote {len(paths)} weekly files under {args.root}")
+
+
+if __name__ == "__main__":
+    main()
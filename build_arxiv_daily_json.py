@@ -3,8 +3,20 @@ import os
 import re
 import json
 import argparse
+import heapq
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 
+from weekly_md import tokenize_week, parse_week_file
+from file_manifest import FileManifest, file_stat, content_hash
+from static_shards import write_shards
+from search_index import write_search_index
+
+# 解析缓存目录：每个周报文件的解析结果 + 每个分类的构建结果
+DEFAULT_CACHE_DIR = ".cache/arxiv_daily"
+# 解析/转换逻辑变化时递增，使旧缓存整体失效
+PARSE_CACHE_VERSION = 2
+
 def norm_category(cat):
     return re.sub(r'[^a-z0-9]', '', (cat or '').lower())
 
@@ -43,119 +55,287 @@ def escape_mdx_content(text):
 def parse_week_md(file_path):
     if not file_path or not os.path.exists(file_path):
         return {"week": "", "items": []}
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    week = ""
-    m = re.search(r'^#\s*([0-9\-]+)', content, re.M)
-    if m:
-        week = m.group(1).strip()
+    return week_items(parse_week_file(file_path))
+
+def week_items(parsed):
+    """把 tokenize_week 的记录转换为前端使用的条目"""
     items = []
-    headers = list(re.finditer(r'(^|\n)##\s*(\d{4}-\d{2}-\d{2})', content))
-    for i, hm in enumerate(headers):
-        day = hm.group(2)
-        start = hm.end()
-        end = headers[i+1].start() if i+1 < len(headers) else len(content)
-        section = content[start:end]
-        tms = list(re.finditer(r'^-\s+\*\*\[[^\]]+\]\s*(.*?)\*\*', section, re.M))
-        for j, tm in enumerate(tms):
-            title = tm.group(1).strip()
-            entry_start = tm.end()
-            entry_end = tms[j+1].start() if j+1 < len(tms) else len(section)
-            entry = section[entry_start:entry_end]
-            am = re.search(r'^\s+-\s+\*\*authors:\*\*\s*(.+)$', entry, re.M)
-            lm = re.search(r'^\s+-\s+\*\*link:\*\*\s*(\S+)', entry, re.M)
-            tmn = re.search(r'^\s+-\s+\*\*thumbnail:\*\*\s*(\S+)', entry, re.M)
-            cd = re.search(r'^\s+-\s+\*\*code:\*\*\s*(\S+)', entry, re.M)
-            im = re.search(r'^\s+-\s+\*\*institution:\*\*\s*(.+)$', entry, re.M)
-            tg = re.search(r'^\s+-\s+\*\*tags:\*\*\s*(.+)$', entry, re.M)
-            cm = re.search(r'^\s+-\s+\*\*contributions:\*\*\s*(.+)$', entry, re.M)
-            sm = re.search(r'^\s+-\s+\*\*Simple LLM Summary:\*\*\s*(.+)$', entry, re.M)
-            mm = re.search(r'^\s+-\s+\*\*Mindmap:\*\*\s*\n\s*```mermaid\n([\s\S]+?)\n\s*```', entry, re.M)
-            
-            authors = am.group(1).strip() if am else ""
-            link = lm.group(1).strip() if lm else None
-            thumbnail = tmn.group(1).strip() if tmn else None
-            code = cd.group(1).strip() if cd else None
-            institution = im.group(1).strip() if im else ""
-            tags = tg.group(1).strip() if tg else ""
-            contributions = cm.group(1).strip() if cm else ""
-            summary = sm.group(1).strip() if sm else ""
-            mindmap = mm.group(1).strip() if mm else ""
-
-            # 转义可能导致 MDX 错误的字符
-            contributions = escape_mdx_content(contributions)
-            summary = escape_mdx_content(summary)
-            
-            # 修复Mermaid渲染因引号导致的错误
-            if mindmap:
-                mindmap = mindmap.replace('"', '”')
-            
-            # 平铺 tags
-            tag_list = []
-            if tags:
-                # 移除方括号，分割逗号
-                # 原始格式如: [ai], [cv], [object detection, yolo]
-                # 先把 [], [] 之间的逗号和空格处理掉，或者简单地去掉所有方括号，再按逗号分割
-                # 方法：去掉 '[' 和 ']'，然后 split(',')
-                cleaned = tags.replace('[', '').replace(']', '')
-                raw_tags = [t.strip() for t in cleaned.split(',')]
-                tag_list = [t for t in raw_tags if t]
-                # 删除第一个tag (通常是分类本身)
-                if len(tag_list) > 0:
-                    tag_list = tag_list[1:]
-
-            items.append({
-                "title": title, 
-                "authors": authors, 
-                "institution": institution,
-                "link": link, 
-                "code": code,
-                "tags": tag_list,
-                "day": day, 
-                "thumbnail": thumbnail,
-                "contributions": contributions,
-                "summary": summary,
-                "mindmap": mindmap
-            })
-    return {"week": week, "items": items}
-
-def build(docs_dir, output_path, max_items_per_cat, months=3):
-    categories = []
-    base = docs_dir
-    for entry in sorted(os.listdir(base)):
-        full = os.path.join(base, entry)
-        if not os.path.isdir(full):
-            continue
-        label = entry.replace('_', '.')
-        slug = norm_category(label)
-        files = recent_week_files(full, months=months)
-        all_items = []
-        weeks = []
-        for fp in files:
-            parsed = parse_week_md(fp)
-            if parsed.get('week'):
-                weeks.append(parsed['week'])
-            all_items.extend(parsed.get('items', []))
-        # 去重（优先使用 link，其次使用 title+day）
-        seen = set()
-        deduped = []
-        for it in all_items:
+    for rec in parsed["records"]:
+        # 转义可能导致 MDX 错误的字符
+        contributions = escape_mdx_content(rec["contributions"] or "")
+        summary = escape_mdx_content(rec["summary"] or "")
+
+        # 修复Mermaid渲染因引号导致的错误
+        mindmap = rec["mindmap"] or ""
+        if mindmap:
+            mindmap = mindmap.replace('"', '”')
+
+        # 平铺 tags
+        tag_list = []
+        tags = rec["tags"] or ""
+        if tags:
+            # 原始格式如: [ai], [cv], [object detection, yolo]
+            # 去掉 '[' 和 ']'，然后 split(',')
+            cleaned = tags.replace('[', '').replace(']', '')
+            raw_tags = [t.strip() for t in cleaned.split(',')]
+            tag_list = [t for t in raw_tags if t]
+            # 删除第一个tag (通常是分类本身)
+            if len(tag_list) > 0:
+                tag_list = tag_list[1:]
+
+        items.append({
+            "title": rec["title"],
+            "authors": rec["authors"] or "",
+            "institution": rec["institution"] or "",
+            "link": rec["link"],
+            "code": rec["code"],
+            "tags": tag_list,
+            "day": rec["day"],
+            "thumbnail": rec["thumbnail"],
+            "contributions": contributions,
+            "summary": summary,
+            "mindmap": mindmap
+        })
+    return {"week": parsed["week"], "items": items}
+
+class ParseCache:
+    """
+    周报文件解析缓存
+    - manifest.json（FileManifest）：文件 -> mtime/size/内容哈希，以及每个分类上次的合并结果
+    - items/<sha1>.json：按内容哈希存放的单个文件解析结果，只在分类需要重新合并时读取
+    文件 mtime/size 未变直接复用哈希；变化时再比对内容哈希，只有内容变化的文件才重新解析
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, subset=None):
+        """
+        Args:
+            subset (dict): 子进程使用：subset() 导出的单个分类的清单条目；给出时不读取整个清单
+        """
+        self.items_dir = os.path.join(cache_dir, "items")
+        self.manifest = FileManifest(os.path.join(cache_dir, "manifest.json"), version=PARSE_CACHE_VERSION,
+                                     load=subset is None)
+        if subset is not None:
+            self.manifest.files.update(subset["files"])
+            if subset["category"]:
+                self.manifest.extra["categories"] = {subset["slug"]: subset["category"]}
+        self.categories = self.manifest.extra.setdefault("categories", {})
+        self.seen = set()
+        self.fresh = {}
+        self.parsed = 0
+        self.reused = 0
+        self.dirty = False
+
+    def _items_path(self, sha1):
+        return os.path.join(self.items_dir, f"{sha1}.json")
+
+    def fingerprint(self, file_path, key):
+        """返回文件内容哈希；内容变化（或缓存缺失）时重新解析并写入缓存"""
+        self.seen.add(key)
+        stat = file_stat(file_path)
+        entry = self.manifest.get(key)
+        if self.manifest.stat_unchanged(key, stat) and os.path.exists(self._items_path(entry["sha1"])):
+            self.reused += 1
+            return entry["sha1"]
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        sha1 = content_hash(data)
+        self.dirty = True
+        if self.manifest.hash_unchanged(key, sha1) and os.path.exists(self._items_path(sha1)):
+            self.manifest.touch(key, stat)
+            self.reused += 1
+            return sha1
+        parsed = week_items(tokenize_week(data.decode('utf-8')))
+        os.makedirs(self.items_dir, exist_ok=True)
+        # 不同分类可能包含内容相同的文件，临时文件名带进程号，避免并发的子进程互相覆盖
+        tmp_path = f"{self._items_path(sha1)}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(parsed, f, ensure_ascii=False)
+        os.replace(tmp_path, self._items_path(sha1))
+        self.manifest.set(key, stat, sha1)
+        self.fresh[sha1] = parsed
+        self.parsed += 1
+        return sha1
+
+    def load(self, sha1):
+        """读取已缓存的解析结果"""
+        if sha1 in self.fresh:
+            return self.fresh[sha1]
+        with open(self._items_path(sha1), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def set_category(self, slug, signature, week, items):
+        self.categories[slug] = {"signature": signature, "week": week, "items": items}
+        self.dirty = True
+
+    def subset(self, entry, slug):
+        """交给子进程的部分清单：一个分类目录下的文件条目与该分类上次的合并结果"""
+        prefix = entry + '/'
+        return {
+            "files": {k: v for k, v in self.manifest.files.items() if k.startswith(prefix)},
+            "slug": slug,
+            "category": self.categories.get(slug),
+        }
+
+    def export(self, entry, slug, counters):
+        """
+        导出一个分类目录的缓存更新（在子进程中调用，交给主进程 merge）
+
+        Args:
+            counters (tuple): 构建该分类前的 (parsed, reused)
+        """
+        prefix = entry + '/'
+        files = {k: v for k, v in self.manifest.files.items() if k.startswith(prefix) and k in self.seen}
+        category = self.categories.get(slug)
+        return {
+            "files": files,
+            "signature": category["signature"] if category else None,
+            "parsed": self.parsed - counters[0],
+            "reused": self.reused - counters[1],
+        }
+
+    def merge(self, cat, update):
+        """合并子进程返回的缓存更新"""
+        for key, entry in update["files"].items():
+            self.seen.add(key)
+            if self.manifest.files.get(key) != entry:
+                self.manifest.files[key] = entry
+                self.dirty = True
+        cached = self.categories.get(cat['slug'])
+        if update["signature"] and (not cached or cached.get("signature") != update["signature"]):
+            self.set_category(cat['slug'], update["signature"], cat['week'], cat['items'])
+        self.parsed += update["parsed"]
+        self.reused += update["reused"]
+
+    def save(self, slugs):
+        """删除本次构建未涉及的文件与分类（超出 --months 窗口或已删除），有变化时才写清单"""
+        if self.manifest.prune(self.seen):
+            self.dirty = True
+        for slug in [s for s in self.categories if s not in slugs]:
+            del self.categories[slug]
+            self.dirty = True
+        if not self.dirty:
+            return
+        self.manifest.save()
+        live = {entry["sha1"] + ".json" for entry in self.manifest.files.values()}
+        for name in os.listdir(self.items_dir) if os.path.isdir(self.items_dir) else []:
+            if name not in live:
+                os.remove(os.path.join(self.items_dir, name))
+
+def _day_key(day):
+    # ISO 日期字符串按字典序即按时间排序；缺失或格式异常的排在最后
+    return day if day and len(day) == 10 else ''
+
+def _week_end_day(file_path):
+    """周报文件名 YYYYMMDD-YYYYMMDD.md 的结束日期（ISO 格式），文件内条目的日期不会晚于它"""
+    end = os.path.basename(file_path)[9:17]
+    return f"{end[:4]}-{end[4:6]}-{end[6:8]}"
+
+def merge_category_items(week_files, load, max_items_per_cat):
+    """
+    合并一个分类下各周文件的条目：去重后取日期最新的 max_items_per_cat 条
+
+    从最新的文件开始消费，用大小为 K 的最小堆做 top-K 选择；当已有 K 条且堆中最旧日期
+    晚于下一个（更旧）文件的结束日期时提前停止，更旧的文件不再加载
+    排序与原先的稳定排序一致：日期降序，同一天按文件先后、文件内顺序
+    去重（优先使用 link，其次使用 title+day）保留最新文件中的条目
+
+    Args:
+        week_files (list): 按结束日期升序的周文件路径
+        load: 路径 -> 解析结果 {"week", "items"}
+
+    Returns:
+        tuple: (最新一周的标识, 条目列表)
+    """
+    heap = []
+    seen = set()
+    latest_week = ""
+    for fi in range(len(week_files) - 1, -1, -1):
+        fp = week_files[fi]
+        if heap and len(heap) >= max_items_per_cat and heap[0][0] > _week_end_day(fp):
+            break
+        parsed = load(fp)
+        if not latest_week and parsed.get('week'):
+            latest_week = parsed['week']
+        for ei, it in enumerate(parsed.get('items', [])):
             key = it.get('link') or (it.get('title'), it.get('day'))
             if key in seen:
                 continue
             seen.add(key)
-            deduped.append(it)
-        # 按日期降序
-        def _parse_day(s):
-            try:
-                return datetime.strptime(s or '', '%Y-%m-%d')
-            except Exception:
-                return datetime.min
-        deduped.sort(key=lambda it: _parse_day(it.get('day')), reverse=True)
-        cats_items = deduped[:max_items_per_cat]
-        latest_week = weeks[-1] if weeks else ""
-        categories.append({"label": label, "slug": slug, "week": latest_week, "items": cats_items})
-    
+            # 越大越靠前：日期新、文件旧、文件内靠前；(day, -fi, -ei) 唯一，不会比较到 dict
+            entry = (_day_key(it.get('day')), -fi, -ei, it)
+            if len(heap) < max_items_per_cat:
+                heapq.heappush(heap, entry)
+            elif heap and entry[:3] > heap[0][:3]:
+                heapq.heapreplace(heap, entry)
+    heap.sort(reverse=True)
+    return latest_week, [entry[3] for entry in heap]
+
+def build_category(docs_dir, entry, max_items_per_cat, months=3, cache=None):
+    full = os.path.join(docs_dir, entry)
+    label = entry.replace('_', '.')
+    slug = norm_category(label)
+    files = recent_week_files(full, months=months)
+    if cache is None:
+        week, items = merge_category_items(files, parse_week_md, max_items_per_cat)
+        return {"label": label, "slug": slug, "week": week, "items": items}
+
+    fingerprint = [max_items_per_cat]
+    hashes = {}
+    for fp in files:
+        key = os.path.relpath(fp, docs_dir).replace(os.sep, '/')
+        hashes[fp] = cache.fingerprint(fp, key)
+        fingerprint.append((key, hashes[fp]))
+    # 分类的输入（文件集合与内容哈希）未变化时直接复用上次的合并结果
+    signature = content_hash(json.dumps(fingerprint))
+    cached = cache.categories.get(slug)
+    if cached and cached.get("signature") == signature:
+        week, items = cached["week"], cached["items"]
+    else:
+        week, items = merge_category_items(files, lambda fp: cache.load(hashes[fp]), max_items_per_cat)
+        cache.set_category(slug, signature, week, items)
+    return {"label": label, "slug": slug, "week": week, "items": items}
+
+def _build_category_job(job):
+    docs_dir, entry, max_items_per_cat, months, cache_dir, subset = job
+    if cache_dir is None:
+        return build_category(docs_dir, entry, max_items_per_cat, months=months), None
+    # 每个子进程只拿到本分类的清单条目，内存不随 进程数 x 语料 增长
+    cache = ParseCache(cache_dir, subset=subset)
+    cat = build_category(docs_dir, entry, max_items_per_cat, months=months, cache=cache)
+    return cat, cache.export(entry, cat['slug'], (0, 0))
+
+def build(docs_dir, output_path, max_items_per_cat, months=3, cache_dir=DEFAULT_CACHE_DIR, workers=None,
+          shard_dir=None, shard_page_size=64, shard_compress=("gzip",), search_dir=None):
+    """
+    Args:
+        cache_dir (str): 解析缓存目录；为空则不使用缓存，每次全量解析
+        workers (int): 并行构建分类的进程数，默认 min(CPU 核数, 分类数)；<=1 时在当前进程串行构建
+        shard_dir (str): 分片静态数据输出目录（见 static_shards，实验性，前端尚未读取），为空则不输出
+        shard_page_size (int): 每个分片最多的条目数
+        shard_compress (tuple): 分片预压缩格式（"gzip"、"br"）
+        search_dir (str): 预构建搜索索引输出目录（见 search_index，实验性，前端尚未读取），为空则不输出
+    """
+    cache = ParseCache(cache_dir) if cache_dir else None
+    base = docs_dir
+    entries = [e for e in sorted(os.listdir(base)) if os.path.isdir(os.path.join(base, e))]
+    if workers is None:
+        workers = min(len(entries), os.cpu_count() or 1)
+    if workers <= 1:
+        categories = [build_category(base, e, max_items_per_cat, months=months, cache=cache) for e in entries]
+    else:
+        # 各分类互不依赖；pool.map 按提交顺序返回，输出顺序与串行构建一致
+        categories = []
+        jobs = [(base, e, max_items_per_cat, months, cache_dir if cache else None,
+                 cache.subset(e, norm_category(e.replace('_', '.'))) if cache else None) for e in entries]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for cat, update in pool.map(_build_category_job, jobs):
+                if cache is not None:
+                    cache.merge(cat, update)
+                categories.append(cat)
+    if cache is not None:
+        cache.save({cat['slug'] for cat in categories})
+        print(f"解析缓存: 重新解析 {cache.parsed} 个文件，复用 {cache.reused} 个")
+
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     
     # 1. Generate separate JSON files for each category
@@ -172,22 +352,9 @@ def build(docs_dir, output_path, max_items_per_cat, months=3):
     #         json.dump(cat, f, ensure_ascii=False, indent=2)
             
     # 2. Generate search index (lightweight)
-    # DISABLED to prevent file growth - now using Supabase
-    # search_items = []
-    # for cat in categories:
-    #     slug = cat['slug']
-    #     for item in cat['items']:
-    #         search_items.append({
-    #             "title": item.get('title'),
-    #             "day": item.get('day'),
-    #             "tags": item.get('tags'),
-    #             "authors": item.get('authors'),
-    #             "thumbnail": item.get('thumbnail'),
-    #             "slug": slug
-    #         })
-    # search_path = os.path.join(dir_name, f"{name_without_ext}_search{ext}")
-    # with open(search_path, 'w', encoding='utf-8') as f:
-    #     json.dump(search_items, f, ensure_ascii=False)
+    # The old flat dump of full items is replaced by a compact prefix-sharded inverted index
+    if search_dir:
+        write_search_index(categories, search_dir, compress=shard_compress)
 
     # 3. Write main file with metadata only (no items)
     meta_categories = []
@@ -200,14 +367,30 @@ def build(docs_dir, output_path, max_items_per_cat, months=3):
     with open(output_path, 'w', encoding='utf-8') as f:
         json.dump({"categories": meta_categories}, f, ensure_ascii=False, indent=2)
 
+    # 4. Sharded static output: bounded, content-hashed chunks per category/week
+    if shard_dir:
+        write_shards(categories, shard_dir, page_size=shard_page_size, compress=shard_compress)
+    return categories
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--docs-dir", default="docs/daily")
     ap.add_argument("--output", default="static/data/arxiv_daily.json")
     ap.add_argument("--max-items-per-cat", type=int, default=256)
     ap.add_argument("--months", type=int, default=3)
+    ap.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="解析缓存目录，传空字符串禁用")
+    ap.add_argument("--workers", type=int, default=None, help="并行构建分类的进程数（默认: min(CPU 核数, 分类数)）")
+    ap.add_argument("--shard-dir", default=None, help="实验性，尚未接入工作流与前端：输出分片静态数据的目录（例如 static/data/arxiv_daily）")
+    ap.add_argument("--shard-page-size", type=int, default=64, help="每个分片最多的条目数")
+    ap.add_argument("--shard-compress", default="gzip", help="分片预压缩格式，逗号分隔: gzip,br；传空字符串不压缩")
+    ap.add_argument("--search-dir", default=None, help="实验性，仅生成端（前端尚未读取）：输出预构建搜索索引的目录（例如 static/data/arxiv_search）")
     args = ap.parse_args()
-    build(args.docs_dir, args.output, args.max_items_per_cat, months=args.months)
+    if args.shard_dir and args.search_dir and os.path.realpath(args.shard_dir) == os.path.realpath(args.search_dir):
+        ap.error("--shard-dir 与 --search-dir 不能是同一目录（两者各自写 manifest.json 并清理过期文件）")
+    compress = tuple(c.strip() for c in args.shard_compress.split(',') if c.strip())
+    build(args.docs_dir, args.output, args.max_items_per_cat, months=args.months, cache_dir=args.cache_dir,
+          workers=args.workers, shard_dir=args.shard_dir, shard_page_size=args.shard_page_size,
+          shard_compress=compress, search_dir=args.search_dir)
     print(f"写入静态数据: {args.output}")
 
 if __name__ == "__main__":
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+论文语料的列式导出（Arrow IPC 文件，按 月份 / 分类 分区）
+下游脚本可直接内存映射扫描，无需重新解析 markdown 或查询数据库
+
+目录结构（hive 风格分区）:
+    <root>/month=YYYY-MM/category=cs_AI/papers.arrow
+
+写入按 link 合并（新行覆盖旧行；分类或月份变化时从原分区删除），每个 link 只出现在一个分区，
+分区内按日期降序排列
+需要 pyarrow: pip install pyarrow
+"""
+
+import os
+from collections import defaultdict
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+PARTITION_FILE = "papers.arrow"
+UNKNOWN_MONTH = "unknown"
+
+# 导出的列（tags 为字符串列表，其余为字符串）
+CORPUS_COLUMNS = (
+    "link", "title", "published_date", "category_slug", "tags", "institution", "authors", "thumbnail_url",
+)
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("列式导出需要 pyarrow: pip install pyarrow")
+
+
+def corpus_schema():
+    _require_pyarrow()
+    return pa.schema([
+        pa.field(c, pa.list_(pa.string()) if c == "tags" else pa.string()) for c in CORPUS_COLUMNS
+    ])
+
+
+def partition_of(row):
+    """(月份 'YYYY-MM', 分类)"""
+    day = str(row.get("published_date") or "")
+    month = day[:7] if len(day) >= 7 and day[4] == '-' else UNKNOWN_MONTH
+    return month, row.get("category_slug") or "unknown"
+
+
+def partition_path(root, month, category):
+    return os.path.join(root, f"month={month}", f"category={category}", PARTITION_FILE)
+
+
+def _normalize(row):
+    out = {}
+    for c in CORPUS_COLUMNS:
+        value = row.get(c)
+        if c == "tags":
+            out[c] = [str(t) for t in value] if isinstance(value, (list, tuple)) else []
+        else:
+            out[c] = None if value is None else str(value)
+    return out
+
+
+def read_partition(path, columns=None):
+    """内存映射读取一个分区文件（零拷贝），可只取部分列"""
+    _require_pyarrow()
+    with pa.memory_map(path, 'r') as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.select(list(columns)) if columns else table
+
+
+def _write_table(path, table):
+    """写入临时文件后 rename，读者不会看到写了一半的分区"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+
+
+def export_rows(rows, root):
+    """
+    把论文行（paper_writer.paper_to_row 的格式）合并写入对应分区
+
+    Returns:
+        int: 写入的分区数
+    """
+    _require_pyarrow()
+    schema = corpus_schema()
+    groups = defaultdict(list)
+    for row in rows:
+        if row.get("link"):
+            groups[partition_of(row)].append(_normalize(row))
+
+    # link 换了分区（例如迁移时归属的分类变化）时从其他分区删除旧行；只读取 link 列
+    target = {row["link"]: key for key, new_rows in groups.items() for row in new_rows}
+    for month, category, path in list_partitions(root):
+        links = read_partition(path, ["link"]).column("link").to_pylist()
+        if not any(target.get(link, (month, category)) != (month, category) for link in links):
+            continue
+        kept = [r for r in read_partition(path).to_pylist()
+                if target.get(r["link"], (month, category)) == (month, category)]
+        if kept:
+            _write_table(path, pa.Table.from_pylist(kept, schema=schema))
+        else:
+            os.remove(path)
+
+    for (month, category), new_rows in groups.items():
+        path = partition_path(root, month, category)
+        merged = {}
+        if os.path.exists(path):
+            for row in read_partition(path).to_pylist():
+                merged[row["link"]] = row
+        for row in new_rows:
+            merged[row["link"]] = row
+        ordered = sorted(merged.values(), key=lambda r: (r["published_date"] or "", r["link"]), reverse=True)
+        _write_table(path, pa.Table.from_pylist(ordered, schema=schema))
+    return len(groups)
+
+
+def list_partitions(root, categories=None, months=None):
+    """
+    Returns:
+        list: [(month, category, path)]，按月份降序（unknown 在最后）、分类升序
+    """
+    found = []
+    if not os.path.isdir(root):
+        return found
+    for month_dir in os.listdir(root):
+        if not month_dir.startswith("month="):
+            continue
+        month = month_dir[len("month="):]
+        if months and month not in months:
+            continue
+        for cat_dir in os.listdir(os.path.join(root, month_dir)):
+            if not cat_dir.startswith("category="):
+                continue
+            category = cat_dir[len("category="):]
+            if categories and category not in categories:
+                continue
+            path = os.path.join(root, month_dir, cat_dir, PARTITION_FILE)
+            if os.path.exists(path):
+                found.append((month, category, path))
+    found.sort(key=lambda p: p[1])
+    found.sort(key=lambda p: (p[0] != UNKNOWN_MONTH, p[0]), reverse=True)
+    return found
+
+
+def scan(root, categories=None, months=None, columns=None):
+    """
+    扫描语料（按目录名裁剪分区），返回合并后的 pyarrow.Table
+    """
+    _require_pyarrow()
+    tables = [read_partition(path, columns) for _, _, path in list_partitions(root, categories, months)]
+    if not tables:
+        schema = corpus_schema()
+        return schema.empty_table().select(list(columns)) if columns else schema.empty_table()
+    return pa.concat_tables(tables)
+
+
+def latest(root, categories, limit=3, columns=None):
+    """
+    指定分类中日期最新的 limit 篇；按月份从新到旧读取分区，凑够后不再读取更旧的月份
+
+    Returns:
+        list: 行 dict
+    """
+    partitions = list_partitions(root, categories)
+    rows = []
+    i = 0
+    while i < len(partitions):
+        month = partitions[i][0]
+        while i < len(partitions) and partitions[i][0] == month:
+            rows.extend(read_partition(partitions[i][2], columns and set(columns) | {"published_date"}).to_pylist())
+            i += 1
+        if len(rows) >= limit:
+            break
+    rows.sort(key=lambda r: r["published_date"] or "", reverse=True)
+    rows = rows[:limit]
+    if columns:
+        rows = [{c: r.get(c) for c in columns} for r in rows]
+    return rows
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件指纹清单
+记录 路径 -> mtime/size/内容哈希（以及调用方附加的数据），用于只处理发生变化的文件
+mtime/size 相同直接视为未变；不同时再比对内容哈希（git checkout 会重置 mtime）
+"""
+
+import hashlib
+import json
+import os
+
+
+def file_stat(path):
+    """返回文件的 mtime_ns 与 size"""
+    st = os.stat(path)
+    return {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def content_hash(data):
+    """内容哈希（bytes 或 str）"""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha1(data).hexdigest()
+
+
+def row_hash(row):
+    """单行数据的稳定哈希，用于行级增量比较"""
+    return content_hash(json.dumps(row, ensure_ascii=False, sort_keys=True, default=str))
+
+
+class FileManifest:
+    def __init__(self, path, version=1, load=True):
+        """
+        Args:
+            path (str): 清单 JSON 路径
+            version (int): 格式版本，与文件内不一致时整体作废（例如解析逻辑变化）
+            load (bool): 为 False 时不读取已有清单，由调用方填入需要的条目
+        """
+        self.path = path
+        self.version = version
+        self.files = {}
+        # 调用方的非文件数据（例如按分类缓存的构建结果），随清单一同保存/作废
+        self.extra = {}
+        if load and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    payload = json.load(f)
+                if payload.get("version") == version:
+                    self.files = payload.get("files", {})
+                    self.extra = payload.get("extra", {})
+            except Exception as e:
+                print(f"读取清单 {path} 失败，将全部重新处理: {e}")
+
+    def get(self, key):
+        return self.files.get(key)
+
+    def stat_unchanged(self, key, stat):
+        """mtime 与 size 都未变化"""
+        entry = self.files.get(key)
+        return bool(entry) and entry.get("mtime_ns") == stat["mtime_ns"] and entry.get("size") == stat["size"]
+
+    def hash_unchanged(self, key, sha1):
+        entry = self.files.get(key)
+        return bool(entry) and entry.get("sha1") == sha1
+
+    def set(self, key, stat, sha1, **extra):
+        """记录文件的最新指纹与附加数据（覆盖旧附加数据）"""
+        self.files[key] = {"mtime_ns": stat["mtime_ns"], "size": stat["size"], "sha1": sha1, **extra}
+
+    def touch(self, key, stat):
+        """内容未变但 mtime 变化时只更新 stat，保留附加数据"""
+        entry = self.files.setdefault(key, {})
+        entry["mtime_ns"] = stat["mtime_ns"]
+        entry["size"] = stat["size"]
+
+    def prune(self, keep_keys):
+        """删除已不存在的文件条目，返回被删除的键"""
+        keep = set(keep_keys)
+        removed = [k for k in self.files if k not in keep]
+        for k in removed:
+            del self.files[k]
+        return removed
+
+    def save(self):
+        """原子写入（临时文件 + rename）"""
+        dir_name = os.path.dirname(self.path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.version, "files": self.files, "extra": self.extra}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -13,17 +13,33 @@ import csv
 import os
 import re
 import tempfile
+import threading
+import time
 from datetime import datetime, timedelta
+from functools import lru_cache
 from openai import OpenAI
 import concurrent.futures
 from tqdm import tqdm
 from bs4 import BeautifulSoup
 import sys
-from supabase import create_client, Client
-
-# Supabase 配置
+from paper_journal import PaperJournal, DEFAULT_JOURNAL_PATH
+from paper_writer import PaperPersistWriter, paper_to_row
+from paper_store import open_store
+from columnar_export import export_rows
+from weekly_md import WeeklyFile
+from mdx_text import clean_latex, escape_mdx, render_title
+from processed_dates import open_processed, STARTED, PARTIAL, DONE
+from pipeline_metrics import PipelineMetrics
+from pdf_figures import PdfScan
+from thumbnail_profiles import (ThumbnailProfile, THUMBNAIL_PROFILES, DEFAULT_THUMBNAIL_PROFILE, THUMBNAIL_VARIANT_WIDTHS,
+                                available_profiles, get_profile, variant_widths, encode_image, encode_variants,
+                                thumbnail_key)
+from sampling_profiler import SamplingProfiler, DEFAULT_INTERVAL, stage_totals
+
+# Supabase 配置（设置 PAPER_STORE_URL 时改用本地后端，见 paper_store.py）
 SUPABASE_URL = os.environ.get("SUPABASE_URL")
 SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY") or os.environ.get("SUPABASE_ANON_KEY")
+PAPER_STORE_URL = os.environ.get("PAPER_STORE_URL")
 
 
 # PDF处理相关
@@ -35,23 +51,17 @@ except ImportError:
     print("警告: PyPDF2未安装，无法处理PDF文件。请运行: pip install PyPDF2")
 
 def already_processed(date_str, filename="arxiv_date.txt"):
-    """检查 arxiv_date.txt 当前日期是否已处理过（date_str: yyyy-mm-dd）"""
-    if not os.path.exists(filename):
-        return False
+    """检查 arxiv_date.txt 当前日期是否已处理完成（date_str: yyyy-mm-dd），started/partial 不算完成"""
     try:
-        with open(filename, "r") as f:
-            lines = f.readlines()
-            yyyymmdd_list = set(line.strip() for line in lines if line.strip())
-        return date_str.replace('-', '') in yyyymmdd_list
+        return open_processed(filename).is_done(date_str)
     except Exception as e:
         print(f"读取 {filename} 错误: {e}")
         return False
 
-def append_to_processed(date_str, filename="arxiv_date.txt"):
-    """处理完成后追加日期到 arxiv_date.txt（date_str: yyyy-mm-dd）"""
+def append_to_processed(date_str, filename="arxiv_date.txt", status=DONE, papers=None, seconds=None):
+    """记录日期处理状态到 arxiv_date.txt（date_str: yyyy-mm-dd），默认标记为完成"""
     try:
-        with open(filename, "a") as f:
-            f.write(date_str.replace('-', '') + "\n")
+        open_processed(filename).mark(date_str, status=status, papers=papers, seconds=seconds)
     except Exception as e:
         print(f"写入 {filename} 错误: {e}")
 
@@ -115,26 +125,44 @@ def extract_date_from_html(html_content=None, url="https://arxiv.org/list/cs/new
         return None
 
 class CompletePaperProcessor:
-    def __init__(self, docs_daily_path="docs/daily", temp_dir="temp_pdfs", enable_thumbnails=False, enable_llm=True):
+    def __init__(self, docs_daily_path="docs/daily", temp_dir="temp_pdfs", enable_thumbnails=False, enable_llm=True, journal_path=None, metrics=None,
+                 thumbnail_profile=None, thumbnail_widths=THUMBNAIL_VARIANT_WIDTHS):
         """
         初始化完整的论文处理器
         
         Args:
             docs_daily_path (str): daily文件夹路径
             temp_dir (str): 临时PDF存储目录
+            journal_path (str): 工作日志路径，提供时启用断点续跑
+            metrics (PipelineMetrics): 分阶段计时统计，默认新建
+            thumbnail_profile (str): 缩略图编码档位（见 thumbnail_profiles.py），默认 fast
+            thumbnail_widths (tuple): 多分辨率缩略图宽度，超过档位宽度的忽略，档位宽度总会生成
         """
         self.docs_daily_path = docs_daily_path
         self.temp_dir = temp_dir
         self.enable_thumbnails = enable_thumbnails
+        self.thumbnail_profile = get_profile(thumbnail_profile)
+        self.thumbnail_widths = variant_widths(self.thumbnail_profile, thumbnail_widths)
         self.enable_llm = enable_llm
         self.ensure_directories()
+
+        # 工作日志（可选）：记录每篇论文的阶段完成情况
+        self.journal = PaperJournal(journal_path) if journal_path else None
+        # 各阶段耗时、字节数、token 数
+        self.metrics = metrics or PipelineMetrics()
+        # 论文存储后端，首次写入时按环境变量打开
+        self._store = None
+        # R2 客户端，首次上传时创建，各线程共用（(client, bucket, public_url)，未配置时为 False）
+        self._r2 = None
+        self._r2_lock = threading.Lock()
         
         # 初始化OpenAI客户端
         self.client = None
         if self.enable_llm:
             self.client = OpenAI(
                 api_key=os.environ.get('DEEPSEEK_API_KEY'),
-                base_url="https://api.deepseek.com"
+                # 可指向兼容 OpenAI 接口的其他服务（如离线基准测试的本地模拟服务）
+                base_url=os.environ.get('DEEPSEEK_BASE_URL') or "https://api.deepseek.com"
             )
     
     def ensure_directories(self):
@@ -412,18 +440,21 @@ class CompletePaperProcessor:
 
     def download_pdf(self, pdf_url, filename):
         """下载PDF文件"""
-        try:
-            response = requests.get(pdf_url, timeout=30)
-            response.raise_for_status()
-            
-            filepath = os.path.join(self.temp_dir, filename)
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
-            
-            return filepath
-        except Exception as e:
-            print(f"下载PDF失败 {pdf_url}: {e}")
-            return None
+        with self.metrics.stage("download") as st:
+            try:
+                response = requests.get(pdf_url, timeout=30)
+                response.raise_for_status()
+                st.add("bytes", len(response.content))
+
+                filepath = os.path.join(self.temp_dir, filename)
+                with open(filepath, 'wb') as f:
+                    f.write(response.content)
+
+                return filepath
+            except Exception as e:
+                st.fail()
+                print(f"下载PDF失败 {pdf_url}: {e}")
+                return None
 
     def extract_first_image(self, pdf_path):
         try:
@@ -459,14 +490,14 @@ class CompletePaperProcessor:
             print(f"提取图片失败: {e}")
             return None, None
 
-    def render_first_page(self, pdf_path, max_width=640):
+    def render_first_page(self, pdf_path, max_width=640, scan=None):
         """将PDF第一页渲染为位图，返回(png字节, 'png')"""
         try:
             import fitz  # PyMuPDF
-            doc = fitz.open(pdf_path)
-            if len(doc) == 0:
+            scan = scan or PdfScan.open(pdf_path)
+            if scan.page_count == 0:
                 return None, None
-            page = doc.load_page(0)
+            page = scan.page(0)
             width = page.rect.width or 1.0
             zoom = max_width / width
             mat = fitz.Matrix(zoom, zoom)
@@ -476,24 +507,23 @@ class CompletePaperProcessor:
             print(f"将PDF第一页渲染为位图 渲染页面失败: {e}")
             return None, None
 
-    def render_best_page(self, pdf_path, max_width=640):
+    def render_best_page(self, pdf_path, max_width=640, scan=None):
         try:
             import fitz
-            doc = fitz.open(pdf_path)
-            if len(doc) == 0:
+            scan = scan or PdfScan.open(pdf_path)
+            if scan.page_count == 0:
                 return None, None
             best_total = -1
             best_index = 0
-            for i in range(len(doc)):
-                page = doc.load_page(i)
-                imgs = page.get_images(full=True)
+            for i in range(scan.page_count):
+                imgs = scan.images(i)
                 total = 0
                 for im in imgs:
                     total += (im[2] or 0) * (im[3] or 0)
                 if total > best_total:
                     best_total = total
                     best_index = i
-            page = doc.load_page(best_index)
+            page = scan.page(best_index)
             w = page.rect.width or 1.0
             z = max_width / w
             mat = fitz.Matrix(z, z)
@@ -503,129 +533,63 @@ class CompletePaperProcessor:
             print(f"渲染页面失败: {e}")
             return None, None
 
-    def render_largest_image_region(self, pdf_path, max_width=640):
+    def render_largest_image_region(self, pdf_path, max_width=640, scan=None):
+        """渲染面积最大的图片区域；先在前几页中找，前几页没有合适图片时才扫描全文（见 PdfScan.largest_image）"""
         try:
-            import fitz
-            doc = fitz.open(pdf_path)
-            best = None
-            for i in range(len(doc)):
-                page = doc.load_page(i)
-                images = page.get_images(full=True)
-                for im in images:
-                    xref = im[0]
-                    rects = page.get_image_rects(xref)
-                    for r in rects:
-                        w = r.width
-                        h = r.height
-                        if w < 256 or h < 256:
-                            continue
-                        ar = w / h if h else 0
-                        if ar < 0.4 or ar > 2.5:
-                            continue
-                        area = w * h
-                        if best is None or area > best[0]:
-                            best = (area, i, r)
+            scan = scan or PdfScan.open(pdf_path)
+            best = scan.largest_image()
             if not best:
                 return None, None
-            _, page_index, rect = best
-            page = doc.load_page(page_index)
-            w = rect.width or 1.0
-            z = max_width / w
-            mat = fitz.Matrix(z, z)
-            pix = page.get_pixmap(matrix=mat, alpha=False, clip=rect)
-            return pix.tobytes("png"), "png"
+            page_index, rect = best
+            return scan.render_clip(page_index, rect, max_width), "png"
         except Exception as e:
             print(f"渲染区域失败: {e}")
             return None, None
 
-    def render_figure_region_by_caption(self, pdf_path, figure_no=1, max_width=640):
+    def render_figure_region_by_caption(self, pdf_path, figure_no=1, max_width=640, scan=None):
         try:
-            import fitz, re
-            doc = fitz.open(pdf_path)
-            patts = [fr"figure\s*{figure_no}\b", fr"fig\.\s*{figure_no}\b"]
-            for i in range(len(doc)):
-                page = doc.load_page(i)
-                blocks = page.get_text("blocks") or []
-                captions = []
-                for b in blocks:
-                    if not isinstance(b, (list, tuple)) or len(b) < 5:
-                        continue
-                    x0, y0, x1, y1, txt = b[0], b[1], b[2], b[3], b[4] if len(b) > 4 else ""
-                    t = (txt or "").lower()
-                    if any(re.search(p, t) for p in patts):
-                        captions.append((x0, y0, x1, y1))
+            scan = scan or PdfScan.open(pdf_path)
+            for i in range(scan.page_count):
+                # 提到 "figure N" / "fig. N" 的文本块（图注索引见 PdfScan.captions）
+                captions = scan.captions(i).mentions.get(str(figure_no))
                 if not captions:
                     continue
-                images = page.get_images(full=True)
                 candidates = []
-                for im in images:
-                    xref = im[0]
-                    rects = page.get_image_rects(xref)
-                    for r in rects:
-                        w = r.width
-                        h = r.height
-                        if w < 256 or h < 256:
-                            continue
-                        ar = w / h if h else 0
-                        if ar < 0.4 or ar > 2.5:
-                            continue
-                        for (cx0, cy0, cx1, cy1) in captions:
-                            overlap_x = max(0, min(r.x1, cx1) - max(r.x0, cx0))
-                            base_w = min((cx1 - cx0) or 1.0, (r.x1 - r.x0) or 1.0)
-                            ratio = overlap_x / base_w
-                            dy = min(abs(r.y0 - cy1), abs(cy0 - r.y1))
-                            score = (ratio * 1000) - dy
-                            candidates.append((score, i, r))
+                for r in scan.image_candidates(i):
+                    for (cx0, cy0, cx1, cy1) in captions:
+                        overlap_x = max(0, min(r.x1, cx1) - max(r.x0, cx0))
+                        base_w = min((cx1 - cx0) or 1.0, (r.x1 - r.x0) or 1.0)
+                        ratio = overlap_x / base_w
+                        dy = min(abs(r.y0 - cy1), abs(cy0 - r.y1))
+                        score = (ratio * 1000) - dy
+                        candidates.append((score, i, r))
                 if candidates:
                     candidates.sort(key=lambda x: x[0], reverse=True)
                     _, page_index, rect = candidates[0]
-                    page2 = doc.load_page(page_index)
-                    w = rect.width or 1.0
-                    z = max_width / w
-                    mat = fitz.Matrix(z, z)
-                    pix = page2.get_pixmap(matrix=mat, alpha=False, clip=rect)
-                    return pix.tobytes("png"), "png"
+                    return scan.render_clip(page_index, rect, max_width), "png"
             return None, None
         except Exception as e:
             print(f"按标题渲染失败: {e}")
             return None, None
 
-    def render_figure_union_region_by_caption(self, pdf_path, figure_no=1, max_width=640, search_height=500, padding=5):
+    def render_figure_union_region_by_caption(self, pdf_path, figure_no=1, max_width=640, search_height=500, padding=5, scan=None):
         try:
-            import fitz, re
-            doc = fitz.open(pdf_path)
-            patt = re.compile(rf"^(figure|fig\.?)[\s]*{figure_no}[:.]", re.I)
-            for i in range(len(doc)):
-                page = doc.load_page(i)
-                blocks = page.get_text("blocks") or []
-                blocks.sort(key=lambda b: b[1] if len(b) > 1 else 0)
-                caption_rect = None
-                for b in blocks:
-                    if not isinstance(b, (list, tuple)) or len(b) < 5:
-                        continue
-                    txt = (b[4] or "").strip()
-                    if patt.match(txt):
-                        caption_rect = fitz.Rect(b[0], b[1], b[2], b[3])
-                        break
+            import fitz
+            scan = scan or PdfScan.open(pdf_path)
+            for i in range(scan.page_count):
+                # 页面上最靠上的、以 "Figure N:" / "Fig. N." 开头的文本块
+                caption_rect = scan.captions(i).headings.get(str(figure_no))
                 if not caption_rect:
                     continue
+                page = scan.page(i)
                 search_bottom = caption_rect.y0
                 search_top = max(0, search_bottom - float(search_height))
-                rects = []
-                try:
-                    drawings = page.get_drawings() or []
-                except Exception:
-                    drawings = []
-                for d in drawings:
-                    r = d.get("rect")
-                    if not r:
-                        continue
-                    if r.y1 <= search_bottom + 10 and r.y0 >= search_top:
-                        if r.width > 5 or r.height > 5:
-                            rects.append(fitz.Rect(r.x0, r.y0, r.x1, r.y1))
+                # 图注上方区间内矢量路径的并集（区间索引，不逐条遍历整页路径）
+                drawn = scan.drawings(i).union(search_top, search_bottom + 10)
+                rects = [drawn] if drawn is not None else []
                 images_added = False
                 try:
-                    infos = page.get_image_info() or []
+                    infos = scan.image_infos(i)
                     for info in infos:
                         bb = info.get("bbox")
                         if not bb:
@@ -637,13 +601,9 @@ class CompletePaperProcessor:
                 except Exception:
                     pass
                 if not images_added:
-                    images = page.get_images(full=True)
-                    for im in images:
-                        xref = im[0]
-                        rlist = page.get_image_rects(xref)
-                        for r in rlist:
-                            if r.y1 <= search_bottom + 10 and r.y0 >= search_top:
-                                rects.append(r)
+                    for r in scan.image_rects(i):
+                        if r.y1 <= search_bottom + 10 and r.y0 >= search_top:
+                            rects.append(r)
                 if not rects:
                     continue
                 final_rect = rects[0]
@@ -666,35 +626,56 @@ class CompletePaperProcessor:
             print(f"按标题联合渲染失败: {e}")
             return None, None
 
-    def upload_to_r2(self, image_bytes, ext="webp"):
-        """上传字节到Cloudflare R2，返回公共URL或None"""
+    def get_r2(self):
+        """进程内共用的 R2 客户端（boto3 客户端线程安全，但并发创建不安全），返回 (client, bucket, public_url) 或 None"""
+        with self._r2_lock:
+            if self._r2 is None:
+                import boto3
+                from botocore.config import Config
+
+                endpoint = os.environ.get("R2_ENDPOINT_URL")
+                access_key = os.environ.get("R2_ACCESS_KEY_ID")
+                secret_key = os.environ.get("R2_SECRET_ACCESS_KEY")
+                bucket = os.environ.get("R2_BUCKET")
+                public_url = os.environ.get("R2_PUBLIC_URL")
+
+                if not all([endpoint, access_key, secret_key, bucket, public_url]):
+                    print("R2环境变量未配置完整，跳过上传")
+                    self._r2 = False
+                else:
+                    s3 = boto3.session.Session().client(
+                        "s3",
+                        region_name="auto",
+                        endpoint_url=endpoint,
+                        aws_access_key_id=access_key,
+                        aws_secret_access_key=secret_key,
+                        config=Config(signature_version="s3v4", max_pool_connections=32),
+                    )
+                    self._r2 = (s3, bucket, public_url)
+            return self._r2 or None
+
+    def upload_to_r2(self, image_bytes, ext="webp", profile=None, key=None):
+        """上传字节到Cloudflare R2，返回公共URL或None；对象键默认为 内容哈希 + 编码档位（默认为处理器的档位）"""
+        with self.metrics.stage("r2_upload") as st:
+            url = self._upload_to_r2(image_bytes, ext, profile or self.thumbnail_profile, key)
+            if url:
+                st.add("bytes", len(image_bytes))
+            else:
+                st.fail()
+            return url
+
+    def _upload_to_r2(self, image_bytes, ext, profile, key):
         try:
-            import boto3
-            from botocore.config import Config
             import hashlib
-            import os as _os
 
-            endpoint = _os.environ.get("R2_ENDPOINT_URL")
-            access_key = _os.environ.get("R2_ACCESS_KEY_ID")
-            secret_key = _os.environ.get("R2_SECRET_ACCESS_KEY")
-            bucket = _os.environ.get("R2_BUCKET")
-            public_url = _os.environ.get("R2_PUBLIC_URL")
-
-            if not all([endpoint, access_key, secret_key, bucket, public_url]):
-                print("R2环境变量未配置完整，跳过上传")
+            r2 = self.get_r2()
+            if not r2:
                 return None
+            s3, bucket, public_url = r2
 
-            s3 = boto3.client(
-                "s3",
-                region_name="auto",
-                endpoint_url=endpoint,
-                aws_access_key_id=access_key,
-                aws_secret_access_key=secret_key,
-                config=Config(signature_version="s3v4"),
-            )
-
-            hash_str = hashlib.sha256(image_bytes).hexdigest()
-            key = f"thumbnails/{hash_str}_w640_q70.{ext}"
+            if key is None:
+                hash_str = hashlib.sha256(image_bytes).hexdigest()
+                key = thumbnail_key(hash_str, profile._replace(ext=ext))
             content_type = f"image/{'jpeg' if ext == 'jpg' else ext}"
 
             s3.put_object(
@@ -711,27 +692,61 @@ class CompletePaperProcessor:
             return None
 
     def convert_to_webp(self, image_bytes, max_width=640, quality=70):
-        """将任意图片字节转换为WEBP指定宽度与质量，返回bytes"""
-        try:
-            from PIL import Image
-            import io
-            buf = io.BytesIO(image_bytes)
-            img = Image.open(buf)
-            if img.mode in ("RGBA", "P"):
-                img = img.convert("RGB")
-            w, h = img.size
-            if w > max_width:
-                scale = max_width / float(w)
-                img = img.resize((int(w * scale), int(h * scale)), Image.LANCZOS)
-            out = io.BytesIO()
-            img.save(out, format="WEBP", quality=quality, method=6)
-            return out.getvalue(), "webp"
-        except Exception as e:
-            print(f"WEBP转换失败: {e}")
-            return None, None
+        """将任意图片字节转换为WEBP指定宽度与质量（method=6），返回bytes"""
+        profile = ThumbnailProfile("webp", "WEBP", "webp", max_width, {"quality": quality, "method": 6})
+        return self.encode_thumbnail(image_bytes, profile)
+
+    def encode_thumbnail(self, image_bytes, profile=None):
+        """按编码档位（默认为处理器的档位）编码图片字节，返回(bytes, 扩展名)"""
+        profile = profile or self.thumbnail_profile
+        with self.metrics.stage("encode") as st:
+            try:
+                out = encode_image(image_bytes, profile)
+            except Exception as e:
+                print(f"{profile.format}转换失败: {e}")
+                st.fail()
+                return None, None
+            st.add("bytes_in", len(image_bytes))
+            st.add("bytes_out", len(out))
+            return out, profile.ext
+
+    def upload_thumbnail_variants(self, image_bytes, profile=None):
+        """
+        同一次渲染结果缩小为 self.thumbnail_widths 中的各宽度，编码后并发上传
+        各宽度共用渲染结果的哈希作为对象键前缀：thumbnails/<哈希>_w<宽度>_<档位>.<扩展名>
+
+        Returns:
+            dict: {宽度字符串: URL}，只包含上传成功的宽度
+        """
+        import hashlib
+        profile = profile or self.thumbnail_profile
+        with self.metrics.stage("encode") as st:
+            try:
+                variants = encode_variants(image_bytes, self.thumbnail_widths, profile)
+            except Exception as e:
+                print(f"{profile.format}转换失败: {e}")
+                st.fail()
+                return {}
+            st.add("bytes_in", len(image_bytes))
+            st.add("bytes_out", sum(len(data) for _, data in variants))
+            st.add("variants", len(variants))
+        digest = hashlib.sha256(image_bytes).hexdigest()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(variants)) as pool:
+            futures = {
+                width: pool.submit(self.upload_to_r2, data, profile.ext, profile, thumbnail_key(digest, profile, width))
+                for width, data in variants
+            }
+            urls = {str(width): future.result() for width, future in futures.items()}
+        return {width: url for width, url in urls.items() if url}
 
     def extract_first_page_text(self, pdf_path):
         """提取PDF第一页的文本内容"""
+        with self.metrics.stage("extract_text") as st:
+            text = self._extract_first_page_text(pdf_path)
+            st.add("chars", len(text))
+            return text
+
+    def _extract_first_page_text(self, pdf_path):
         if not PDF_AVAILABLE:
             return "PDF处理库未安装"
         
@@ -813,14 +828,19 @@ graph TB
 ```
 """
         try:
-            response = self.client.chat.completions.create(
-                model="deepseek-chat",
-                messages=[
-                    {"role": "system", "content": "You are a helpful assistant. You are good at summarizing papers and extracting keywords and institutions."},
-                    {"role": "user", "content": prompt}
-                ],
-                stream=False
-            )
+            with self.metrics.stage("llm") as st:
+                response = self.client.chat.completions.create(
+                    model="deepseek-chat",
+                    messages=[
+                        {"role": "system", "content": "You are a helpful assistant. You are good at summarizing papers and extracting keywords and institutions."},
+                        {"role": "user", "content": prompt}
+                    ],
+                    stream=False
+                )
+                usage = getattr(response, "usage", None)
+                if usage:
+                    st.add("prompt_tokens", usage.prompt_tokens or 0)
+                    st.add("completion_tokens", usage.completion_tokens or 0)
             result = response.choices[0].message.content.strip()
             
             # 解析结果
@@ -894,6 +914,23 @@ graph TB
             print(f"API调用失败: {e}")
             return "", "", [], "", "", "", "", ""
 
+    def _process_paper_timed(self, paper):
+        """单篇论文端到端耗时（阶段名 paper），各子阶段另行计时"""
+        with self.metrics.stage("paper"):
+            return self.process_single_paper(paper)
+
+    def _render_thumbnail(self, strategy, render, *args, **kwargs):
+        """按策略计时渲染缩略图（阶段名 thumbnail.<策略>），未产出图片记为 miss"""
+        with self.metrics.stage(f"thumbnail.{strategy}") as st:
+            img_bytes, ext = render(*args, **kwargs)
+            st.add("hits" if img_bytes else "misses")
+            if img_bytes:
+                st.add("bytes", len(img_bytes))
+            return img_bytes, ext
+
+    # 分析阶段写入的字段，用于断点续跑时恢复
+    ANALYSIS_FIELDS = ('tag1', 'tag2', 'tag3', 'institution', 'code', 'contributions', 'llm_summary', 'mermaid')
+
     def process_single_paper(self, paper):
         categories = paper.get('categories', []) or []
         title = paper.get('title', '')
@@ -901,6 +938,26 @@ graph TB
         summary = paper.get('summary', '')
         pdf_link = paper.get('pdf_link', '')
         print(f"处理论文: {title}")
+
+        # 查询工作日志，恢复之前已完成的阶段
+        run_date = paper.get('published', '')
+        paper_id = paper.get('id', '')
+        done, journal_pdf_path, snapshot = set(), None, {}
+        if self.journal:
+            done, journal_pdf_path, snapshot = self.journal.load(run_date, paper_id)
+            paper.update(snapshot)
+            if 'persisted' in done:
+                print(f"跳过论文 {title}: 已在上次运行中完成")
+                paper['persisted'] = True
+                return paper
+        need_analysis = 'analyzed' not in done
+        need_thumbnail = self.enable_thumbnails and 'thumbnailed' not in done
+
+        if not need_analysis and not need_thumbnail:
+            print(f"恢复论文 {title}: 分析与缩略图均已完成")
+            paper['is_interested'] = True
+            paper['simple_only'] = False
+            return paper
         
         # 下载PDF
         if not pdf_link or pdf_link == 'N/A':
@@ -911,60 +968,93 @@ graph TB
         # 生成PDF文件名
         pdf_filename = f"{paper.get('id', '').split('/')[-1]}.pdf"
         
-        # 下载PDF
-        pdf_path = self.download_pdf(pdf_link, pdf_filename)
+        # 下载PDF（若上次已下载且文件仍在则复用）
+        if 'downloaded' in done and journal_pdf_path and os.path.exists(journal_pdf_path):
+            pdf_path = journal_pdf_path
+        else:
+            pdf_path = self.download_pdf(pdf_link, pdf_filename)
+            if pdf_path and self.journal:
+                self.journal.record(run_date, paper_id, 'downloaded', pdf_path=pdf_path)
         if not pdf_path:
             print(f"跳过论文 {title}: PDF下载失败")
             paper['is_interested'] = True
             return paper
         
-        # 提取第一页文本
-        first_page_text = self.extract_first_page_text(pdf_path)
-
-        # 调用API获取标签、机构，并获取LLM总结（可禁用以节省token）
-        if self.enable_llm:
-            tag1, tag2, tag3_list, institution, code, contributions, llm_summary, mermaid = self.call_api_for_tags_institution_interest(
-                title, summary, first_page_text
-            )
-        else:
-            tag1, tag2, tag3_list, institution, code, contributions, llm_summary, mermaid = "", "", [], "TBD", "", "", title, ""
+        if need_analysis:
+            # 提取第一页文本
+            first_page_text = self.extract_first_page_text(pdf_path)
+
+            # 调用API获取标签、机构，并获取LLM总结（可禁用以节省token）
+            if self.enable_llm:
+                tag1, tag2, tag3_list, institution, code, contributions, llm_summary, mermaid = self.call_api_for_tags_institution_interest(
+                    title, summary, first_page_text
+                )
+            else:
+                tag1, tag2, tag3_list, institution, code, contributions, llm_summary, mermaid = "", "", [], "TBD", "", "", title, ""
+
+            # 更新论文信息
+            paper['tag1'] = tag1
+            paper['tag2'] = tag2
+            paper['tag3'] = ', '.join(tag3_list)
+            paper['institution'] = institution
+            paper['code'] = code
+            paper['contributions'] = contributions
+            paper['llm_summary'] = llm_summary
+            paper['mermaid'] = mermaid
+            # API 调用失败时返回全空结果，不记录阶段以便重跑时重试
+            if self.journal and (not self.enable_llm or tag1 or llm_summary):
+                self.journal.record(run_date, paper_id, 'analyzed',
+                                    paper={k: paper.get(k) for k in self.ANALYSIS_FIELDS})
         
         # 生成缩略图（可选）
-        thumbnail_url = None
-        try:
-            if self.enable_thumbnails and pdf_path:
+        if need_thumbnail:
+            thumbnail_url = None
+            variants = {}
+            # 确定不会有缩略图（找不到可用的图、未配置 R2）时同样记为完成，重跑不再下载扫描PDF
+            no_thumbnail = False
+            scan = None
+            try:
+                # 各策略共用一次打开的文档与按页缓存的图片信息
+                scan = PdfScan.open(pdf_path)
+                # 直接按档位宽度渲染，编码前无需缩放
+                width = self.thumbnail_profile.width
                 # img_bytes, ext = self.extract_first_image(pdf_path)
                 # if not img_bytes:
-                img_bytes, ext = self.render_figure_union_region_by_caption(pdf_path, figure_no=1)
+                img_bytes, ext = self._render_thumbnail("union_caption", self.render_figure_union_region_by_caption, pdf_path, figure_no=1, max_width=width, scan=scan)
                 if not img_bytes:
-                    img_bytes, ext = self.render_figure_region_by_caption(pdf_path, figure_no=1)
+                    img_bytes, ext = self._render_thumbnail("caption", self.render_figure_region_by_caption, pdf_path, figure_no=1, max_width=width, scan=scan)
                 if not img_bytes:
-                    img_bytes, ext = self.render_largest_image_region(pdf_path)
+                    img_bytes, ext = self._render_thumbnail("largest_image", self.render_largest_image_region, pdf_path, max_width=width, scan=scan)
                 if not img_bytes:
-                    img_bytes, ext = self.render_best_page(pdf_path)
+                    img_bytes, ext = self._render_thumbnail("best_page", self.render_best_page, pdf_path, max_width=width, scan=scan)
                 if img_bytes:
-                    if (ext or "").lower() != "webp":
-                        converted, cext = self.convert_to_webp(img_bytes)
-                        if converted:
-                            img_bytes, ext = converted, cext
-                    thumbnail_url = self.upload_to_r2(img_bytes, ext or "webp")
-        except Exception as _e:
-            print(f"生成缩略图失败: {_e}")
-
-        # 更新论文信息
-        paper['tag1'] = tag1
-        paper['tag2'] = tag2
-        paper['tag3'] = ', '.join(tag3_list)
-        paper['institution'] = institution
-        paper['code'] = code
-        paper['contributions'] = contributions
+                    variants = self.upload_thumbnail_variants(img_bytes)
+                    # thumbnail 保持为最大宽度的图（markdown、thumbnail_url 列沿用）
+                    if variants:
+                        thumbnail_url = variants[max(variants, key=int)]
+                    elif not self.get_r2():
+                        no_thumbnail = True
+                else:
+                    # 各策略对同一PDF的结果是确定的，重试也找不到
+                    no_thumbnail = True
+            except Exception as _e:
+                print(f"生成缩略图失败: {_e}")
+            finally:
+                if scan:
+                    scan.close()
+            if thumbnail_url:
+                paper['thumbnail'] = thumbnail_url
+                paper['thumbnail_variants'] = variants
+                if self.journal:
+                    self.journal.record(run_date, paper_id, 'thumbnailed',
+                                        paper={'thumbnail': thumbnail_url, 'thumbnail_variants': variants})
+            elif no_thumbnail and self.journal:
+                self.journal.record(run_date, paper_id, 'thumbnailed')
+            # 其余情况（打开/渲染出错、上传失败）不记录阶段，重跑时重试（与分析阶段一致）
+
         # 所有 cs.DC 都输出
         paper['is_interested'] = True
-        paper['llm_summary'] = llm_summary
-        paper['mermaid'] = mermaid
         paper['simple_only'] = False
-        if thumbnail_url:
-            paper['thumbnail'] = thumbnail_url
         
         # 清理临时PDF文件
         try:
@@ -972,7 +1062,7 @@ graph TB
         except:
             pass
         
-        print(f"完成论文 {title}: tag1={tag1}, tag2={tag2}, institution={institution}")
+        print(f"完成论文 {title}: tag1={paper.get('tag1')}, tag2={paper.get('tag2')}, institution={paper.get('institution')}")
         return paper
     
     # ==================== Markdown文件处理功能 ====================
@@ -993,8 +1083,10 @@ graph TB
             print(f"日期格式错误: {e}")
             return None
     
-    def get_arxiv_prefix(self, date_str):
-        """根据日期获取类似[arXiv251027]的字符串"""
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def get_arxiv_prefix(date_str):
+        """根据日期获取类似[arXiv251027]的字符串（一次运行只涉及少数几个日期，缓存避免每篇都 strptime）"""
         try:
             dt = datetime.strptime(date_str, '%Y-%m-%d')
             prefix = f"[arXiv{str(dt.year)[-2:]}{dt.month:02d}{dt.day:02d}]"
@@ -1006,6 +1098,8 @@ graph TB
         """
         清理标题中的 LaTeX 语法，转换为 Markdown 格式
         彻底规避 MDX 解析错误，将所有 LaTeX 命令转换为安全的 Markdown/HTML
+        （\\textit -> *...*，\\textbf -> **...**，\\underline -> <u>...</u> 等，其余命令移除命令保留内容，
+        具体规则与单遍实现见 mdx_text）
         
         Args:
             title (str): 原始标题
@@ -1013,204 +1107,104 @@ graph TB
         Returns:
             str: 清理后的标题
         """
-        if not title:
-            return title
-        
-        # 常见的 LaTeX 命令转换
-        # \textit{...} -> *...* (斜体)
-        title = re.sub(r'\\textit\{([^}]+)\}', r'*\1*', title)
-        # \textbf{...} -> **...** (粗体)
-        title = re.sub(r'\\textbf\{([^}]+)\}', r'**\1**', title)
-        # \texttt{...} -> `...` (等宽字体)
-        title = re.sub(r'\\texttt\{([^}]+)\}', r'`\1`', title)
-        # \emph{...} -> *...* (强调/斜体)
-        title = re.sub(r'\\emph\{([^}]+)\}', r'*\1*', title)
-        # \text{...} -> ... (普通文本，直接移除命令)
-        title = re.sub(r'\\text\{([^}]+)\}', r'\1', title)
-        # \textsc{...} -> ... (小型大写，Markdown 不支持，直接移除命令)
-        title = re.sub(r'\\textsc\{([^}]+)\}', r'\1', title)
-        # \underline{...} -> <u>...</u> (下划线，转换为 HTML)
-        title = re.sub(r'\\underline\{([^}]+)\}', r'<u>\1</u>', title)
-        # \uline{...} -> <u>...</u> (ulem 包的下划线命令，转换为 HTML)
-        title = re.sub(r'\\uline\{([^}]+)\}', r'<u>\1</u>', title)
-        # \uuline{...} -> <u>...</u> (ulem 包的双下划线，转换为 HTML)
-        title = re.sub(r'\\uuline\{([^}]+)\}', r'<u>\1</u>', title)
-        # \uwave{...} -> <u>...</u> (ulem 包的波浪下划线，转换为 HTML)
-        title = re.sub(r'\\uwave\{([^}]+)\}', r'<u>\1</u>', title)
-        # \sout{...} -> ~~...~~ (ulem 包的删除线，转换为 Markdown)
-        title = re.sub(r'\\sout\{([^}]+)\}', r'~~\1~~', title)
-        
-        # 通用清理：处理所有其他 LaTeX 命令 \command{...}，移除命令保留内容
-        # 这样可以避免任何未处理的 LaTeX 命令被 MDX 误解析为 JavaScript
-        # 注意：这个通用清理应该在所有特定命令处理之后执行
-        # 匹配模式：反斜杠 + 字母命令名 + 大括号参数
-        def remove_latex_command(match):
-            # group(1) 是命令名，group(2) 是内容，返回内容
-            return match.group(2) if match.lastindex >= 2 else ''
-        
-        # 处理 \command{content} 格式的命令（移除命令，保留内容）
-        # 这个正则会匹配所有剩余的 \command{...} 格式
-        title = re.sub(r'\\([a-zA-Z]+)\{([^}]+)\}', remove_latex_command, title)
-        
-        # 处理 \command 格式的命令（无参数，直接移除）
-        # 这些命令通常需要完全移除
-        title = re.sub(r'\\([a-zA-Z]+)(?![a-zA-Z{])', '', title)
-        
-        return title
+        return clean_latex(title)
 
     def escape_mdx(self, text):
         """
         转义 MDX 特殊字符
-        主要是 { 和 }，因为它们在 MDX 中被视为 JavaScript 表达式的开始和结束
-        同时转义 < 为 &lt; 避免被解析为 JSX 标签
+        { } 在 MDX 中被视为 JavaScript 表达式，转义为 \\{ \\}；< > 转义为 &lt; &gt; 避免被解析为 JSX
         """
-        if not text:
-            return text
-        # 避免重复转义：如果已经是 \{ 或 \} 则不处理
-        # 这里简单处理，直接替换所有未转义的
-        # 使用正则 lookbehind 可能会更准确，但简单的 replace 通常足够，
-        # 除非原文真的包含 \{ 且不想被再次转义。
-        # 考虑到 LaTeX 清理后应该没有 \{ 了，直接 replace 即可。
-        text = text.replace('{', '\\{').replace('}', '\\}')
-        # 转义 <，避免 <0.5 被解析为 JSX
-        # 同时也转义 > 为 &gt; 保持一致性（虽然 MDX 不强制转义 >）
-        text = text.replace('<', '&lt;').replace('>', '&gt;')
-        return text
+        return escape_mdx(text)
 
     def format_paper_with_enhanced_info(self, paper, date_str=None):
-        # 非 cs.DC 使用简化格式：- [arXivYYMMDD] title [link](https://...)
-        categories = paper.get('categories', []) or []
-        title = paper.get('title', 'N/A')
-        # 清理标题中的 LaTeX 语法
-        title = self.clean_latex_in_title(title)
-        # 转义 MDX 特殊字符
-        title = self.escape_mdx(title)
-        
+        # 清理标题中的 LaTeX 语法并转义 MDX 特殊字符（单遍）
+        title = render_title(paper.get('title', 'N/A'))
+
         arxiv_prefix = ""
         if date_str is not None:
             arxiv_prefix = self.get_arxiv_prefix(date_str)
-        else:
-            arxiv_prefix = ""
         # 使用详细格式
-        authors = ', '.join(paper.get('authors', []))
-        authors = self.escape_mdx(authors)
-        
+        authors = escape_mdx(', '.join(paper.get('authors', [])))
+
         pdf_link = paper.get('pdf_link', 'N/A')
-        
+
         tags = []
         if paper.get('tag1'):
-            tags.append("[" + self.escape_mdx(paper['tag1']) + "]")
+            tags.append("[" + escape_mdx(paper['tag1']) + "]")
         if paper.get('tag2'):
-            tags.append("[" + self.escape_mdx(paper['tag2']) + "]")
+            tags.append("[" + escape_mdx(paper['tag2']) + "]")
         if paper.get('tag3'):
-            tag3_items = [t.strip() for t in paper['tag3'].split(',') if t.strip()]
+            tag3_items = [escape_mdx(t.strip()) for t in paper['tag3'].split(',') if t.strip()]
             if tag3_items:
-                tags.append('[' + ', '.join([self.escape_mdx(t) for t in tag3_items]) + ']')
+                tags.append('[' + ', '.join(tag3_items) + ']')
         tags_str = ', '.join(tags) if tags else 'TBD'
-        
-        institution = paper.get('institution', 'TBD')
-        institution = self.escape_mdx(institution)
-        
+
+        institution = escape_mdx(paper.get('institution', 'TBD'))
+
+        lines = [
+            f"- **{arxiv_prefix} {title}**\n",
+            f"  - **tags:** {tags_str}\n",
+            f"  - **authors:** {authors}\n",
+            f"  - **institution:** {institution}\n",
+            f"  - **link:** {pdf_link}\n",
+        ]
+
         code = paper.get('code', 'None')
         if code and code.lower() != 'none':
-            code = self.escape_mdx(code)
-            
+            lines.append(f"  - **code:** {escape_mdx(code)}\n")
+
         contributions = paper.get('contributions', '')
         if contributions:
-            contributions = self.escape_mdx(contributions)
-            
-        mermaid = paper.get('mermaid', '')
-        # Mermaid 不需要转义 MDX，因为它在代码块中，但我们要确保它放在 ```mermaid 块里
-        # 如果 API 返回的 mermaid 已经包含了 ```mermaid，则不需要额外添加，否则添加
-        # 这里的 mermaid 是纯代码，没有 ``` 包裹
-        
-        llm_summary = paper.get('llm_summary', '').strip()
-        
-        formatted_text = f"""- **{arxiv_prefix} {title}**
-  - **tags:** {tags_str}
-  - **authors:** {authors}
-  - **institution:** {institution}
-  - **link:** {pdf_link}
-"""
-        if code and code.lower() != 'none':
-            formatted_text += f"  - **code:** {code}\n"
-            
-        if contributions:
-            formatted_text += f"  - **contributions:** {contributions}\n"
-            
+            lines.append(f"  - **contributions:** {escape_mdx(contributions)}\n")
+
         thumb = paper.get('thumbnail')
         if thumb:
-            formatted_text += f"  - **thumbnail:** {thumb}\n"
+            lines.append(f"  - **thumbnail:** {thumb}\n")
+
+        llm_summary = paper.get('llm_summary', '').strip()
         if llm_summary:
-            # 转义MDX特殊字符
-            escaped_summary = self.escape_mdx(llm_summary)
-            formatted_text += f"  - **Simple LLM Summary:** {escaped_summary}\n"
-            
+            lines.append(f"  - **Simple LLM Summary:** {escape_mdx(llm_summary)}\n")
+
+        # Mermaid 在代码块中，不需要转义 MDX；这里的 mermaid 是纯代码，没有 ``` 包裹
+        mermaid = paper.get('mermaid', '')
         if mermaid:
             # 为 mermaid 增加缩进，使其属于当前 list item
-            mermaid_block = "  - **Mindmap:**\n\n"
-            mermaid_lines = mermaid.split('\n')
-            indented_mermaid = '\n'.join(['    ' + line for line in mermaid_lines])
-            mermaid_block += f"    ```mermaid\n{indented_mermaid}\n    ```\n"
-            formatted_text += mermaid_block
-            
-        formatted_text += "\n"
-        return formatted_text
+            lines.append("  - **Mindmap:**\n\n    ```mermaid\n    ")
+            lines.append(mermaid.replace('\n', '\n    '))
+            lines.append("\n    ```\n")
+
+        lines.append("\n")
+        return "".join(lines)
+
+    def get_store(self):
+        """按环境变量打开论文存储后端（缓存复用），未配置时返回 None"""
+        if self._store is None and (PAPER_STORE_URL or (SUPABASE_URL and SUPABASE_KEY)):
+            self._store = open_store(PAPER_STORE_URL)
+        return self._store
 
     def save_papers_to_supabase(self, papers):
-        """保存论文到 Supabase 数据库"""
-        if not SUPABASE_URL or not SUPABASE_KEY:
+        """保存论文到数据库（默认 Supabase），成功返回 True"""
+        if not PAPER_STORE_URL and (not SUPABASE_URL or not SUPABASE_KEY):
             print("Supabase 环境变量未配置，跳过数据库保存")
-            return
+            return False
+
+        if not papers:
+            return True
 
         try:
-            supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-            
-            db_papers = []
-            for paper in papers:
-                # 转换字段以匹配数据库 schema
-                # 数据库 schema: id, category_slug, title, published_date, authors, institution, 
-                #               link, code_url, thumbnail_url, summary, contributions, mindmap, tags
-
-                # 处理日期格式
-                published = paper.get('published', '')
-                if published == 'N/A': published = None
-                
-                # 处理作者列表转字符串
-                authors_list = paper.get('authors', [])
-                authors_str = ', '.join(authors_list) if isinstance(authors_list, list) else str(authors_list)
-
-                db_paper = {
-                    "title": paper.get('title'),
-                    "authors": authors_str,
-                    "summary": paper.get('llm_summary') or paper.get('summary'), # 优先使用 LLM 摘要
-                    "published_date": published,
-                    "link": paper.get('id'), # arXiv ID url as link
-                    "tags": [t.strip() for t in paper.get('tag3', '').split(',')] if paper.get('tag3') else [],
-                    "institution": paper.get('institution'),
-                    "code_url": paper.get('code') if paper.get('code') != 'None' else None,
-                    "contributions": paper.get('contributions'),
-                    "thumbnail_url": paper.get('thumbnail'), # Schema字段名为 thumbnail_url
-                    "mindmap": paper.get('mermaid'),
-                    # 额外字段映射
-                    "category_slug": (paper.get('categories', [])[0] if paper.get('categories') else 'unknown').replace('.', '_')
-                }
-                db_papers.append(db_paper)
-            
-            if not db_papers:
-                return
-
-            # 批量插入/更新
-            # 分批处理以避免请求过大
-            batch_size = 50
-            for i in range(0, len(db_papers), batch_size):
-                batch = db_papers[i:i+batch_size]
-                response = supabase.table('papers').upsert(batch, on_conflict='link').execute()
-                
-            print(f"成功保存 {len(db_papers)} 篇论文到 Supabase")
+            # 分批并发写入，复用同一存储后端
+            with PaperPersistWriter(store=self.get_store(), metrics=self.metrics) as writer:
+                for paper in papers:
+                    writer.submit(paper)
+            if writer.failed:
+                print(f"保存到 Supabase 失败: {len(writer.failed)} 篇论文未写入")
+                return False
+            print(f"成功保存 {len(papers)} 篇论文到 Supabase")
+            return True
             
         except Exception as e:
             print(f"保存到 Supabase 失败: {e}")
+            return False
 
     def update_markdown_file(self, filepath, papers, date_str):
         # ...实现不变...
@@ -1221,24 +1215,8 @@ graph TB
         # 不再根据兴趣过滤，全部输出
         all_papers = papers
 
-        existing_content = ""
-        if os.path.exists(filepath):
-            with open(filepath, 'r', encoding='utf-8') as f:
-                existing_content = f.read()
-
-        # 利用正则找到所有日期section
-        date_section_pattern = re.compile(
-            r"(^|\n)##\s*(\d{4}-\d{2}-\d{2}).*?(?=\n##\s|\Z)", re.DOTALL
-        )
-        all_sections = []
-        for m in date_section_pattern.finditer(existing_content):
-            section_start = m.start()
-            section_content = m.group(0).lstrip('\n')
-            section_date = m.group(2)
-            all_sections.append((section_date, section_content, section_start))
-        
         # 新section内容
-        papers_content = f"## {date_str}\n\n"
+        parts = [f"## {date_str}\n\n"]
         if all_papers:
             # 先输出 cs.DC，再输出其他，保持各自相对顺序，并在每类开头输出总数
             csdc_papers = [p for p in all_papers if any(cat == 'cs.DC' for cat in (p.get('categories', []) or []))]
@@ -1247,69 +1225,25 @@ graph TB
             rl_papers = [p for p in other_papers if p.get('rl_match')]
             accelerat_papers = [p for p in other_papers if p.get('accelerat_match')]
 
-            papers_content += f"**cs.DC total: {len(csdc_papers)}**\n\n"
-            for paper in csdc_papers:
-                papers_content += self.format_paper_with_enhanced_info(paper, date_str=date_str)
+            parts.append(f"**cs.DC total: {len(csdc_papers)}**\n\n")
+            parts.extend(self.format_paper_with_enhanced_info(paper, date_str=date_str) for paper in csdc_papers)
 
-            papers_content += f"\n**cs.AI/cs.LG contains \"reinforcement learning\" total: {len(rl_papers)}**\n"
-            for paper in rl_papers:
-                papers_content += self.format_paper_with_enhanced_info(paper, date_str=date_str)
+            parts.append(f"\n**cs.AI/cs.LG contains \"reinforcement learning\" total: {len(rl_papers)}**\n")
+            parts.extend(self.format_paper_with_enhanced_info(paper, date_str=date_str) for paper in rl_papers)
 
-            papers_content += f"\n**cs.AI/cs.LG contains \"accelerate\" total: {len(accelerat_papers)}**\n"
-            for paper in accelerat_papers:
-                papers_content += self.format_paper_with_enhanced_info(paper, date_str=date_str)
+            parts.append(f"\n**cs.AI/cs.LG contains \"accelerate\" total: {len(accelerat_papers)}**\n")
+            parts.extend(self.format_paper_with_enhanced_info(paper, date_str=date_str) for paper in accelerat_papers)
         else:
-            papers_content += "No papers today\n"
-
-        replaced = False
-        # 如有则替换当前日期section
-        for idx, (dt, _, start_idx) in enumerate(all_sections):
-            if dt == date_str:
-                # 替换
-                before = existing_content[:start_idx].rstrip('\n')
-                after_idx = start_idx + len(_)
-                after = existing_content[after_idx:]
-                new_content = before
-                if new_content and not new_content.endswith('\n'):
-                    new_content += "\n"
-                new_content += "\n" + papers_content
-                if after and not after.startswith('\n'):
-                    new_content += "\n"
-                new_content += after.lstrip('\n')
-                replaced = True
-                print(f"日期 {date_str} 的内容已存在，已覆盖")
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(new_content.strip() + '\n')
-                print(f"已将 {len(all_papers)} 篇论文添加到文件: {filepath}")
-                return
-
-        # 如果没有，插入保持时间递增顺序（从小到大）
-        # 找到插入点：第一个section日期大于本date_str，则插入在它前面；若找不到，追加到文件末尾
-        insert_idx = None
-        for idx, (dt, _, start_idx) in enumerate(all_sections):
-            if dt > date_str:
-                insert_idx = start_idx
-                break
-        if insert_idx is not None:
-            # 插入到insert_idx前
-            before = existing_content[:insert_idx].rstrip('\n')
-            after = existing_content[insert_idx:]
-            new_content = before
-            if new_content and not new_content.endswith('\n'):
-                new_content += "\n"
-            new_content += "\n" + papers_content
-            if after and not after.startswith('\n'):
-                new_content += "\n"
-            new_content += after.lstrip('\n')
+            parts.append("No papers today\n")
+
+        # 按日期 section 的字节偏移替换/插入（保持时间递增顺序），原子写回
+        action = WeeklyFile(filepath).write_section(date_str, "".join(parts))
+        if action == 'replaced':
+            print(f"日期 {date_str} 的内容已存在，已覆盖")
+        elif action == 'inserted':
             print(f"日期 {date_str} 的内容不存在，已按时间顺序插入")
         else:
-            # 追加到最后
-            new_content = existing_content.rstrip() + "\n\n" + papers_content
             print(f"日期 {date_str} 的内容不存在，已追加到最后")
-        
-        # 写回文件
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(new_content.strip() + '\n')
 
         print(f"已将 {len(all_papers)} 篇论文添加到文件: {filepath}")
 
@@ -1364,12 +1298,24 @@ graph TB
             self.create_weekly_file_for_category(filepath, week_range, category)
         return filepath
 
-    def create_weekly_file_for_category(self, filepath, week_range, category):
+    def _category_week_header(self, week_range, category):
+        """类别周文件的初始内容（frontmatter + 标题）"""
         norm = self._norm_category(category)
         frontmatter = f"---\nslug: /daily/{norm}/{week_range}\n---\n"
         content = f"# {week_range} ({category})\n\n"
+        return frontmatter + content
+
+    def _category_index_payload(self, category):
+        norm = self._norm_category(category)
+        return {
+            "label": category,
+            "position": 1,
+            "link": {"type": "generated-index", "slug": f"/daily/{norm}"}
+        }
+
+    def create_weekly_file_for_category(self, filepath, week_range, category):
         with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(frontmatter + content)
+            f.write(self._category_week_header(week_range, category))
         print(f"创建新的类别周文件: {filepath}")
 
     def ensure_category_index_file(self, category):
@@ -1379,14 +1325,8 @@ graph TB
             os.makedirs(dir_path)
         meta_path = os.path.join(dir_path, "_category_.json")
         if not os.path.exists(meta_path):
-            norm = self._norm_category(category)
-            payload = {
-                "label": category,
-                "position": 1,
-                "link": {"type": "generated-index", "slug": f"/daily/{norm}"}
-            }
             with open(meta_path, 'w', encoding='utf-8') as f:
-                json.dump(payload, f, ensure_ascii=False, indent=2)
+                json.dump(self._category_index_payload(category), f, ensure_ascii=False, indent=2)
             print(f"创建类别索引文件: {meta_path}")
 
     def ensure_category_indices(self):
@@ -1410,60 +1350,75 @@ graph TB
     def update_markdown_file_for_category(self, filepath, papers, date_str, category):
         if not papers:
             return
-        existing_content = ""
-        if os.path.exists(filepath):
-            with open(filepath, 'r', encoding='utf-8') as f:
-                existing_content = f.read()
-        date_section_pattern = re.compile(r"(^|\n)##\s*(\d{4}-\d{2}-\d{2}).*?(?=\n##\s|\Z)", re.DOTALL)
-        all_sections = []
-        for m in date_section_pattern.finditer(existing_content):
-            section_start = m.start()
-            section_content = m.group(0).lstrip('\n')
-            section_date = m.group(2)
-            all_sections.append((section_date, section_content, section_start))
-        papers_content = f"## {date_str}\n\n"
+        parts = [f"## {date_str}\n\n"]
+        parts.extend(self.format_paper_with_enhanced_info(paper, date_str=date_str) for paper in papers)
+        WeeklyFile(filepath).write_section(date_str, "".join(parts))
+
+    def write_category_markdown(self, papers, date_str, max_workers=8):
+        """
+        批量写出当天论文的类别周文件
+        按 (类别, 周) 分组，每篇论文只格式化一次；目录与文件是否存在通过一次扫描得到，
+        每个文件在内存中拼好新 section 后只写一次，写阶段并行
+
+        Args:
+            papers (list): 处理后的论文，按各自的 categories 写入对应类别目录
+            date_str (str): 'YYYY-MM-DD'
+            max_workers (int): 并行写文件的线程数
+
+        Returns:
+            int: 写入的周文件数
+        """
+        week_range = self.get_week_range(date_str)
+        if not week_range or not papers:
+            return 0
+
+        # 一次性扫描已有的类别目录及其文件
+        existing = {}
+        if os.path.isdir(self.docs_daily_path):
+            with os.scandir(self.docs_daily_path) as it:
+                for entry in it:
+                    if entry.is_dir():
+                        existing[entry.name] = set(os.listdir(entry.path))
+
+        # (类别目录, 周) -> (类别, [论文条目])；同一篇论文出现在多个类别时复用格式化结果
+        groups = {}
+        formatted = {}
         for paper in papers:
-            papers_content += self.format_paper_with_enhanced_info(paper, date_str=date_str)
-        replaced = False
-        for idx, (dt, _, start_idx) in enumerate(all_sections):
-            if dt == date_str:
-                before = existing_content[:start_idx].rstrip('\n')
-                after_idx = start_idx + len(_)
-                after = existing_content[after_idx:]
-                new_content = before
-                if new_content and not new_content.endswith('\n'):
-                    new_content += "\n"
-                new_content += "\n" + papers_content
-                if after and not after.startswith('\n'):
-                    new_content += "\n"
-                new_content += after.lstrip('\n')
-                replaced = True
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(new_content.strip() + '\n')
-                return
-        insert_idx = None
-        for idx, (dt, _, start_idx) in enumerate(all_sections):
-            if dt > date_str:
-                insert_idx = start_idx
-                break
-        if insert_idx is not None:
-            before = existing_content[:insert_idx].rstrip('\n')
-            after = existing_content[insert_idx:]
-            new_content = before
-            if new_content and not new_content.endswith('\n'):
-                new_content += "\n"
-            new_content += "\n" + papers_content
-            if after and not after.startswith('\n'):
-                new_content += "\n"
-            new_content += after.lstrip('\n')
-        else:
-            new_content = existing_content.rstrip() + "\n\n" + papers_content
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(new_content.strip() + '\n')
+            key = paper.get('id') or id(paper)
+            if key not in formatted:
+                formatted[key] = self.format_paper_with_enhanced_info(paper, date_str=date_str)
+            for category in dict.fromkeys(paper.get('categories') or ['unknown']):
+                safe = self._safe_category(category)
+                groups.setdefault((safe, week_range), (category, []))[1].append(formatted[key])
+
+        def write_group(item):
+            (safe, week), (category, entries) = item
+            dir_path = os.path.join(self.docs_daily_path, safe)
+            names = existing.get(safe)
+            if names is None:
+                os.makedirs(dir_path, exist_ok=True)
+                names = set()
+            if "_category_.json" not in names:
+                with open(os.path.join(dir_path, "_category_.json"), 'w', encoding='utf-8') as f:
+                    json.dump(self._category_index_payload(category), f, ensure_ascii=False, indent=2)
+            filename = f"{week}.md"
+            filepath = os.path.join(dir_path, filename)
+            if filename in names:
+                weekly = WeeklyFile(filepath)
+            else:
+                weekly = WeeklyFile(filepath, data=self._category_week_header(week, category).encode('utf-8'))
+            weekly.apply_section(date_str, "".join([f"## {date_str}\n\n", *entries]))
+            weekly.save()
+            return filepath
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            written = list(executor.map(write_group, groups.items()))
+        print(f"已写出 {len(written)} 个类别周文件（{len(papers)} 篇论文，日期 {date_str}）")
+        return len(written)
 
     # ==================== 主处理流程 ====================
     
-    def process_papers_by_date(self, target_date=None, categories=['cs.DC', 'cs.AI'], max_workers=2, max_papers=10, html_content=None, include_categories=None):
+    def process_papers_by_date(self, target_date=None, categories=['cs.DC', 'cs.AI'], max_workers=2, max_papers=10, html_content=None, include_categories=None, persist_batch_size=50, persist_interval=2.0, export_corpus=None, write_markdown=False):
         """
         根据指定日期处理论文的完整流程
 
@@ -1473,6 +1428,10 @@ graph TB
             max_workers (int): 并发处理数量
             max_papers (int): 最大处理论文数量（用于测试）
             html_content (bytes): HTML内容，如果提供则直接使用
+            persist_batch_size (int): 后台写入每批最多论文数
+            persist_interval (float): 后台写入批次最长等待秒数
+            export_corpus (str): 列式语料目录（见 columnar_export），提供时把当天论文合并写入
+            write_markdown (bool): 是否把当天论文写入 docs/daily 下的类别周文件
         """
         # 若未提供日期，则默认使用今天
         if not target_date:
@@ -1487,14 +1446,17 @@ graph TB
         print(f"开始处理日期: {target_date}")
 
         single_date = target_date
+        started_at = time.time()
         print(f"\n==== 处理 {single_date} ====")
         # 1. 从arXiv获取论文
         print("步骤1: 从arXiv获取论文...")
-        papers = self.fetch_arxiv_papers(categories=categories, max_results=1024, target_date=single_date, html_content=html_content, include_categories=include_categories)
+        with self.metrics.stage("fetch_listing") as st:
+            papers = self.fetch_arxiv_papers(categories=categories, max_results=1024, target_date=single_date, html_content=html_content, include_categories=include_categories)
+            st.add("papers", len(papers))
 
         if not papers:
             print(f"日期 {single_date} 没有找到论文")
-            append_to_processed(single_date)
+            append_to_processed(single_date, papers=0, seconds=time.time() - started_at)
             return
 
         # 限制处理数量（用于测试）
@@ -1503,10 +1465,31 @@ graph TB
             print(f"限制处理前 {max_papers} 篇论文")
 
         print(f"找到 {len(papers)} 篇论文，开始处理...")
-
-        # 2. 并发处理论文（下载PDF、调用LLM）
+        # 中途崩溃时日期停留在 started，可据此发现未完成的日期
+        append_to_processed(single_date, status=STARTED, papers=len(papers))
+        if self.journal:
+            resumed = self.journal.summary(single_date)
+            if resumed['total']:
+                print(f"从工作日志恢复: {resumed}")
+
+        # 2. 并发处理论文（下载PDF、调用LLM），完成的论文交给后台写入器随到随写
         print("步骤2: 处理论文（下载PDF、调用LLM）...")
         processed_papers = []
+        writer = None
+        persist_failed = False
+        if PAPER_STORE_URL or (SUPABASE_URL and SUPABASE_KEY):
+            def on_persisted(batch):
+                if self.journal:
+                    self.journal.record_many(single_date, [p.get('id', '') for p in batch], 'persisted')
+            try:
+                writer = PaperPersistWriter(store=self.get_store(), batch_size=persist_batch_size,
+                                            flush_interval=persist_interval, on_persisted=on_persisted,
+                                            metrics=self.metrics)
+            except Exception as e:
+                print(f"初始化 Supabase 写入器失败: {e}")
+                persist_failed = True
+        else:
+            print("Supabase 环境变量未配置，跳过数据库保存")
 
         for i, paper in enumerate(papers):
             print(f"{i+1}. {paper.get('title', 'N/A')}")
@@ -1514,7 +1497,7 @@ graph TB
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
             # 提交所有任务
             future_to_paper = {
-                executor.submit(self.process_single_paper, paper): paper 
+                executor.submit(self._process_paper_timed, paper): paper 
                 for paper in papers
             }
 
@@ -1526,16 +1509,47 @@ graph TB
                     processed_papers.append(processed_paper)
                 except Exception as e:
                     print(f"处理论文时出错: {e}")
+                    continue
+                if writer and not processed_paper.get('persisted'):
+                    writer.submit(processed_paper)
 
         # 3. 统计结果
         print(f"处理完成！总共 {len(processed_papers)} 篇论文")
 
-        # 4. 保存到数据库
+        # 4. 等待后台写入器写完剩余论文
         print("步骤3: 保存到 Supabase 数据库...")
-        self.save_papers_to_supabase(processed_papers)
-        
+        if writer:
+            persist_failed = not writer.close()
+            print(f"成功保存 {writer.persisted_count} 篇论文到 {writer.store.name}")
+
+        # 5. 导出列式语料（可选）
+        if export_corpus and processed_papers:
+            try:
+                with self.metrics.stage("export_corpus"):
+                    partitions = export_rows([paper_to_row(p) for p in processed_papers], export_corpus)
+                print(f"已导出 {len(processed_papers)} 篇论文到列式语料 {export_corpus}（{partitions} 个分区）")
+            except Exception as e:
+                print(f"导出列式语料失败: {e}")
+
+        # 6. 写出类别周文件（可选）
+        if write_markdown and processed_papers:
+            try:
+                with self.metrics.stage("write_markdown"):
+                    self.write_category_markdown(processed_papers, single_date)
+            except Exception as e:
+                print(f"写出类别周文件失败: {e}")
+
+        if persist_failed:
+            # 保留工作日志与未完成状态，下次运行只补写数据库
+            print(f"部分论文写入数据库失败，日期 {single_date} 保持未完成状态，可重跑续传")
+            append_to_processed(single_date, status=PARTIAL, papers=len(processed_papers),
+                                seconds=time.time() - started_at)
+            return
+
         # 完成后写入arxiv_date.txt
-        append_to_processed(single_date)
+        append_to_processed(single_date, papers=len(processed_papers), seconds=time.time() - started_at)
+        if self.journal:
+            self.journal.purge(single_date)
 
 def main():
     """
@@ -1551,8 +1565,24 @@ def main():
     parser.add_argument("--max-papers", type=int, default=None, help="限制最大论文数量用于测试")
     parser.add_argument("--max-workers", type=int, default=10, help="并发线程数")
     parser.add_argument("--generate-thumbnails", action="store_true", help="启用PDF缩略图生成并上传到R2")
+    parser.add_argument("--thumbnail-profile", type=str, default=DEFAULT_THUMBNAIL_PROFILE, choices=list(THUMBNAIL_PROFILES),
+                        help="缩略图编码档位：fast（默认，快速 WEBP）、archive（1280px 高质量 WEBP）、avif（需 Pillow 支持）")
+    parser.add_argument("--thumbnail-widths", type=str, default=",".join(map(str, THUMBNAIL_VARIANT_WIDTHS)),
+                        help="多分辨率缩略图宽度，逗号分隔（档位宽度总会生成）")
     parser.add_argument("--skip-llm", action="store_true", help="跳过LLM总结，直接使用title作为总结")
+    parser.add_argument("--journal", type=str, default=DEFAULT_JOURNAL_PATH, help="工作日志路径（断点续跑），传空字符串禁用")
+    parser.add_argument("--export-corpus", type=str, default=None, help="把处理结果合并写入列式语料目录（需要 pyarrow）")
+    parser.add_argument("--write-markdown", action="store_true", help="把处理结果写入 docs/daily 下的类别周文件")
+    parser.add_argument("--metrics-report", type=str, default=None, help="运行结束后写出分阶段耗时统计 JSON 报告")
+    parser.add_argument("--metrics-prom", type=str, default=None, help="写出 Prometheus textfile 格式的分阶段指标")
+    parser.add_argument("--profile", type=str, default=None, help="采样分析各阶段调用栈，写出 <前缀>.folded 与 <前缀>.speedscope.json")
+    parser.add_argument("--profile-interval", type=float, default=DEFAULT_INTERVAL, help="采样间隔（秒）")
     args = parser.parse_args()
+    # 档位格式（例如 AVIF）不受当前 Pillow 支持时在开始运行前退出
+    try:
+        get_profile(args.thumbnail_profile)
+    except ValueError as e:
+        parser.error(f"--thumbnail-profile: {e}（当前可用: {', '.join(available_profiles()) or '无'}）")
 
     # 检查API密钥（在启用LLM时）
     if not args.skip_llm and not os.environ.get('DEEPSEEK_API_KEY'):
@@ -1597,14 +1627,34 @@ def main():
     max_workers = args.max_workers
 
     # 创建处理器并处理论文
-    processor = CompletePaperProcessor(enable_thumbnails=args.generate_thumbnails, enable_llm=(not args.skip_llm))
-    processor.process_papers_by_date(
-        target_date=target_date,
-        max_workers=max_workers,
-        max_papers=max_papers,
-        html_content=html_content,
-        include_categories=include_categories
-    )
+    metrics = PipelineMetrics()
+    processor = CompletePaperProcessor(enable_thumbnails=args.generate_thumbnails, enable_llm=(not args.skip_llm), journal_path=args.journal or None, metrics=metrics,
+                                       thumbnail_profile=args.thumbnail_profile,
+                                       thumbnail_widths=[int(w) for w in args.thumbnail_widths.split(',') if w.strip()])
+    profiler = SamplingProfiler(interval=args.profile_interval).start() if args.profile else None
+    try:
+        processor.process_papers_by_date(
+            target_date=target_date,
+            max_workers=max_workers,
+            max_papers=max_papers,
+            html_content=html_content,
+            include_categories=include_categories,
+            export_corpus=args.export_corpus,
+            write_markdown=args.write_markdown
+        )
+    finally:
+        if profiler:
+            profiler.stop()
+            folded_path, speedscope_path = profiler.write(args.profile, name=f"arxiv {target_date}")
+            print(f"采样分析: {profiler.sample_count} 次采样，写入 {folded_path}、{speedscope_path}")
+            for stage, count in stage_totals(profiler.samples)[:8]:
+                print(f"  {stage:<28}{count:>8} 样本")
+        # 中途失败也写出已有的统计，便于定位卡在哪个阶段
+        if args.metrics_report:
+            metrics.write_report(args.metrics_report, date=target_date, max_workers=max_workers)
+            print(f"分阶段统计已写入 {args.metrics_report}")
+        if args.metrics_prom:
+            metrics.write_prometheus(args.metrics_prom)
 
 if __name__ == "__main__":
     main()
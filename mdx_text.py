@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+标题/字段文本到 MDX 安全文本的转换（LaTeX 清理 + MDX 转义）
+- 不含反斜杠的文本只做转义（四次 str.replace 走 memchr 快路径，比 str.translate 逐字符映射快）
+- 含 LaTeX 命令时用一个交替正则单遍扫描，按命令名查表替换并同时转义
+- 嵌套命令、无参命令紧跟另一个命令、带参命令紧跟在反斜杠之后时，多遍替换的先后顺序会影响结果，
+  回退到与旧实现完全一致的逐遍替换
+"""
+
+import re
+
+
+# 有专门转换的命令（按旧实现的替换顺序排列）
+LATEX_TEMPLATES = {
+    'textit': '*{}*',
+    'textbf': '**{}**',
+    'texttt': '`{}`',
+    'emph': '*{}*',
+    'text': '{}',
+    'textsc': '{}',
+    'underline': '<u>{}</u>',
+    'uline': '<u>{}</u>',
+    'uuline': '<u>{}</u>',
+    'uwave': '<u>{}</u>',
+    'sout': '~~{}~~',
+}
+
+# 单遍: \command{content} | 无参 \command
+_LATEX_RE = re.compile(r'\\([a-zA-Z]+)\{([^}]+)\}|\\([a-zA-Z]+)(?![a-zA-Z{])')
+
+# 旧实现的逐遍替换（回退路径）
+_SEQUENTIAL_PASSES = [
+    (re.compile(r'\\' + name + r'\{([^}]+)\}'), template.replace('{}', r'\1'))
+    for name, template in LATEX_TEMPLATES.items()
+]
+_GENERIC_COMMAND_RE = re.compile(r'\\([a-zA-Z]+)\{([^}]+)\}')
+_BARE_COMMAND_RE = re.compile(r'\\([a-zA-Z]+)(?![a-zA-Z{])')
+
+
+def _escape(text):
+    # { } 会被当作 JS 表达式，< > 会被当作 JSX 标签
+    return text.replace('{', '\\{').replace('}', '\\}').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def escape_mdx(text):
+    """转义 MDX 特殊字符（空值原样返回）"""
+    if not text:
+        return text
+    return _escape(text)
+
+
+def clean_latex_sequential(title):
+    """旧实现：每个命令一遍 re.sub，再清理其余带参/无参命令"""
+    for pattern, replacement in _SEQUENTIAL_PASSES:
+        title = pattern.sub(replacement, title)
+    title = _GENERIC_COMMAND_RE.sub(lambda m: m.group(2), title)
+    return _BARE_COMMAND_RE.sub('', title)
+
+
+def _translate(title, escape):
+    """单遍转换；遇到需要逐遍语义的情况返回 None"""
+    parts = []
+    pos = 0
+    for m in _LATEX_RE.finditer(title):
+        content = m.group(2)
+        if content is not None:
+            # 参数内有命令（嵌套），或紧挨在孤立反斜杠之后（替换后会与其组成新命令）
+            if '\\' in content or (m.start() and title[m.start() - 1] == '\\'):
+                return None
+            template = LATEX_TEMPLATES.get(m.group(1))
+            out = template.format(content) if template else content
+        else:
+            # 无参命令后紧跟的命令被替换后，旧实现的 (?![a-zA-Z{]) 判断会看到替换后的字符
+            if title.startswith('\\', m.end()):
+                return None
+            out = ''
+        parts.append(title[pos:m.start()])
+        parts.append(out)
+        pos = m.end()
+    parts.append(title[pos:])
+    text = ''.join(parts)
+    return _escape(text) if escape else text
+
+
+def clean_latex(title):
+    """清理 LaTeX 命令（不转义），结果与 clean_latex_sequential 一致"""
+    if not title or '\\' not in title:
+        return title
+    text = _translate(title, escape=False)
+    return clean_latex_sequential(title) if text is None else text
+
+
+def render_title(title):
+    """clean_latex + escape_mdx 合并为一次转换"""
+    if not title:
+        return title
+    if '\\' not in title:
+        return _escape(title)
+    text = _translate(title, escape=True)
+    return escape_mdx(clean_latex_sequential(title)) if text is None else text
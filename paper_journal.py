@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+论文处理工作日志（SQLite/WAL）
+按 (日期, 论文ID) 记录各阶段完成情况，崩溃后重跑只补做缺失阶段
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_JOURNAL_PATH = os.path.join(".cache", "pipeline", "journal.sqlite3")
+
+# 阶段按流水线顺序排列
+STAGES = ("downloaded", "analyzed", "thumbnailed", "persisted")
+
+_SCHEMA = """
+create table if not exists paper_stages (
+  run_date text not null,
+  paper_id text not null,
+  downloaded_at real,
+  analyzed_at real,
+  thumbnailed_at real,
+  persisted_at real,
+  pdf_path text,
+  payload text,
+  updated_at real not null,
+  primary key (run_date, paper_id)
+)
+"""
+
+
+class PaperJournal:
+    def __init__(self, path=DEFAULT_JOURNAL_PATH):
+        """
+        打开（或创建）工作日志
+
+        Args:
+            path (str): SQLite 文件路径
+        """
+        self.path = path
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        # 工作线程共享同一连接，由锁串行化
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("pragma journal_mode=wal")
+        self._conn.execute("pragma synchronous=normal")
+        self._conn.execute(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _row(self, run_date, paper_id):
+        return self._conn.execute(
+            "select downloaded_at, analyzed_at, thumbnailed_at, persisted_at, pdf_path, payload"
+            " from paper_stages where run_date = ? and paper_id = ?",
+            (run_date, paper_id),
+        ).fetchone()
+
+    def stages(self, run_date, paper_id):
+        """返回已完成的阶段集合"""
+        with self._lock:
+            row = self._row(run_date, paper_id)
+        if not row:
+            return set()
+        return {stage for stage, ts in zip(STAGES, row[:4]) if ts is not None}
+
+    def load(self, run_date, paper_id):
+        """返回 (已完成阶段集合, pdf路径, 上次保存的论文字段)"""
+        with self._lock:
+            row = self._row(run_date, paper_id)
+        if not row:
+            return set(), None, {}
+        done = {stage for stage, ts in zip(STAGES, row[:4]) if ts is not None}
+        payload = json.loads(row[5]) if row[5] else {}
+        return done, row[4], payload
+
+    def record(self, run_date, paper_id, stage, paper=None, pdf_path=None):
+        """
+        标记某阶段完成，并可选地保存论文字段快照与PDF路径
+
+        Args:
+            run_date (str): 处理日期 'YYYY-MM-DD'
+            paper_id (str): 论文ID（arXiv abs 链接）
+            stage (str): STAGES 之一
+            paper (dict): 论文字段快照，与已保存的字段合并，用于重跑时恢复
+            pdf_path (str): 已下载PDF的本地路径
+        """
+        if stage not in STAGES:
+            raise ValueError(f"未知阶段: {stage}")
+        now = time.time()
+        with self._lock:
+            # 快照与已保存的字段合并（同名字段以本次为准），各阶段只需保存自己写入的字段
+            payload = None
+            if paper is not None:
+                row = self._row(run_date, paper_id)
+                merged = json.loads(row[5]) if row and row[5] else {}
+                merged.update(paper)
+                payload = json.dumps(merged, ensure_ascii=False, default=str)
+            self._conn.execute(
+                f"insert into paper_stages (run_date, paper_id, {stage}_at, pdf_path, payload, updated_at)"
+                f" values (?, ?, ?, ?, ?, ?)"
+                f" on conflict (run_date, paper_id) do update set"
+                f" {stage}_at = excluded.{stage}_at,"
+                f" pdf_path = coalesce(excluded.pdf_path, paper_stages.pdf_path),"
+                f" payload = coalesce(excluded.payload, paper_stages.payload),"
+                f" updated_at = excluded.updated_at",
+                (run_date, paper_id, now, pdf_path, payload, now),
+            )
+
+    def record_many(self, run_date, paper_ids, stage):
+        """批量标记阶段完成（用于数据库批量写入之后）"""
+        if stage not in STAGES:
+            raise ValueError(f"未知阶段: {stage}")
+        now = time.time()
+        with self._lock:
+            self._conn.execute("begin")
+            try:
+                self._conn.executemany(
+                    f"insert into paper_stages (run_date, paper_id, {stage}_at, updated_at)"
+                    f" values (?, ?, ?, ?)"
+                    f" on conflict (run_date, paper_id) do update set"
+                    f" {stage}_at = excluded.{stage}_at, updated_at = excluded.updated_at",
+                    [(run_date, pid, now, now) for pid in paper_ids],
+                )
+                self._conn.execute("commit")
+            except Exception:
+                self._conn.execute("rollback")
+                raise
+
+    def summary(self, run_date):
+        """统计某日期各阶段完成数量"""
+        with self._lock:
+            row = self._conn.execute(
+                "select count(*), count(downloaded_at), count(analyzed_at),"
+                " count(thumbnailed_at), count(persisted_at)"
+                " from paper_stages where run_date = ?",
+                (run_date,),
+            ).fetchone()
+        total, *counts = row
+        return {"total": total, **dict(zip(STAGES, counts))}
+
+    def purge(self, run_date):
+        """日期处理完成后删除其记录，保持日志文件小巧"""
+        with self._lock:
+            self._conn.execute("delete from paper_stages where run_date = ?", (run_date,))
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台论文持久化写入器
+处理完成的论文随到随写：按数量/时间合并成批，复用同一存储后端并发 upsert，失败批次自动重试
+"""
+
+import queue
+import threading
+import time
+import concurrent.futures
+
+from paper_store import open_store
+
+
+def paper_to_row(paper):
+    """
+    将处理后的论文字典转换为数据库行
+    数据库 schema: id, category_slug, title, published_date, authors, institution,
+                  link, code_url, thumbnail_url, summary, contributions, mindmap, tags,
+                  thumbnail_variants（仅在有多分辨率缩略图时出现）
+    """
+    # 处理日期格式
+    published = paper.get('published', '')
+    if published == 'N/A': published = None
+
+    # 处理作者列表转字符串
+    authors_list = paper.get('authors', [])
+    authors_str = ', '.join(authors_list) if isinstance(authors_list, list) else str(authors_list)
+
+    row = {
+        "title": paper.get('title'),
+        "authors": authors_str,
+        "summary": paper.get('llm_summary') or paper.get('summary'), # 优先使用 LLM 摘要
+        "published_date": published,
+        "link": paper.get('id'), # arXiv ID url as link
+        "tags": [t.strip() for t in paper.get('tag3', '').split(',')] if paper.get('tag3') else [],
+        "institution": paper.get('institution'),
+        "code_url": paper.get('code') if paper.get('code') != 'None' else None,
+        "contributions": paper.get('contributions'),
+        "thumbnail_url": paper.get('thumbnail'), # Schema字段名为 thumbnail_url
+        "mindmap": paper.get('mermaid'),
+        # 额外字段映射
+        "category_slug": (paper.get('categories', [])[0] if paper.get('categories') else 'unknown').replace('.', '_')
+    }
+    # 只在有多分辨率缩略图时写入该列：未执行 alter 的表仍可写入，也不会用空值覆盖已有值
+    if paper.get('thumbnail_variants'):
+        row["thumbnail_variants"] = paper['thumbnail_variants'] # {宽度: URL}
+    return row
+
+
+def dedupe_rows(rows, key='link'):
+    """同一批次内按主键去重（后出现的覆盖先出现的），避免 upsert 同一行两次报错"""
+    by_key = {}
+    for row in rows:
+        by_key[row.get(key)] = row
+    return list(by_key.values())
+
+
+class PaperPersistWriter:
+    _STOP = object()
+
+    def __init__(self, store=None, batch_size=50, flush_interval=2.0, max_concurrency=4,
+                 max_retries=3, retry_backoff=1.0, on_persisted=None, metrics=None):
+        """
+        Args:
+            store (PaperStore): 存储后端，默认按 PAPER_STORE_URL / Supabase 环境变量打开
+            batch_size (int): 每批最多多少行
+            flush_interval (float): 批次最长等待秒数，到时即使未满也写入
+            max_concurrency (int): 同时进行的 upsert 请求数
+            max_retries (int): 单批失败后的重试次数
+            retry_backoff (float): 重试退避基数（秒），按 2 的幂增长
+            on_persisted (callable): 批次写入成功后回调，参数为该批论文列表
+            metrics (PipelineMetrics): 可选，每次 upsert 请求记为 upsert 阶段
+        """
+        self.store = store or open_store()
+        if self.store is None:
+            raise RuntimeError("未配置论文存储后端")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.on_persisted = on_persisted
+        self.metrics = metrics
+        self.persisted_count = 0
+        self.failed = []
+        self._stats_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_concurrency)
+        self._futures = []
+        self._thread = threading.Thread(target=self._run, name="paper-persist-writer", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, paper):
+        """提交一篇处理完成的论文"""
+        self._queue.put(paper)
+
+    def close(self):
+        """写入剩余论文并等待所有批次完成，返回是否全部成功"""
+        self._queue.put(self._STOP)
+        self._thread.join()
+        concurrent.futures.wait(self._futures)
+        self._executor.shutdown(wait=True)
+        return not self.failed
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            if item is self._STOP:
+                self._dispatch(batch)
+                return
+            if item is not None:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_interval
+                batch.append(item)
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._dispatch(batch)
+                batch = []
+                deadline = None
+
+    def _dispatch(self, papers):
+        if papers:
+            self._futures.append(self._executor.submit(self._write_batch, papers))
+
+    def _write_batch(self, papers):
+        rows = dedupe_rows([paper_to_row(p) for p in papers])
+        for attempt in range(self.max_retries + 1):
+            try:
+                if self.metrics:
+                    with self.metrics.stage("upsert") as st:
+                        self.store.upsert(rows)
+                        st.add("rows", len(rows))
+                else:
+                    self.store.upsert(rows)
+                break
+            except Exception as e:
+                if attempt >= self.max_retries:
+                    print(f"写入 {self.store.name} 失败（已重试 {self.max_retries} 次）: {e}")
+                    with self._stats_lock:
+                        self.failed.extend(papers)
+                    return
+                delay = self.retry_backoff * (2 ** attempt)
+                print(f"写入 {self.store.name} 失败，{delay:.1f}s 后重试: {e}")
+                time.sleep(delay)
+        with self._stats_lock:
+            self.persisted_count += len(papers)
+        if self.on_persisted:
+            try:
+                self.on_persisted(papers)
+            except Exception as e:
+                print(f"持久化回调失败: {e}")
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缩略图策略共用的 PDF 扫描状态（每个 PDF 打开一次，各策略复用）
+- 页面对象、图片列表、图片显示区域按页缓存
+- 先扫描前 prescan_pages 页（关键图几乎都在前几页），未命中才扫描其余页面
+- 没有图片资源的页面不解析内容流；有图片的页面用一次 get_image_info 得到全部图片的显示区域，
+  不再对每个 xref 调用 get_image_rects（每次调用都会重新解析整页）
+- 图注索引：每页只取一次文本块，用预编译的正则一遍扫描，得到 图号 -> 图注区域，各策略共用
+- 矢量路径索引：用 get_cdrawings 取路径区域（不构造 Point/Rect），按 y0 排序后二分查询图注上方的区间
+需要 PyMuPDF: pip install pymupdf
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+try:
+    import fitz
+except ImportError:
+    fitz = None
+
+DEFAULT_PRESCAN_PAGES = 3
+# 候选图片的最小显示尺寸（pt）与宽高比范围
+MIN_IMAGE_SIDE = 256
+MIN_ASPECT = 0.4
+MAX_ASPECT = 2.5
+# 矢量路径的最小尺寸（pt）：宽高都不超过它的路径（散点标记、短刻度线）不计入图区域
+MIN_DRAWING_SIDE = 5
+
+# 文本块中任意位置提到的图号（在小写文本上匹配）：figure 1 / fig. 1
+_MENTION_RE = re.compile(r'fig(?:ure\s*|\.\s*)(\d+)\b')
+# 以图注开头的文本块：Figure 1: / Fig. 1. / Fig 1:
+_HEADING_RE = re.compile(r'^(?:figure|fig\.?)\s*(\d+)[:.]', re.I)
+
+# mentions: {图号: [(x0, y0, x1, y1), ...]}（文本块顺序）
+# headings: {图号: fitz.Rect}（按 y0 排序后第一个以该图注开头的文本块）
+PageCaptions = namedtuple("PageCaptions", ["mentions", "headings"])
+_NO_CAPTIONS = PageCaptions({}, {})
+
+
+def is_candidate_rect(rect, min_side=MIN_IMAGE_SIDE, min_aspect=MIN_ASPECT, max_aspect=MAX_ASPECT):
+    """显示区域是否可作为缩略图候选（尺寸与宽高比过滤）"""
+    w, h = rect.width, rect.height
+    if w < min_side or h < min_side:
+        return False
+    ar = w / h if h else 0
+    return min_aspect <= ar <= max_aspect
+
+
+class DrawingIndex:
+    def __init__(self, rects):
+        """
+        Args:
+            rects (list): 按绘制顺序的路径区域 (x0, y0, x1, y1)
+        """
+        self._entries = sorted((r[1], seq, r) for seq, r in enumerate(rects))
+        self._y0 = [e[0] for e in self._entries]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def union(self, top, bottom):
+        """
+        完全落在纵向区间 [top, bottom] 内的路径区域的并集，只访问 y0 在区间内的路径
+        结果与按绘制顺序逐个 fitz.Rect |= 相同：空矩形不参与并集，全部为空时取绘制顺序的第一个
+
+        Returns:
+            fitz.Rect or None
+        """
+        lo = bisect_left(self._y0, top)
+        hi = bisect_right(self._y0, bottom)
+        box = None
+        first_empty = None
+        for k in range(lo, hi):
+            _, seq, r = self._entries[k]
+            if r[3] > bottom:
+                continue
+            if r[0] >= r[2] or r[1] >= r[3]:
+                if first_empty is None or seq < first_empty[0]:
+                    first_empty = (seq, r)
+            elif box is None:
+                box = list(r)
+            else:
+                if r[0] < box[0]:
+                    box[0] = r[0]
+                if r[1] < box[1]:
+                    box[1] = r[1]
+                if r[2] > box[2]:
+                    box[2] = r[2]
+                if r[3] > box[3]:
+                    box[3] = r[3]
+        if box is None:
+            return fitz.Rect(first_empty[1]) if first_empty else None
+        return fitz.Rect(box)
+
+
+class PdfScan:
+    def __init__(self, doc, prescan_pages=DEFAULT_PRESCAN_PAGES):
+        """
+        Args:
+            doc (fitz.Document): 已打开的文档
+            prescan_pages (int): 优先扫描的前几页
+        """
+        self.doc = doc
+        self.page_count = len(doc)
+        self.prescan_pages = prescan_pages
+        self._pages = {}
+        self._images = {}
+        self._image_rects = {}
+        self._image_infos = {}
+        self._captions = {}
+        self._drawings = {}
+
+    @classmethod
+    def open(cls, pdf_path, prescan_pages=DEFAULT_PRESCAN_PAGES):
+        return cls(fitz.open(pdf_path), prescan_pages)
+
+    def close(self):
+        self.doc.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def page(self, i):
+        if i not in self._pages:
+            self._pages[i] = self.doc.load_page(i)
+        return self._pages[i]
+
+    def prescan_range(self):
+        return range(min(self.prescan_pages, self.page_count))
+
+    def rest_range(self):
+        return range(min(self.prescan_pages, self.page_count), self.page_count)
+
+    def images(self, i):
+        """page.get_images(full=True)（只读资源字典，开销小）"""
+        if i not in self._images:
+            self._images[i] = self.page(i).get_images(full=True)
+        return self._images[i]
+
+    def image_infos(self, i):
+        """page.get_image_info(xrefs=True)：页面上每次图片绘制的 bbox 与 xref"""
+        if i not in self._image_infos:
+            try:
+                self._image_infos[i] = self.page(i).get_image_info(xrefs=True) or []
+            except Exception:
+                self._image_infos[i] = []
+        return self._image_infos[i]
+
+    def image_rects(self, i):
+        """
+        页面上由图片资源（xref）绘制的全部显示区域，按 get_images 的顺序
+
+        Returns:
+            list: fitz.Rect
+        """
+        if i in self._image_rects:
+            return self._image_rects[i]
+        images = self.images(i)
+        rects = []
+        if images:
+            xrefs = [im[0] for im in images]
+            by_xref = {}
+            infos = self.image_infos(i)
+            if infos and all('xref' in info for info in infos):
+                for info in infos:
+                    if info['xref']:
+                        by_xref.setdefault(info['xref'], []).append(fitz.Rect(info['bbox']))
+                for xref in dict.fromkeys(xrefs):
+                    rects.extend(by_xref.get(xref, ()))
+            else:
+                # 旧版本或解析失败：逐个 xref 查询
+                page = self.page(i)
+                for xref in xrefs:
+                    rects.extend(page.get_image_rects(xref))
+        self._image_rects[i] = rects
+        return rects
+
+    def captions(self, i):
+        """
+        该页的图注索引（首次访问时构建，图号为字符串，如 "1"）
+
+        Returns:
+            PageCaptions
+        """
+        if i in self._captions:
+            return self._captions[i]
+        # 预筛：小写文本不含 "fig" 的块不可能匹配上面两个模式（子串查找远快于忽略大小写的正则）
+        blocks = []
+        for b in self.page(i).get_text("blocks") or []:
+            if isinstance(b, (list, tuple)) and len(b) >= 5 and b[4]:
+                lower = b[4].lower()
+                if 'fig' in lower:
+                    blocks.append((b, lower))
+        if not blocks:
+            self._captions[i] = _NO_CAPTIONS
+            return _NO_CAPTIONS
+        mentions = {}
+        for b, lower in blocks:
+            for no in dict.fromkeys(m.group(1) for m in _MENTION_RE.finditer(lower)):
+                mentions.setdefault(no, []).append((b[0], b[1], b[2], b[3]))
+        headings = {}
+        for b, _ in sorted(blocks, key=lambda item: item[0][1]):
+            m = _HEADING_RE.match(b[4].strip())
+            if m and m.group(1) not in headings:
+                headings[m.group(1)] = fitz.Rect(b[0], b[1], b[2], b[3])
+        self._captions[i] = PageCaptions(mentions, headings)
+        return self._captions[i]
+
+    def drawings(self, i):
+        """
+        该页矢量路径（宽或高超过 MIN_DRAWING_SIDE）的区间索引，首次访问时构建
+
+        Returns:
+            DrawingIndex
+        """
+        if i in self._drawings:
+            return self._drawings[i]
+        page = self.page(i)
+        try:
+            # get_cdrawings 直接返回元组，省去 get_drawings 把每条路径的点转换为 Point/Rect 的开销
+            extract = getattr(page, "get_cdrawings", None) or page.get_drawings
+            paths = extract() or []
+        except Exception:
+            paths = []
+        rects = []
+        for d in paths:
+            r = d.get("rect")
+            if r and (r[2] - r[0] > MIN_DRAWING_SIDE or r[3] - r[1] > MIN_DRAWING_SIDE):
+                rects.append(tuple(r))
+        self._drawings[i] = DrawingIndex(rects)
+        return self._drawings[i]
+
+    def image_candidates(self, i):
+        """通过尺寸与宽高比过滤的图片显示区域"""
+        return [r for r in self.image_rects(i) if is_candidate_rect(r)]
+
+    def largest_image(self):
+        """
+        面积最大的候选图片：先在前 prescan_pages 页中找，没有候选时才扫描其余页面
+
+        Returns:
+            tuple or None: (页码, fitz.Rect)
+        """
+        for pages in (self.prescan_range(), self.rest_range()):
+            best = None
+            for i in pages:
+                if not self.images(i):
+                    continue
+                for r in self.image_candidates(i):
+                    area = r.width * r.height
+                    if best is None or area > best[0]:
+                        best = (area, i, r)
+            if best:
+                return best[1], best[2]
+        return None
+
+    def render_clip(self, i, rect, max_width=640):
+        """把页面区域渲染为宽 max_width 的 PNG 字节"""
+        w = rect.width or 1.0
+        z = max_width / w
+        pix = self.page(i).get_pixmap(matrix=fitz.Matrix(z, z), alpha=False, clip=rect)
+        return pix.tobytes("png")
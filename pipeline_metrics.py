@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流水线分阶段计时与吞吐统计
+每个阶段记录每次耗时（分位数 p50/p95/p99）、失败次数与自定义计数（字节数、token 数等），
+运行结束写出 JSON 报告，可选写出 Prometheus textfile（node_exporter textfile collector 格式）
+
+用法:
+    metrics = PipelineMetrics()
+    with metrics.stage("download") as st:
+        data = fetch()
+        st.add("bytes", len(data))
+    metrics.write_report("run.json")
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+# 线程 ID -> 当前所在阶段栈（供采样分析器按线程查询）
+_active = {}
+_active_lock = threading.Lock()
+
+
+def active_stages():
+    """
+    Returns:
+        dict: {线程 ID: 最内层阶段名}
+    """
+    with _active_lock:
+        return {tid: stack[-1] for tid, stack in _active.items() if stack}
+
+
+def percentile(sorted_values, q):
+    """最近秩分位数（sorted_values 已升序）"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class StageTimer:
+    """stage() 产出的句柄：累加计数、标记失败"""
+
+    def __init__(self):
+        self.ok = True
+        self.counters = {}
+
+    def add(self, counter, value=1):
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def fail(self):
+        self.ok = False
+
+
+class PipelineMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._durations = {}
+        self._errors = {}
+        self._counters = {}
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """
+        对一个阶段计时；抛出异常或调用 fail() 计为失败（异常照常抛出）
+
+        Args:
+            name (str): 阶段名，如 "download"、"thumbnail.best_page"
+        """
+        tid = threading.get_ident()
+        with _active_lock:
+            _active.setdefault(tid, []).append(name)
+        timer = StageTimer()
+        start = time.perf_counter()
+        try:
+            yield timer
+        except BaseException:
+            timer.fail()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with _active_lock:
+                stack = _active.get(tid)
+                if stack:
+                    stack.pop()
+                    if not stack:
+                        del _active[tid]
+            self.observe(name, elapsed, ok=timer.ok, counters=timer.counters)
+
+    def observe(self, name, seconds, ok=True, counters=None):
+        """直接记录一次阶段耗时（不便用 with 包裹时）"""
+        with self._lock:
+            self._durations.setdefault(name, []).append(seconds)
+            if not ok:
+                self._errors[name] = self._errors.get(name, 0) + 1
+            if counters:
+                stage_counters = self._counters.setdefault(name, {})
+                for counter, value in counters.items():
+                    stage_counters[counter] = stage_counters.get(counter, 0) + value
+
+    def add(self, name, counter, value=1):
+        """给阶段累加计数，不记录耗时"""
+        with self._lock:
+            stage_counters = self._counters.setdefault(name, {})
+            stage_counters[counter] = stage_counters.get(counter, 0) + value
+
+    def summary(self):
+        """
+        Returns:
+            dict: {阶段名: {count, errors, total_seconds, mean, p50, p95, p99, max, counters}}，
+                  按总耗时降序（排在前面的就是最耗时的阶段）
+        """
+        with self._lock:
+            durations = {name: sorted(values) for name, values in self._durations.items()}
+            errors = dict(self._errors)
+            counters = {name: dict(c) for name, c in self._counters.items()}
+        stages = {}
+        for name in sorted(set(durations) | set(counters), key=lambda n: -sum(durations.get(n, ()))):
+            values = durations.get(name, [])
+            total = sum(values)
+            stats = {
+                "count": len(values),
+                "errors": errors.get(name, 0),
+                "total_seconds": round(total, 6),
+                "mean": round(total / len(values), 6) if values else None,
+                "max": round(values[-1], 6) if values else None,
+            }
+            for q in QUANTILES:
+                value = percentile(values, q)
+                stats[f"p{round(q * 100)}"] = None if value is None else round(value, 6)
+            stats["counters"] = counters.get(name, {})
+            stages[name] = stats
+        return stages
+
+    def report(self, **extra):
+        """JSON 报告内容（extra 为附加的运行信息，如日期、论文数）"""
+        wall = time.perf_counter() - self._start
+        return {
+            "started_at": datetime.fromtimestamp(self.started_at, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            "wall_seconds": round(wall, 3),
+            **extra,
+            "stages": self.summary(),
+        }
+
+    def write_report(self, path, **extra):
+        _write_atomic(path, json.dumps(self.report(**extra), ensure_ascii=False, indent=2))
+
+    def prometheus_text(self, prefix="arxiv_pipeline"):
+        """Prometheus 文本格式：阶段耗时为 summary，计数为 counter"""
+        stages = self.summary()
+        lines = [
+            f"# HELP {prefix}_stage_seconds Stage duration in seconds.",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        for name, stats in stages.items():
+            label = _label(name)
+            for q in QUANTILES:
+                value = stats[f"p{round(q * 100)}"]
+                if value is not None:
+                    lines.append(f'{prefix}_stage_seconds{{stage="{label}",quantile="{q}"}} {value}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{label}"}} {stats["total_seconds"]}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{label}"}} {stats["count"]}')
+        lines += [
+            f"# HELP {prefix}_stage_errors_total Failed stage executions.",
+            f"# TYPE {prefix}_stage_errors_total counter",
+        ]
+        lines += [f'{prefix}_stage_errors_total{{stage="{_label(name)}"}} {stats["errors"]}'
+                  for name, stats in stages.items()]
+        counter_names = sorted({c for stats in stages.values() for c in stats["counters"]})
+        for counter in counter_names:
+            metric = f"{prefix}_stage_{_metric_name(counter)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines += [f'{metric}{{stage="{_label(name)}"}} {stats["counters"][counter]}'
+                      for name, stats in stages.items() if counter in stats["counters"]]
+        lines.append(f"# TYPE {prefix}_run_wall_seconds gauge")
+        lines.append(f"{prefix}_run_wall_seconds {round(time.perf_counter() - self._start, 3)}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path, prefix="arxiv_pipeline"):
+        # textfile collector 要求整体替换，避免读到写了一半的文件
+        _write_atomic(path, self.prometheus_text(prefix))
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _metric_name(value):
+    return ''.join(c if c.isalnum() else '_' for c in str(value)).lower()
+
+
+def _write_atomic(path, text):
+    dir_name = os.path.dirname(path)
+    if dir_name:
+        os.makedirs(dir_name, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+已处理日期索引（arxiv_date.txt）
+按日期排序存放，查询用 bisect（O(log n)），文件未变化时复用内存中的索引；
+写入在文件锁内“读-改-整体替换”，同一仓库的并发运行不会互相覆盖
+
+行格式（兼容旧文件，只有日期的行视为 done）:
+    YYYYMMDD
+    YYYYMMDD<TAB>状态<TAB>论文数<TAB>耗时秒数
+状态: started（已开始）/ partial（部分论文未写入数据库）/ done（完成）
+"""
+
+import os
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows 上没有 fcntl，退化为仅进程内加锁
+    fcntl = None
+
+DEFAULT_PATH = "arxiv_date.txt"
+
+STARTED = "started"
+PARTIAL = "partial"
+DONE = "done"
+STATUSES = (STARTED, PARTIAL, DONE)
+
+
+def date_key(date_str):
+    """'YYYY-MM-DD' 或 'YYYYMMDD' -> 'YYYYMMDD'"""
+    return date_str.replace('-', '')
+
+
+def parse_line(line):
+    """
+    Returns:
+        dict or None: {"date", "status", "papers", "seconds"}，空行返回 None
+    """
+    fields = line.strip().split('\t')
+    if not fields[0]:
+        return None
+    status = fields[1] if len(fields) > 1 and fields[1] in STATUSES else DONE
+    papers = int(fields[2]) if len(fields) > 2 and fields[2].isdigit() else None
+    try:
+        seconds = float(fields[3]) if len(fields) > 3 and fields[3] else None
+    except ValueError:
+        seconds = None
+    return {"date": fields[0], "status": status, "papers": papers, "seconds": seconds}
+
+
+def format_line(record):
+    """done 且无统计信息时只写日期，与旧格式一致"""
+    if record["status"] == DONE and record["papers"] is None and record["seconds"] is None:
+        return record["date"]
+    papers = "" if record["papers"] is None else str(record["papers"])
+    seconds = "" if record["seconds"] is None else f"{record['seconds']:.1f}"
+    return '\t'.join((record["date"], record["status"], papers, seconds))
+
+
+class ProcessedDates:
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._keys = []
+        self._records = []
+
+    def _file_stamp(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        # 整体替换会换 inode，同一时间戳内的两次写入也能区分
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _read(self):
+        """读取全部记录，按日期排序；同一日期出现多次时后写的为准"""
+        records = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    record = parse_line(line)
+                    if record:
+                        records[record["date"]] = record
+        return [records[k] for k in sorted(records)]
+
+    def _refresh(self):
+        """文件（mtime, size, inode）变化时才重新读取"""
+        stamp = self._file_stamp()
+        if stamp != self._stamp:
+            records = self._read()
+            self._keys = [r["date"] for r in records]
+            self._records = records
+            self._stamp = stamp
+
+    def get(self, date_str):
+        """
+        Returns:
+            dict or None: 该日期的记录
+        """
+        key = date_key(date_str)
+        with self._lock:
+            self._refresh()
+            i = bisect_left(self._keys, key)
+            if i < len(self._keys) and self._keys[i] == key:
+                return dict(self._records[i])
+        return None
+
+    def status(self, date_str):
+        record = self.get(date_str)
+        return record["status"] if record else None
+
+    def is_done(self, date_str):
+        return self.status(date_str) == DONE
+
+    def unfinished(self):
+        """已开始但未完成（started / partial）的记录"""
+        with self._lock:
+            self._refresh()
+            return [dict(r) for r in self._records if r["status"] != DONE]
+
+    @contextmanager
+    def _file_lock(self):
+        """跨进程互斥（锁文件 + flock），进程内由 self._lock 串行化"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            dir_name = os.path.dirname(self.path)
+            if dir_name:
+                os.makedirs(dir_name, exist_ok=True)
+            with open(self.path + ".lock", 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def mark(self, date_str, status=DONE, papers=None, seconds=None):
+        """
+        记录日期状态（加锁后重新读取文件再合并写回，整体替换）
+
+        Args:
+            date_str (str): 'YYYY-MM-DD' 或 'YYYYMMDD'
+            status (str): started / partial / done
+            papers (int): 论文数（可选）
+            seconds (float): 耗时（可选）
+        """
+        if status not in STATUSES:
+            raise ValueError(f"未知状态: {status}")
+        key = date_key(date_str)
+        with self._file_lock():
+            records = self._read()
+            keys = [r["date"] for r in records]
+            record = {"date": key, "status": status, "papers": papers, "seconds": seconds}
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                records[i] = record
+            else:
+                keys.insert(i, key)
+                records.insert(i, record)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(''.join(format_line(r) + '\n' for r in records))
+            os.replace(tmp_path, self.path)
+            self._keys, self._records, self._stamp = keys, records, self._file_stamp()
+
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def open_processed(path=DEFAULT_PATH):
+    """按路径复用 ProcessedDates 实例，使文件未变化时的查询不再读盘"""
+    key = os.path.abspath(path)
+    with _instances_lock:
+        if key not in _instances:
+            _instances[key] = ProcessedDates(path)
+        return _instances[key]
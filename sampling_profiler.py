@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流水线采样分析器（--profile）
+后台线程按固定间隔读取所有线程的调用栈（sys._current_frames），以线程当前所在的
+pipeline_metrics 阶段作为栈根，多线程的样本合并到同一份统计；
+输出 flamegraph 可用的折叠栈（folded）与 speedscope JSON，多个进程的折叠栈可再合并
+
+用法:
+    with SamplingProfiler() as profiler:
+        run()
+    profiler.write("profile/run")   # run.folded + run.speedscope.json
+
+    python sampling_profiler.py merge -o all.folded a.folded b.folded --speedscope all.speedscope.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from pipeline_metrics import active_stages
+
+DEFAULT_INTERVAL = 0.005
+# 不在任何阶段内的线程（空闲的线程池、主线程等待）归到这个栈根
+NO_STAGE = "(no stage)"
+
+
+class SamplingProfiler:
+    def __init__(self, interval=DEFAULT_INTERVAL, all_threads=False):
+        """
+        Args:
+            interval (float): 采样间隔（秒）
+            all_threads (bool): 是否也采样不在任何阶段内的线程
+        """
+        self.interval = interval
+        self.all_threads = all_threads
+        self.samples = Counter()
+        self.sample_count = 0
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._started = None
+        self.elapsed = 0.0
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            # 折叠栈格式用 ';' 分隔帧
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ':')
+            self._labels[code] = label
+        return label
+
+    def _sample(self):
+        own = threading.get_ident()
+        stages = active_stages()
+        for tid, frame in sys._current_frames().items():
+            if tid == own:
+                continue
+            stage = stages.get(tid)
+            if stage is None and not self.all_threads:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(f"[{stage or NO_STAGE}]")
+            self.samples[tuple(reversed(stack))] += 1
+        self.sample_count += 1
+
+    def _run(self):
+        next_tick = time.perf_counter()
+        while not self._stop.is_set():
+            self._sample()
+            next_tick += self.interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_tick = time.perf_counter()
+
+    def start(self):
+        self._stop.clear()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.elapsed += time.perf_counter() - self._started
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def folded(self):
+        """折叠栈文本: 'root;caller;callee 样本数'"""
+        return format_folded(self.samples)
+
+    def write(self, prefix, name=None):
+        """
+        写出 <prefix>.folded 与 <prefix>.speedscope.json
+
+        Returns:
+            tuple: (folded 路径, speedscope 路径)
+        """
+        dir_name = os.path.dirname(prefix)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+        folded_path = prefix + ".folded"
+        speedscope_path = prefix + ".speedscope.json"
+        with open(folded_path, 'w', encoding='utf-8') as f:
+            f.write(self.folded())
+        write_speedscope(self.samples, speedscope_path, name=name or os.path.basename(prefix),
+                         interval=self.interval)
+        return folded_path, speedscope_path
+
+
+def format_folded(samples):
+    return ''.join(f"{';'.join(stack)} {count}\n" for stack, count in sorted(samples.items()))
+
+
+def parse_folded(text):
+    samples = Counter()
+    for line in text.splitlines():
+        stack, _, count = line.rstrip().rpartition(' ')
+        if stack and count.isdigit():
+            samples[tuple(stack.split(';'))] += int(count)
+    return samples
+
+
+def merge_folded(paths):
+    """合并多个折叠栈文件（例如多个进程的输出）"""
+    merged = Counter()
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            merged.update(parse_folded(f.read()))
+    return merged
+
+
+def speedscope_document(samples, name="pipeline", interval=DEFAULT_INTERVAL):
+    """speedscope 的 sampled profile 格式，权重为估算的秒数（样本数 × 采样间隔）"""
+    frames = []
+    index = {}
+    stacks = []
+    weights = []
+    for stack, count in sorted(samples.items()):
+        ids = []
+        for label in stack:
+            if label not in index:
+                index[label] = len(frames)
+                frames.append({"name": label})
+            ids.append(index[label])
+        stacks.append(ids)
+        weights.append(round(count * interval, 6))
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "sampling_profiler.py",
+        "shared": {"frames": frames},
+        "profiles": [{
+            "type": "sampled",
+            "name": name,
+            "unit": "seconds",
+            "startValue": 0,
+            "endValue": round(sum(weights), 6),
+            "samples": stacks,
+            "weights": weights,
+        }],
+    }
+
+
+def write_speedscope(samples, path, name="pipeline", interval=DEFAULT_INTERVAL):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(speedscope_document(samples, name, interval), f, ensure_ascii=False)
+
+
+def stage_totals(samples):
+    """按栈根（阶段）汇总样本数，降序"""
+    totals = Counter()
+    for stack, count in samples.items():
+        totals[stack[0]] += count
+    return totals.most_common()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="合并折叠栈文件")
+    sub = parser.add_subparsers(dest="command", required=True)
+    merge = sub.add_parser("merge", help="合并多个 .folded 文件")
+    merge.add_argument("inputs", nargs="+")
+    merge.add_argument("-o", "--output", required=True, help="合并后的 .folded 路径")
+    merge.add_argument("--speedscope", default=None, help="同时写出 speedscope JSON")
+    merge.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="采样间隔（用于换算秒数）")
+    args = parser.parse_args()
+
+    samples = merge_folded(args.inputs)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write(format_folded(samples))
+    if args.speedscope:
+        write_speedscope(samples, args.speedscope, name=os.path.basename(args.output), interval=args.interval)
+    for stage, count in stage_totals(samples):
+        print(f"{stage:<32}{count:>8} 样本")
+
+
+if __name__ == "__main__":
+    main()
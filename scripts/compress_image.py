@@ -1,43 +1,64 @@
+import argparse
+import concurrent.futures
+import glob
 import os
 import sys
+import time
 from PIL import Image
 
-def compress_image(input_path, quality=50):
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def encode_to_webp(input_path, quality=50, method=6):
+    """
+    Encode one image as '<name>.webp' next to it.
+
+    Returns:
+        dict: input/output paths, sizes in bytes and encode seconds
+    """
+    start = time.perf_counter()
+    output_path = f"{os.path.splitext(input_path)[0]}.webp"
+    with Image.open(input_path) as img:
+        # Convert to RGB if necessary (e.g., for PNGs with transparency)
+        if img.mode in ('RGBA', 'LA'):
+            # Keep transparency for WebP
+            pass
+        else:
+            img = img.convert('RGB')
+
+        # Save as WebP
+        img.save(output_path, 'WEBP', quality=quality, method=method)
+
+    return {
+        "input": input_path,
+        "output": output_path,
+        "original_size": os.path.getsize(input_path),
+        "new_size": os.path.getsize(output_path),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def compress_image(input_path, quality=50, method=6):
     """
     Compress an image to WebP format.
-    
+
     Args:
         input_path (str): Path to the input image (PNG/JPG).
         quality (int): Compression quality (0-100). Default is 50.
+        method (int): WebP encoder effort (0 fastest - 6 smallest). Default is 6.
     """
     if not os.path.exists(input_path):
         print(f"Error: File '{input_path}' not found.")
         return
 
-    # Generate output path
-    filename = os.path.splitext(input_path)[0]
-    output_path = f"{filename}.webp"
-
     try:
-        # Open and convert image
-        with Image.open(input_path) as img:
-            # Convert to RGB if necessary (e.g., for PNGs with transparency)
-            if img.mode in ('RGBA', 'LA'):
-                # Keep transparency for WebP
-                pass
-            else:
-                img = img.convert('RGB')
-            
-            # Save as WebP
-            img.save(output_path, 'WEBP', quality=quality, method=6)
-            
-        # Calculate stats
-        original_size = os.path.getsize(input_path)
-        new_size = os.path.getsize(output_path)
+        stats = encode_to_webp(input_path, quality, method)
+        original_size = stats["original_size"]
+        new_size = stats["new_size"]
         reduction = (original_size - new_size) / original_size * 100
 
         print(f"✅ Successfully compressed '{input_path}'")
-        print(f"📍 Output: '{output_path}'")
+        print(f"📍 Output: '{stats['output']}'")
         print(f"📊 Stats:")
         print(f"   Original size: {original_size / 1024:.2f} KB")
         print(f"   New size:      {new_size / 1024:.2f} KB")
@@ -46,20 +67,138 @@ def compress_image(input_path, quality=50):
     except Exception as e:
         print(f"❌ Error processing image: {e}")
 
+
+def collect_sources(patterns):
+    """
+    Expand files, directories (searched recursively) and glob patterns into
+    PNG/JPG paths, in order and without duplicates.
+    """
+    sources = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = sorted(glob.glob(os.path.join(glob.escape(pattern), '**', '*'), recursive=True))
+        elif os.path.exists(pattern):
+            matches = [pattern]
+        else:
+            matches = sorted(glob.glob(pattern, recursive=True))
+            if not matches:
+                print(f"Warning: '{pattern}' matched no files.")
+        sources.extend(p for p in matches if os.path.isfile(p) and p.lower().endswith(SOURCE_EXTENSIONS))
+    return list(dict.fromkeys(sources))
+
+
+def is_up_to_date(input_path):
+    """True when '<name>.webp' exists and is newer than the source."""
+    output_path = f"{os.path.splitext(input_path)[0]}.webp"
+    return os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(input_path)
+
+
+def _encode_job(args):
+    input_path, quality, method = args
+    try:
+        return encode_to_webp(input_path, quality, method)
+    except Exception as e:
+        return {"input": input_path, "error": str(e)}
+
+
+def compress_batch(patterns, quality=50, method=6, workers=None, force=False):
+    """
+    Encode every matching image in a process pool, skipping outputs that are
+    newer than their source unless force is set, then print an aggregate report.
+
+    Returns:
+        dict: aggregate counts, sizes and timings
+    """
+    start = time.perf_counter()
+    sources = collect_sources(patterns)
+    todo = [p for p in sources if force or not is_up_to_date(p)]
+    skipped = len(sources) - len(todo)
+
+    results = []
+    if todo:
+        workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            for stats in pool.map(_encode_job, [(p, quality, method) for p in todo]):
+                if "error" in stats:
+                    print(f"❌ {stats['input']}: {stats['error']}")
+                else:
+                    saved = stats["original_size"] - stats["new_size"]
+                    print(f"✅ {stats['input']} -> {stats['output']} "
+                          f"({stats['original_size'] / 1024:.1f} KB -> {stats['new_size'] / 1024:.1f} KB, "
+                          f"{saved / 1024:.1f} KB saved, {stats['seconds']:.2f}s)")
+                results.append(stats)
+
+    done = [r for r in results if "error" not in r]
+    report = {
+        "matched": len(sources),
+        "encoded": len(done),
+        "skipped": skipped,
+        "failed": len(results) - len(done),
+        "original_size": sum(r["original_size"] for r in done),
+        "new_size": sum(r["new_size"] for r in done),
+        "encode_seconds": sum(r["seconds"] for r in done),
+        "wall_seconds": time.perf_counter() - start,
+    }
+    print(f"📊 {report['matched']} images: {report['encoded']} encoded, {report['skipped']} up to date, "
+          f"{report['failed']} failed")
+    if done:
+        reduction = (report["original_size"] - report["new_size"]) / report["original_size"] * 100
+        print(f"   Size:  {report['original_size'] / 1024:.1f} KB -> {report['new_size'] / 1024:.1f} KB "
+              f"({reduction:.2f}% reduction)")
+        print(f"   Time:  {report['wall_seconds']:.2f}s wall, {report['encode_seconds']:.2f}s encoding "
+              f"across {workers} worker(s)")
+    return report
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(
+        description="Compress PNG/JPG images to WebP next to the source.",
+        epilog="Examples:\n"
+               "  python3 compress_image.py static/img/photo.png 75\n"
+               "  python3 compress_image.py static/img 'docs/**/*.png' -j 8",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("paths", nargs="+", help="Image files, directories or glob patterns; "
+                                                 "a trailing integer is read as the quality")
+    parser.add_argument("-q", "--quality", type=int, default=None, help="Compression quality (0-100). Default is 50.")
+    parser.add_argument("-m", "--method", type=int, default=6, help="WebP effort (0 fastest - 6 smallest). Default is 6.")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Parallel encoder processes (default: CPU count)")
+    parser.add_argument("-f", "--force", action="store_true", help="Re-encode even if the .webp is newer than the source")
+    args = parser.parse_args(argv)
+
+    # Backwards compatible form: compress_image.py <image_path> [quality]
+    # With an existing file first, the second argument is always the quality (as before).
+    # Otherwise only a trailing integer is; anything else stays a path, so a missing
+    # file is reported by collect_sources instead of being dropped.
+    if len(args.paths) > 1 and not os.path.exists(args.paths[-1]):
+        single_file = len(args.paths) == 2 and os.path.isfile(args.paths[0])
+        try:
+            quality = int(args.paths[-1])
+        except ValueError:
+            if single_file:
+                print("Warning: Quality must be an integer. Using default (50).")
+                args.paths.pop()
+        else:
+            args.paths.pop()
+            if args.quality is None:
+                args.quality = quality
+    if args.quality is None:
+        args.quality = 50
+    return args
+
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python3 compress_image.py <image_path> [quality]")
+        print("Usage: python3 compress_image.py <image_path|dir|glob>... [quality]")
         print("Example: python3 compress_image.py static/img/photo.png 75")
+        print("Example: python3 compress_image.py static/img -j 8")
         sys.exit(1)
 
-    input_file = sys.argv[1]
-    
-    # Optional quality argument
-    quality_val = 50
-    if len(sys.argv) > 2:
-        try:
-            quality_val = int(sys.argv[2])
-        except ValueError:
-            print("Warning: Quality must be an integer. Using default (50).")
-
-    compress_image(input_file, quality_val)
+    args = parse_args(sys.argv[1:])
+    if len(args.paths) == 1 and not os.path.isdir(args.paths[0]) and not glob.has_magic(args.paths[0]):
+        # Single file: same behaviour and output as before (always re-encodes)
+        compress_image(args.paths[0], args.quality, args.method)
+    else:
+        report = compress_batch(args.paths, quality=args.quality, method=args.method,
+                                workers=args.workers, force=args.force)
+        sys.exit(1 if report["failed"] else 0)
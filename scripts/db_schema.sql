@@ -12,6 +12,7 @@ create table if not exists papers (
   link text,
   code_url text,
   thumbnail_url text,
+  thumbnail_variants jsonb, -- {"160": url, "320": url, "640": url}: the same thumbnail at several widths
   summary text,
   contributions text,
   mindmap text,
@@ -22,6 +23,9 @@ create table if not exists papers (
   constraint papers_link_key unique (link)
 );
 
+-- Existing tables: add the column introduced with multi-resolution thumbnails
+alter table papers add column if not exists thumbnail_variants jsonb;
+
 -- Set up Row Level Security (RLS)
 -- 1. Enable RLS
 alter table papers enable row level security;
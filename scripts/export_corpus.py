@@ -0,0 +1,48 @@
+import os
+import sys
+import time
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOCS_DIR = os.path.join(ROOT_DIR, 'docs', 'daily')
+CORPUS_DIR = os.path.join(ROOT_DIR, '.cache', 'corpus')
+
+sys.path.insert(0, ROOT_DIR)
+from columnar_export import export_rows, scan
+from migrate_to_supabase import list_md_files, parse_md_content
+
+
+def export_docs(docs_dir=DOCS_DIR, corpus_dir=CORPUS_DIR):
+    """Backfill the columnar corpus from docs/daily/<category>/*.md, one category at a time."""
+    started = time.time()
+    by_category = {}
+    for slug, path in list_md_files(docs_dir):
+        by_category.setdefault(slug, []).append(path)
+
+    total = 0
+    for slug, paths in sorted(by_category.items()):
+        rows = []
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                rows.extend(parse_md_content(f.read(), slug))
+        partitions = export_rows(rows, corpus_dir)
+        total += len(rows)
+        print(f"{slug}: {len(rows)} papers from {len(paths)} files -> {partitions} partitions")
+    print(f"Exported {total} papers to {corpus_dir} in {time.time() - started:.1f}s")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Export docs/daily markdown into the columnar (Arrow IPC) corpus")
+    ap.add_argument("--docs-dir", default=DOCS_DIR)
+    ap.add_argument("--corpus-dir", default=CORPUS_DIR)
+    ap.add_argument("--stats", action="store_true", help="Print per-category row counts of the corpus afterwards")
+    args = ap.parse_args()
+    export_docs(args.docs_dir, args.corpus_dir)
+    if args.stats:
+        counts = scan(args.corpus_dir, columns=("category_slug",)).column("category_slug").value_counts()
+        for entry in sorted(counts.to_pylist(), key=lambda e: e["values"] or ""):
+            print(f"  {entry['values']}: {entry['counts']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,36 @@
 import os
 import re
+import sys
 import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 import time
 
-# Try to import supabase, but don't fail immediately if not installed
-try:
-    from supabase import create_client, Client
-except ImportError:
-    print("Error: 'supabase' package not found. Please run: pip install supabase")
-    exit(1)
-
-# Configuration
-# Users should set these environment variables
-SUPABASE_URL = os.environ.get("SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY") # Use Service Role Key for writing
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DOCS_DIR = os.path.join(ROOT_DIR, 'docs', 'daily')
+MANIFEST_PATH = os.path.join(ROOT_DIR, '.cache', 'migrate_manifest.json')
+# manifest.extra key of the link -> source file map (see table_sources)
+SOURCES_KEY = 'link_sources'
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    print("Error: Please set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY environment variables.")
-    print("Usage: export SUPABASE_URL='...' && export SUPABASE_SERVICE_ROLE_KEY='...' && python migrate_to_supabase.py")
-    exit(1)
+sys.path.insert(0, ROOT_DIR)
+from paper_store import open_store
+from file_manifest import FileManifest, file_stat, content_hash, row_hash
+from weekly_md import tokenize_week
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DOCS_DIR = os.path.join(ROOT_DIR, 'docs', 'daily')
+def get_store():
+    """
+    Open the configured paper store.
+    Uses PAPER_STORE_URL (e.g. sqlite:///papers.db) when set, otherwise Supabase.
+    """
+    store = open_store()
+    if store is None:
+        print("Error: Please set SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY environment variables,")
+        print("or PAPER_STORE_URL for a local backend (e.g. sqlite:///papers.db).")
+        print("Usage: export SUPABASE_URL='...' && export SUPABASE_SERVICE_ROLE_KEY='...' && python migrate_to_supabase.py")
+        exit(1)
+    return store
 
 def escape_mdx_content(text):
     if not text:
@@ -37,126 +43,255 @@ def parse_md_file(file_path, category_slug):
     
     with open(file_path, 'r', encoding='utf-8') as f:
         content = f.read()
-    
+    return parse_md_content(content, category_slug)
+
+def parse_md_content(content, category_slug):
     items_data = []
-    
-    # Extract entries by date headers
-    # Matches ## YYYY-MM-DD
-    headers = list(re.finditer(r'(^|\n)##\s*(\d{4}-\d{2}-\d{2})', content))
-    
-    for i, hm in enumerate(headers):
-        day_str = hm.group(2)
-        start = hm.end()
-        end = headers[i+1].start() if i+1 < len(headers) else len(content)
-        section = content[start:end]
-        
-        # Parse individual papers in this day section
-        # Matches - **[Title]**
-        tms = list(re.finditer(r'^-\s+\*\*\[[^\]]+\]\s*(.*?)\*\*', section, re.M))
-        
-        for j, tm in enumerate(tms):
-            title = tm.group(1).strip()
-            entry_start = tm.end()
-            entry_end = tms[j+1].start() if j+1 < len(tms) else len(section)
-            entry = section[entry_start:entry_end]
-            
-            # Extract fields
-            am = re.search(r'^\s+-\s+\*\*authors:\*\*\s*(.+)$', entry, re.M)
-            lm = re.search(r'^\s+-\s+\*\*link:\*\*\s*(\S+)', entry, re.M)
-            tmn = re.search(r'^\s+-\s+\*\*thumbnail:\*\*\s*(\S+)', entry, re.M)
-            cd = re.search(r'^\s+-\s+\*\*code:\*\*\s*(\S+)', entry, re.M)
-            im = re.search(r'^\s+-\s+\*\*institution:\*\*\s*(.+)$', entry, re.M)
-            tg = re.search(r'^\s+-\s+\*\*tags:\*\*\s*(.+)$', entry, re.M)
-            cm = re.search(r'^\s+-\s+\*\*contributions:\*\*\s*(.+)$', entry, re.M)
-            sm = re.search(r'^\s+-\s+\*\*Simple LLM Summary:\*\*\s*(.+)$', entry, re.M)
-            mm = re.search(r'^\s+-\s+\*\*Mindmap:\*\*\s*\n\s*```mermaid\n([\s\S]+?)\n\s*```', entry, re.M)
-            
-            # Process fields
-            authors = am.group(1).strip() if am else ""
-            link = lm.group(1).strip() if lm else None
-            thumbnail = tmn.group(1).strip() if tmn else None
-            code = cd.group(1).strip() if cd else None
-            institution = im.group(1).strip() if im else ""
-            tags_raw = tg.group(1).strip() if tg else ""
-            contributions = cm.group(1).strip() if cm else ""
-            summary = sm.group(1).strip() if sm else ""
-            mindmap = mm.group(1).strip() if mm else ""
-
-            # Clean fields
-            contributions = escape_mdx_content(contributions)
-            summary = escape_mdx_content(summary)
-            if mindmap:
-                mindmap = mindmap.replace('"', '”')
-            
-            # Parse tags
-            tag_list = []
-            if tags_raw:
-                cleaned = tags_raw.replace('[', '').replace(']', '')
-                parts = cleaned.split(',')
-                tag_list = [t.strip() for t in parts if t.strip()]
-
-            if not link:
-                continue # Skip if no link (key)
-
-            items_data.append({
-                "category_slug": category_slug,
-                "title": title,
-                "published_date": day_str,
-                "authors": authors,
-                "institution": institution,
-                "link": link,
-                "code_url": code,
-                "thumbnail_url": thumbnail,
-                "summary": summary,
-                "contributions": contributions,
-                "mindmap": mindmap,
-                "tags": tag_list
-            })
-            
+
+    # Single pass over the file: date headers, paper titles and field lines
+    for rec in tokenize_week(content)["records"]:
+        link = rec["link"]
+        if not link:
+            continue # Skip if no link (key)
+
+        # Clean fields
+        contributions = escape_mdx_content(rec["contributions"] or "")
+        summary = escape_mdx_content(rec["summary"] or "")
+        mindmap = rec["mindmap"] or ""
+        if mindmap:
+            mindmap = mindmap.replace('"', '”')
+
+        # Parse tags
+        tag_list = []
+        tags_raw = rec["tags"] or ""
+        if tags_raw:
+            cleaned = tags_raw.replace('[', '').replace(']', '')
+            parts = cleaned.split(',')
+            tag_list = [t.strip() for t in parts if t.strip()]
+
+        items_data.append({
+            "category_slug": category_slug,
+            "title": rec["title"],
+            "published_date": rec["day"],
+            "authors": rec["authors"] or "",
+            "institution": rec["institution"] or "",
+            "link": link,
+            "code_url": rec["code"],
+            "thumbnail_url": rec["thumbnail"],
+            "summary": summary,
+            "contributions": contributions,
+            "mindmap": mindmap,
+            "tags": tag_list
+        })
+
     return items_data
 
-def migrate():
-    print(f"Scanning directory: {DOCS_DIR}")
-    
-    # Traverse directory
-    total_papers = 0
-    
-    for root, dirs, files in os.walk(DOCS_DIR):
+def list_md_files(docs_dir=DOCS_DIR):
+    """Return sorted (category_slug, file_path) pairs under docs/daily/<category>/."""
+    found = []
+    for root, dirs, files in os.walk(docs_dir):
         # Infer category from directory name
         # Structure: docs/daily/cs_CV/20230101-20230107.md
-        rel_path = os.path.relpath(root, DOCS_DIR)
+        rel_path = os.path.relpath(root, docs_dir)
         if rel_path == '.':
             continue
-            
         category_slug = os.path.basename(root) # e.g. cs_CV
-        
         for file in files:
-            if not file.endswith('.md'):
-                continue
-            
-            file_path = os.path.join(root, file)
-            print(f"Processing {category_slug} / {file} ...")
-            
-            papers = parse_md_file(file_path, category_slug)
-            
-            if not papers:
-                continue
-                
-            # Batch insert/upsert
-            # Supabase Python client supports upsert
+            if file.endswith('.md'):
+                found.append((category_slug, os.path.join(root, file)))
+    found.sort()
+    return found
+
+def _parse_job(job):
+    """
+    Worker: read a file and parse it unless its content hash is unchanged.
+    Returns (file_path, sha1, rows); rows is None when the content did not change.
+    """
+    category_slug, file_path, prev_sha1 = job
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    sha1 = content_hash(data)
+    if sha1 == prev_sha1:
+        return file_path, sha1, None
+    return file_path, sha1, parse_md_content(data.decode('utf-8'), category_slug)
+
+def merge_rows(parsed):
+    """
+    Merge rows from several files and dedupe by link.
+    Files are merged in sorted order, so the last file wins, which matches what
+    sequential upserts would leave in the table. Postgres also rejects an upsert
+    that touches the same link twice in one statement.
+    """
+    by_link = {}
+    for rows in parsed:
+        for row in rows:
+            by_link[row['link']] = row
+    return list(by_link.values())
+
+def link_owners(all_files, keys, manifest, parsed):
+    """
+    Map every link to the file whose row belongs in the table: the last file in
+    sorted order that contains it, as a full sequential migration would leave it.
+    Files parsed in this run use their new links (`parsed`: path -> {link: hash});
+    the others use the links recorded in the manifest. The winner therefore does
+    not depend on chunking or on which files happened to change.
+    """
+    owners = {}
+    for _, path in all_files:
+        links = parsed.get(path)
+        if links is None:
+            links = (manifest.get(keys[path]) or {}).get('rows', {})
+        for link in links:
+            owners[link] = path
+    return owners
+
+def table_sources(manifest):
+    """
+    link -> manifest key of the file whose row was last written to the table.
+    Kept in the manifest so a link whose owner moves to a file that did not
+    change in this run is still rewritten from its new owner. Manifests written
+    before this was tracked fall back to the owners their file entries imply.
+    """
+    sources = manifest.extra.get(SOURCES_KEY)
+    if sources is None:
+        sources = {}
+        for key in sorted(manifest.files):
+            for link in manifest.files[key].get('rows', {}):
+                sources[link] = key
+        manifest.extra[SOURCES_KEY] = sources
+    return sources
+
+def upsert_rows(store, rows, batch_size=50, concurrency=4, max_retries=3):
+    """Upsert rows in bounded concurrent batches. Returns the number of rows that failed."""
+    def write(batch):
+        for attempt in range(max_retries + 1):
             try:
-                # We do it in batches of 100 to avoid request size limits
-                batch_size = 50
-                for i in range(0, len(papers), batch_size):
-                    batch = papers[i:i+batch_size]
-                    response = supabase.table('papers').upsert(batch, on_conflict='link').execute()
-                    # print(f"  Inserted {len(batch)} papers.")
-                
-                total_papers += len(papers)
+                store.upsert(batch)
+                return 0
             except Exception as e:
-                print(f"  Error inserting batch: {e}")
-                
-    print(f"Migration completed. Total papers processed: {total_papers}")
+                if attempt >= max_retries:
+                    print(f"  Error inserting batch: {e}")
+                    return len(batch)
+                time.sleep(2 ** attempt)
+
+    batches = [rows[i:i+batch_size] for i in range(0, len(rows), batch_size)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return sum(pool.map(write, batches))
+
+def migrate(store=None, docs_dir=DOCS_DIR, workers=None, concurrency=4, batch_size=50,
+            chunk_files=200, manifest_path=MANIFEST_PATH, full=False):
+    """
+    Parse docs/daily in a process pool and upsert only what changed.
+
+    A link that appears in several category files is written once, from the
+    last of those files in sorted order (see link_owners). The manifest also
+    records which file each link was last written from, so when the owner
+    moves to a file that did not change (e.g. the old owner dropped the link)
+    that file is re-read and its row written.
+
+    A manifest at `manifest_path` records each file's mtime/size/sha1 and the
+    hash of every row it produced. Files whose stat or content hash is unchanged
+    are skipped; changed files only send rows whose hash differs from the last
+    run. The manifest is saved after every fully written chunk of
+    `chunk_files` changed files, so an interrupted run resumes where it stopped.
+    """
+    store = store or get_store()
+    print(f"Scanning directory: {docs_dir}")
+
+    manifest = FileManifest(manifest_path)
+    if full:
+        manifest.files = {}
+        manifest.extra = {}
+    sources = table_sources(manifest)
+
+    all_files = list_md_files(docs_dir)
+    keys = {path: os.path.relpath(path, docs_dir) for _, path in all_files}
+    slugs = {path: category_slug for category_slug, path in all_files}
+    stats = {}
+    jobs = []
+    for category_slug, path in all_files:
+        stat = file_stat(path)
+        if manifest.stat_unchanged(keys[path], stat):
+            continue
+        stats[path] = stat
+        prev = manifest.get(keys[path]) or {}
+        jobs.append((category_slug, path, prev.get('sha1')))
+    removed = manifest.prune(keys.values())
+    print(f"Files: {len(all_files)} total, {len(jobs)} with new mtime/size, {len(removed)} removed")
+
+    total_papers = 0
+    failed_papers = 0
+    started = time.time()
+    # Parse everything first so duplicate links are resolved across the whole run
+    changed = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, sha1, rows in pool.map(_parse_job, jobs, chunksize=8):
+            key = keys[path]
+            if rows is None:
+                # Content identical, only the mtime moved (e.g. fresh git checkout)
+                manifest.touch(key, stats[path])
+                continue
+            hashes = {row['link']: row_hash(row) for row in rows}
+            changed.append((key, path, sha1, hashes, rows))
+        owners = link_owners(all_files, keys, manifest, {path: hashes for _, path, _, hashes, _ in changed})
+
+        # A link whose owner moved to a file that was not parsed above (e.g. the
+        # previous owner dropped it) needs that file's row again
+        parsed = {path for _, path, _, _, _ in changed}
+        moved = sorted({path for link, path in owners.items()
+                        if path not in parsed and sources.get(link) != keys[path]})
+        for path, sha1, rows in pool.map(_parse_job, [(slugs[path], path, None) for path in moved]):
+            stats.setdefault(path, file_stat(path))
+            changed.append((keys[path], path, sha1, {row['link']: row_hash(row) for row in rows}, rows))
+    print(f"Parsed {len(jobs)} files, {len(changed) - len(moved)} changed, "
+          f"{len(moved)} re-read for moved links ({time.time() - started:.1f}s)")
+
+    for i in range(0, len(changed), chunk_files):
+        chunk = changed[i:i+chunk_files]
+        deltas = []
+        written = {}
+        for key, path, sha1, hashes, rows in chunk:
+            prev_rows = (manifest.get(key) or {}).get('rows', {})
+            # Rows of a link owned by another file are left to that file; an owned
+            # row is sent when it changed or the table holds another file's copy
+            delta = [row for row in rows if owners[row['link']] == path
+                     and (sources.get(row['link']) != key or prev_rows.get(row['link']) != hashes[row['link']])]
+            written.update((row['link'], key) for row in delta)
+            deltas.append(delta)
+
+        rows = merge_rows(deltas)
+        failed = upsert_rows(store, rows, batch_size=batch_size, concurrency=concurrency)
+        total_papers += len(rows) - failed
+        failed_papers += failed
+        if not failed:
+            for key, path, sha1, hashes, _ in chunk:
+                manifest.set(key, stats[path], sha1, rows=hashes)
+            sources.update(written)
+        manifest.save()
+        print(f"Processed {min(i + chunk_files, len(changed))}/{len(changed)} changed files, "
+              f"{total_papers} rows upserted ({time.time() - started:.1f}s)")
+    # Links that no longer appear in any file keep their last row in the table
+    for link in [link for link in sources if link not in owners]:
+        del sources[link]
+    manifest.save()
+
+    if failed_papers:
+        print(f"Migration finished with {failed_papers} failed papers; rerun to retry them.")
+    else:
+        print(f"Migration completed. Total papers processed: {total_papers}")
+
+def main():
+    ap = argparse.ArgumentParser(description="Migrate docs/daily markdown into the papers table")
+    ap.add_argument("--docs-dir", default=DOCS_DIR)
+    ap.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    ap.add_argument("--concurrency", type=int, default=4, help="Concurrent upsert batches")
+    ap.add_argument("--batch-size", type=int, default=50)
+    ap.add_argument("--chunk-files", type=int, default=200, help="Files per resumable chunk")
+    ap.add_argument("--manifest", default=MANIFEST_PATH, help="File/row fingerprint manifest path")
+    ap.add_argument("--full", action="store_true", help="Ignore the manifest and re-upsert everything")
+    args = ap.parse_args()
+    migrate(docs_dir=args.docs_dir, workers=args.workers, concurrency=args.concurrency, batch_size=args.batch_size,
+            chunk_files=args.chunk_files, manifest_path=args.manifest, full=args.full)
 
 if __name__ == "__main__":
-    migrate()
+    main()
@@ -1,18 +1,25 @@
 import os
+import sys
 import json
-from supabase import create_client, Client
 from datetime import datetime
 
-# Initialize Supabase client
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from paper_store import open_store, get_supabase_client, SupabasePaperStore
+
+# Initialize paper store (PAPER_STORE_URL for a local backend, otherwise Supabase)
 url: str = os.environ.get("SUPABASE_URL")
 key: str = os.environ.get("SUPABASE_KEY") or os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
 
-if not url or not key:
+if os.environ.get("PAPER_STORE_URL"):
+    store = open_store()
+elif url and key:
+    store = SupabasePaperStore(get_supabase_client(url, key))
+else:
     print("Error: SUPABASE_URL and SUPABASE_KEY (or SUPABASE_SERVICE_ROLE_KEY) environment variables are required.")
+    print("Alternatively set PAPER_STORE_URL (e.g. sqlite:///papers.db, or arrow:///.cache/corpus for the")
+    print("columnar corpus written by --export-corpus / scripts/export_corpus.py) to read from a local store.")
     exit(1)
 
-supabase: Client = create_client(url, key)
-
 # Configuration
 CATEGORIES_MAP = {
     "ai": ["cs_AI"],
@@ -23,20 +30,24 @@ CATEGORIES_MAP = {
 
 COLORS = ["#60a5fa", "#34d399", "#818cf8", "#f472b6", "#fbbf24"]
 
+# Dashboard preview images are small; use the 320px variant when the paper has one
+CARD_THUMBNAIL_WIDTH = "320"
+
+CARD_COLUMNS = ("id", "title", "published_date", "authors", "category_slug", "tags", "thumbnail_url")
+
 def fetch_papers(categories, limit=3):
-    try:
-        # Fetch papers that match any of the specified category slugs
-        response = supabase.table("papers") \
-            .select("id, title, published_date, authors, category_slug, tags, thumbnail_url") \
-            .in_("category_slug", categories) \
-            .order("published_date", desc=True) \
-            .limit(limit) \
-            .execute()
-        
-        return response.data
-    except Exception as e:
-        print(f"Error fetching papers for {categories}: {e}")
-        return []
+    # Tables created before thumbnail_variants existed lack the column; fall back to the old column list
+    for columns in (CARD_COLUMNS + ("thumbnail_variants",), CARD_COLUMNS):
+        try:
+            # Fetch papers that match any of the specified category slugs
+            return store.fetch_latest(categories, limit=limit, columns=columns)
+        except Exception as e:
+            if "thumbnail_variants" in columns and "thumbnail_variants" in str(e):
+                print("papers.thumbnail_variants is missing; using thumbnail_url only (see README_DB.md)")
+                continue
+            print(f"Error fetching papers for {categories}: {e}")
+            return []
+    return []
 
 def format_paper(paper, index):
     # Extract first author
@@ -66,7 +77,7 @@ def format_paper(paper, index):
         "author": author,
         "tags": [{"label": tag_label, "color": color}],
         "hasCode": False,  # Default to False
-        "imgUrl": paper.get("thumbnail_url")
+        "imgUrl": (paper.get("thumbnail_variants") or {}).get(CARD_THUMBNAIL_WIDTH) or paper.get("thumbnail_url")
     }
 
 def main():
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+arxiv-daily 页面的预构建搜索索引（静态文件，目标是让前端无需访问数据库即可搜索）
+
+范围目前只有生成端与 Python 参考读取器 SearchIndex：update_arxiv.yml 不构建该索引，
+前端也没有加载器，页面搜索仍查询 Supabase
+
+- 文档: 按日期降序分配整数 ID（ID 越小越新），文档表按块切分
+- 倒排表: 标题、tags、作者、机构分词后的 词 -> 文档 ID 列表，差分编码
+- 按词前缀（前两个字符）分片，查询时只加载用到的分片
+
+目录结构:
+    <index_dir>/manifest.json
+    <index_dir>/docs/<块号>.<哈希>.json     [[title, day, slugs, link, thumbnail], ...]
+    <index_dir>/terms/<前缀>.<哈希>.json    {"词": [首个 ID, 差值, 差值, ...]}
+"""
+
+import json
+import os
+import re
+import unicodedata
+from datetime import datetime, timezone
+from itertools import accumulate
+
+from file_manifest import content_hash
+from static_shards import MANIFEST_NAME, previous_files, remove_stale, resolve_encodings, write_atomic, write_chunk
+
+SEARCH_FORMAT_VERSION = 1
+# 分片前缀长度
+PREFIX_LEN = 2
+DOC_FIELDS = ("title", "day", "slugs", "link", "thumbnail")
+
+# 中日韩字符逐字成词，其余按连续的字母数字切分
+_TOKEN_RE = re.compile(r'[\u3400-\u9fff]|[^\W_\u3400-\u9fff]+')
+_STOPWORDS = frozenset((
+    "a", "an", "and", "are", "as", "at", "by", "for", "from", "in", "is", "of", "on", "or",
+    "the", "to", "via", "with",
+))
+
+
+def tokenize(text):
+    """小写 + NFKC 归一化后分词，去掉停用词与单个 ASCII 字符"""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    return [t for t in _TOKEN_RE.findall(text)
+            if t not in _STOPWORDS and not (len(t) == 1 and t.isascii())]
+
+
+def delta_encode(ids):
+    """递增的 ID 列表 -> 首值 + 相邻差值"""
+    return [b - a for a, b in zip([0] + ids[:-1], ids)]
+
+
+def delta_decode(deltas):
+    return list(accumulate(deltas))
+
+
+def shard_key(term):
+    return term[:PREFIX_LEN]
+
+
+def _shard_name(key):
+    # 非 ASCII 字符用定长码点，保证文件名安全且不冲突
+    return ''.join(c if c.isascii() else f"u{ord(c):05x}" for c in key)
+
+
+def _item_text(it):
+    return ' '.join((it.get('title') or '', ' '.join(it.get('tags') or []),
+                     it.get('authors') or '', it.get('institution') or ''))
+
+
+def build_search_index(categories):
+    """
+    Args:
+        categories (list): build() 产出的分类 [{"slug", "items"}]
+
+    Returns:
+        tuple: (文档列表 [[title, day, slugs, link, thumbnail]], 倒排表 {词: 递增的文档 ID 列表})
+    """
+    # 同一篇论文可能出现在多个分类，合并为一个文档
+    merged = {}
+    for cat in categories:
+        for it in cat.get('items', []):
+            key = it.get('link') or (it.get('title'), it.get('day'))
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = (it, [cat['slug']])
+            elif cat['slug'] not in entry[1]:
+                entry[1].append(cat['slug'])
+    ordered = sorted(merged.values(), key=lambda e: e[0].get('day') or '', reverse=True)
+
+    docs = []
+    postings = {}
+    for doc_id, (it, slugs) in enumerate(ordered):
+        docs.append([it.get('title'), it.get('day'), slugs, it.get('link'), it.get('thumbnail')])
+        for term in set(tokenize(_item_text(it))):
+            postings.setdefault(term, []).append(doc_id)
+    return docs, postings
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _index_files(manifest):
+    if "term_shards" not in manifest:
+        return None
+    return list(manifest.get("doc_shards", [])) + list(manifest["term_shards"].values())
+
+
+def write_search_index(categories, index_dir, docs_per_shard=1000, compress=("gzip",)):
+    """
+    写出索引分片与 manifest；内容哈希命名，未变化的分片不重写，上一版 manifest 引用的过期分片删除
+
+    Returns:
+        dict: manifest 内容
+    """
+    encodings, suffixes = resolve_encodings(compress)
+    docs, postings = build_search_index(categories)
+    previous = previous_files(index_dir, _index_files)
+    os.makedirs(index_dir, exist_ok=True)
+    live = set()
+
+    def emit(prefix, name, obj):
+        data = _dumps(obj)
+        rel_path = f"{prefix}/{name}.{content_hash(data)[:12]}.json"
+        write_chunk(index_dir, rel_path, data, encodings)
+        live.add(rel_path)
+        live.update(rel_path + suffix for suffix in suffixes)
+        return rel_path
+
+    doc_shards = [emit("docs", str(i // docs_per_shard), docs[i:i + docs_per_shard])
+                  for i in range(0, len(docs), docs_per_shard)]
+
+    shards = {}
+    for term in sorted(postings):
+        shards.setdefault(shard_key(term), {})[term] = delta_encode(postings[term])
+    term_shards = {key: emit("terms", _shard_name(key), terms) for key, terms in shards.items()}
+
+    manifest = {
+        "version": SEARCH_FORMAT_VERSION,
+        "generated_at": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "doc_count": len(docs),
+        "doc_fields": list(DOC_FIELDS),
+        "docs_per_shard": docs_per_shard,
+        "prefix_len": PREFIX_LEN,
+        "encodings": encodings,
+        "doc_shards": doc_shards,
+        "term_shards": term_shards,
+    }
+    write_atomic(os.path.join(index_dir, MANIFEST_NAME), _dumps(manifest))
+    removed = remove_stale(index_dir, live, previous)
+    print(f"搜索索引: {len(docs)} 篇文档，{len(postings)} 个词，{len(term_shards)} 个分片，清理 {removed} 个过期文件")
+    return manifest
+
+
+class SearchIndex:
+    """读取 write_search_index 的输出并查询（查询规则的参考实现），按需加载分片"""
+
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            self.manifest = json.load(f)
+        self._terms = {}
+        self._docs = {}
+
+    def _load(self, rel_path):
+        with open(os.path.join(self.index_dir, rel_path), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _term_shard(self, key):
+        if key not in self._terms:
+            rel_path = self.manifest["term_shards"].get(key)
+            self._terms[key] = self._load(rel_path) if rel_path else {}
+        return self._terms[key]
+
+    def _postings(self, token, prefix=False):
+        if not prefix:
+            deltas = self._term_shard(shard_key(token)).get(token)
+            return set(delta_decode(deltas)) if deltas else set()
+        # 前缀匹配：短于分片前缀的词需要扫描所有以它开头的分片
+        if len(token) >= PREFIX_LEN:
+            keys = [shard_key(token)]
+        else:
+            keys = [k for k in self.manifest["term_shards"] if k.startswith(token)]
+        ids = set()
+        for key in keys:
+            for term, deltas in self._term_shard(key).items():
+                if term.startswith(token):
+                    ids.update(delta_decode(deltas))
+        return ids
+
+    def doc(self, doc_id):
+        block = doc_id // self.manifest["docs_per_shard"]
+        if block not in self._docs:
+            self._docs[block] = self._load(self.manifest["doc_shards"][block])
+        return dict(zip(self.manifest["doc_fields"], self._docs[block][doc_id % self.manifest["docs_per_shard"]]))
+
+    def search(self, query, limit=20):
+        """
+        所有词都须命中（AND），最后一个词按前缀匹配（输入中的词）；结果按日期由新到旧
+
+        Returns:
+            list: 文档 dict
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        ids = None
+        for i, token in enumerate(tokens):
+            matched = self._postings(token, prefix=(i == len(tokens) - 1))
+            ids = matched if ids is None else ids & matched
+            if not ids:
+                return []
+        return [self.doc(doc_id) for doc_id in sorted(ids)[:limit]]
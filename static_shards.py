@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+arxiv-daily 页面的分片静态数据（实验性，尚未接入）
+按 分类 / 周 / 页 切分为小 JSON 文件，文件名带内容哈希，可长期缓存；
+manifest.json 列出全部分片，供前端先取 manifest 再按需加载分片
+
+目前只有生成端：update_arxiv.yml 不构建也不提交这些文件（build_arxiv_daily_json 步骤已注释），
+src/pages/arxiv-daily.tsx 仍直接查询 Supabase，还没有读取分片的前端加载器
+
+目录结构:
+    <shard_dir>/manifest.json
+    <shard_dir>/<slug>/<YYYYMMDD-YYYYMMDD>-p<页码>.<哈希>.json[.gz|.br]
+"""
+
+import gzip
+import json
+import os
+import re
+from datetime import date, datetime, timedelta, timezone
+
+from file_manifest import content_hash
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST_NAME = "manifest.json"
+SHARD_FORMAT_VERSION = 1
+# 无日期条目归入的“周”
+UNDATED_WEEK = "undated"
+# 内容哈希命名的分片文件名: <名称>.<12 位哈希>.json[.gz|.br]；清理时只删除符合该命名的文件
+_CHUNK_NAME_RE = re.compile(r'[^/\\]+\.[0-9a-f]{12}\.json(\.gz|\.br)?')
+_CHUNK_SUFFIXES = ("", ".gz", ".br")
+
+
+def week_of(day):
+    """ISO 日期 -> 所在周（周一至周日）'YYYYMMDD-YYYYMMDD'，与 docs/daily 周文件命名一致"""
+    try:
+        d = date.fromisoformat(day or '')
+    except ValueError:
+        return UNDATED_WEEK
+    monday = d - timedelta(days=d.weekday())
+    return f"{monday.strftime('%Y%m%d')}-{(monday + timedelta(days=6)).strftime('%Y%m%d')}"
+
+
+def group_by_week(items):
+    """按周分组，保持条目原有顺序；周按时间降序，无日期的排在最后"""
+    weeks = {}
+    for it in items:
+        weeks.setdefault(week_of(it.get('day')), []).append(it)
+    return sorted(weeks.items(), key=lambda kv: (kv[0] != UNDATED_WEEK, kv[0]), reverse=True)
+
+
+def write_atomic(path, data):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def resolve_encodings(compress):
+    """
+    Returns:
+        tuple: (可用的预压缩格式列表, 对应的文件后缀)
+    """
+    encodings = []
+    for enc in compress or ():
+        if enc == "br" and brotli is None:
+            print("未安装 brotli，跳过 .br 预压缩")
+            continue
+        if enc in ("gzip", "br") and enc not in encodings:
+            encodings.append(enc)
+    return encodings, tuple({"gzip": ".gz", "br": ".br"}[enc] for enc in encodings)
+
+
+def write_chunk(shard_dir, rel_path, data, encodings):
+    """内容哈希命名的分片已存在时跳过（内容必然相同）"""
+    path = os.path.join(shard_dir, rel_path)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomic(path, data)
+    if "gzip" in encodings and not os.path.exists(path + ".gz"):
+        # mtime=0 保证相同输入产生相同字节
+        write_atomic(path + ".gz", gzip.compress(data, compresslevel=9, mtime=0))
+    if "br" in encodings and not os.path.exists(path + ".br"):
+        write_atomic(path + ".br", brotli.compress(data, quality=11))
+
+
+def previous_files(out_dir, listed):
+    """
+    读取输出目录中上一版 manifest，返回它引用的文件（含预压缩文件）
+
+    Args:
+        out_dir (str): 输出目录
+        listed (callable): manifest -> 引用的分片相对路径列表；不是本类 manifest 时返回 None
+
+    Returns:
+        set: 相对路径；目录中没有 manifest 时为空集合（不清理任何文件）
+
+    Raises:
+        ValueError: 目录中的 manifest.json 不是本类输出生成的（例如分片与搜索索引共用目录）
+    """
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        if os.path.isdir(out_dir) and os.listdir(out_dir):
+            print(f"{out_dir} 非空且没有 {MANIFEST_NAME}，本次不清理其中的文件")
+        return set()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = None
+    files = listed(manifest) if isinstance(manifest, dict) else None
+    if files is None:
+        raise ValueError(f"{path} 不是本输出生成的 manifest，拒绝写入该目录（请使用单独的输出目录）")
+    return {rel + suffix for rel in files for suffix in _CHUNK_SUFFIXES}
+
+
+def remove_stale(out_dir, live, previous):
+    """
+    删除上一版 manifest 引用、本次不再引用的分片及其预压缩文件，以及因此变空的子目录
+    只处理符合内容哈希命名的文件，目录中的其他文件不受影响
+    """
+    root = os.path.abspath(out_dir)
+    removed = 0
+    for rel in sorted(set(previous) - set(live)):
+        parts = rel.split('/')
+        if '..' in parts or not _CHUNK_NAME_RE.fullmatch(parts[-1]):
+            continue
+        path = os.path.join(root, *parts)
+        if not os.path.isfile(path):
+            continue
+        os.remove(path)
+        removed += 1
+        parent = os.path.dirname(path)
+        while parent != root and parent.startswith(root + os.sep) and not os.listdir(parent):
+            os.rmdir(parent)
+            parent = os.path.dirname(parent)
+    return removed
+
+
+def _shard_files(manifest):
+    if "categories" not in manifest:
+        return None
+    return [chunk["file"] for cat in manifest["categories"] for chunk in cat.get("chunks", [])]
+
+
+def write_shards(categories, shard_dir, page_size=64, compress=("gzip",)):
+    """
+    写出分片与 manifest
+
+    Args:
+        categories (list): build() 产出的分类 [{"label", "slug", "week", "items"}]
+        shard_dir (str): 输出目录（例如 static/data/arxiv_daily）；只清理上一版 manifest 引用的过期分片
+        page_size (int): 每个分片最多的条目数
+        compress (tuple): 预压缩格式，可含 "gzip"、"br"（需要 brotli 包，缺失时跳过）
+
+    Returns:
+        dict: manifest 内容
+    """
+    encodings, suffixes = resolve_encodings(compress)
+
+    previous = previous_files(shard_dir, _shard_files)
+    os.makedirs(shard_dir, exist_ok=True)
+    live = set()
+    shard_count = 0
+    manifest_categories = []
+    for cat in categories:
+        slug = cat['slug']
+        chunks = []
+        for week, items in group_by_week(cat.get('items', [])):
+            for page, start in enumerate(range(0, len(items), page_size)):
+                page_items = items[start:start + page_size]
+                payload = {"slug": slug, "week": week, "page": page, "items": page_items}
+                data = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                rel_path = f"{slug}/{week}-p{page}.{content_hash(data)[:12]}.json"
+                write_chunk(shard_dir, rel_path, data, encodings)
+                live.add(rel_path)
+                live.update(rel_path + suffix for suffix in suffixes)
+                shard_count += 1
+                chunks.append({"week": week, "page": page, "count": len(page_items),
+                               "bytes": len(data), "file": rel_path})
+        manifest_categories.append({
+            "label": cat['label'],
+            "slug": slug,
+            "week": cat.get('week', ""),
+            "count": len(cat.get('items', [])),
+            "chunks": chunks,
+        })
+
+    manifest = {
+        "version": SHARD_FORMAT_VERSION,
+        "generated_at": datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        "page_size": page_size,
+        "encodings": encodings,
+        "categories": manifest_categories,
+    }
+    write_atomic(os.path.join(shard_dir, MANIFEST_NAME),
+                  json.dumps(manifest, ensure_ascii=False, indent=2).encode('utf-8'))
+    removed = remove_stale(shard_dir, live, previous)
+    print(f"静态分片: {shard_count} 个分片写入 {shard_dir}，清理 {removed} 个过期文件")
+    return manifest
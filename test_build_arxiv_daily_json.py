@@ -0,0 +1,158 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+
+sys.path.append(os.getcwd())
+
+from build_arxiv_daily_json import ParseCache, build, build_category, merge_category_items
+
+WEEK = """# {week} (cs.DC)
+
+## {day}
+
+- **[arXiv] {title}**
+  - **tags:** [mlsys], [llm inference]
+  - **link:** https://arxiv.org/pdf/{link}
+"""
+
+
+def sorted_merge(parsed_files, max_items):
+    """The previous implementation: dedupe everything, full strptime sort, slice."""
+    seen, deduped = set(), []
+    for parsed in parsed_files:
+        for it in parsed["items"]:
+            key = it.get("link") or (it.get("title"), it.get("day"))
+            if key not in seen:
+                seen.add(key)
+                deduped.append(it)
+
+    def parse_day(s):
+        try:
+            return datetime.strptime(s or "", "%Y-%m-%d")
+        except Exception:
+            return datetime.min
+    deduped.sort(key=lambda it: parse_day(it.get("day")), reverse=True)
+    return deduped[:max_items]
+
+
+class TestMergeCategoryItems(unittest.TestCase):
+    def setUp(self):
+        days = [["2025-01-06", "2025-01-02"], ["2025-01-08", "2025-01-13", "2025-01-13"], ["2025-01-16", "2025-01-15"]]
+        self.files = ["20250101-20250107.md", "20250108-20250114.md", "20250115-20250121.md"]
+        self.parsed = {}
+        for fi, fp in enumerate(self.files):
+            items = [{"title": f"{fi}-{i}", "link": f"{fi}-{i}", "day": day} for i, day in enumerate(days[fi])]
+            items.append({"title": f"{fi}-nodate", "link": f"{fi}-nodate", "day": None})
+            self.parsed[fp] = {"week": fp[:17], "items": items}
+
+    def test_matches_full_sort(self):
+        for k in (0, 1, 2, 3, 5, 8, 100):
+            week, items = merge_category_items(self.files, self.parsed.__getitem__, k)
+            self.assertEqual(week, "20250115-20250121")
+            self.assertEqual(items, sorted_merge([self.parsed[fp] for fp in self.files], k))
+
+    def test_stops_before_older_files(self):
+        loaded = []
+
+        def load(fp):
+            loaded.append(fp)
+            return self.parsed[fp]
+        _, items = merge_category_items(self.files, load, 2)
+        self.assertEqual([it["title"] for it in items], ["2-0", "2-1"])
+        self.assertEqual(loaded, self.files[::-1][:1])
+
+    def test_dedupe_keeps_newest_file(self):
+        self.parsed[self.files[0]]["items"][0]["link"] = "2-0"
+        _, items = merge_category_items(self.files, self.parsed.__getitem__, 100)
+        self.assertEqual([it["title"] for it in items if it["link"] == "2-0"], ["2-0"])
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.docs = os.path.join(self.tmp.name, "docs")
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+        os.makedirs(os.path.join(self.docs, "cs_DC"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, week, day, title, link):
+        path = os.path.join(self.docs, "cs_DC", f"{week}.md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(WEEK.format(week=week, day=day, title=title, link=link))
+        return path
+
+    def run_build(self):
+        cache = ParseCache(self.cache_dir)
+        cat = build_category(self.docs, "cs_DC", 256, months=120, cache=cache)
+        cache.save({cat["slug"]})
+        return cache, cat
+
+    def test_only_changed_files_are_reparsed(self):
+        self.write("20250101-20250107", "2025-01-02", "Old", "1")
+        self.write("20250108-20250114", "2025-01-09", "New", "2")
+        cache, cat = self.run_build()
+        self.assertEqual((cache.parsed, cache.reused), (2, 0))
+        self.assertEqual([it["title"] for it in cat["items"]], ["New", "Old"])
+        self.assertEqual(cat, build_category(self.docs, "cs_DC", 256, months=120))
+
+        cache, cached_cat = self.run_build()
+        self.assertEqual((cache.parsed, cache.reused), (0, 2))
+        self.assertEqual(cached_cat, cat)
+
+        path = self.write("20250108-20250114", "2025-01-10", "Newer", "3")
+        os.utime(path, ns=(1, 1))
+        cache, cat = self.run_build()
+        self.assertEqual((cache.parsed, cache.reused), (1, 1))
+        self.assertEqual([it["title"] for it in cat["items"]], ["Newer", "Old"])
+        self.assertEqual(len(os.listdir(os.path.join(self.cache_dir, "items"))), 2)
+
+    def test_parallel_build_matches_serial(self):
+        os.makedirs(os.path.join(self.docs, "cs_AI"))
+        self.write("20250101-20250107", "2025-01-02", "Old", "1")
+        with open(os.path.join(self.docs, "cs_AI", "20250101-20250107.md"), "w", encoding="utf-8") as f:
+            f.write(WEEK.format(week="20250101-20250107", day="2025-01-03", title="AI", link="4"))
+        output = os.path.join(self.tmp.name, "out", "arxiv_daily.json")
+        serial = build(self.docs, output, 256, months=120, cache_dir="", workers=1)
+        parallel = build(self.docs, output, 256, months=120, cache_dir=self.cache_dir, workers=2)
+        self.assertEqual([cat["slug"] for cat in parallel], ["csai", "csdc"])
+        self.assertEqual(parallel, serial)
+
+        cache = ParseCache(self.cache_dir)
+        self.assertEqual(sorted(cache.manifest.files), ["cs_AI/20250101-20250107.md", "cs_DC/20250101-20250107.md"])
+        self.assertEqual(sorted(cache.categories), ["csai", "csdc"])
+        self.assertEqual(build(self.docs, output, 256, months=120, cache_dir=self.cache_dir, workers=1), serial)
+        self.assertEqual(build(self.docs, output, 256, months=120, cache_dir=self.cache_dir, workers=2), serial)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.cache_dir, "items"))),
+                         sorted(entry["sha1"] + ".json" for entry in cache.manifest.files.values()))
+
+    def test_worker_subset_holds_one_category(self):
+        os.makedirs(os.path.join(self.docs, "cs_AI"))
+        self.write("20250101-20250107", "2025-01-02", "Old", "1")
+        with open(os.path.join(self.docs, "cs_AI", "20250101-20250107.md"), "w", encoding="utf-8") as f:
+            f.write(WEEK.format(week="20250101-20250107", day="2025-01-03", title="AI", link="4"))
+        build(self.docs, os.path.join(self.tmp.name, "out", "arxiv_daily.json"), 256, months=120,
+              cache_dir=self.cache_dir, workers=1)
+
+        subset = ParseCache(self.cache_dir).subset("cs_DC", "csdc")
+        self.assertEqual(list(subset["files"]), ["cs_DC/20250101-20250107.md"])
+        worker_cache = ParseCache(self.cache_dir, subset=subset)
+        self.assertEqual(list(worker_cache.categories), ["csdc"])
+        cat = build_category(self.docs, "cs_DC", 256, months=120, cache=worker_cache)
+        self.assertEqual((worker_cache.parsed, worker_cache.reused), (0, 1))
+        self.assertEqual([it["title"] for it in cat["items"]], ["Old"])
+
+    def test_duplicate_link_keeps_newest_week_file(self):
+        # 同一 link 出现在两个周文件中：保留较新周文件里的那一份（即使其日期更早）
+        self.write("20250101-20250107", "2025-01-06", "Old copy", "1")
+        self.write("20250108-20250114", "2025-01-05", "New copy", "1")
+        for cache in (None, ParseCache(self.cache_dir)):
+            cat = build_category(self.docs, "cs_DC", 256, months=120, cache=cache)
+            self.assertEqual([(it["title"], it["day"]) for it in cat["items"]], [("New copy", "2025-01-05")])
+
+
+if __name__ == '__main__':
+    unittest.main()
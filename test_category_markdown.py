@@ -0,0 +1,64 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.append(os.getcwd())
+
+from get_daily_arxiv_paper import CompletePaperProcessor
+
+
+def make_paper(n, categories):
+    return {
+        "id": f"http://arxiv.org/abs/2510.0000{n}", "title": f"Paper {n}", "authors": ["Alice", "Bob"],
+        "categories": categories, "pdf_link": f"https://arxiv.org/pdf/2510.0000{n}",
+        "tag1": "mlsys", "tag3": "kv cache, paging", "institution": "MIT", "llm_summary": f"Summary {n}",
+    }
+
+
+class TestWriteCategoryMarkdown(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def processor(self, name):
+        return CompletePaperProcessor(docs_daily_path=os.path.join(self.tmp, name),
+                                      temp_dir=os.path.join(self.tmp, "pdfs"), enable_llm=False)
+
+    def read_tree(self, root):
+        tree = {}
+        for dirpath, _, files in os.walk(root):
+            for name in files:
+                path = os.path.join(dirpath, name)
+                with open(path, encoding="utf-8") as f:
+                    tree[os.path.relpath(path, root)] = f.read()
+        return tree
+
+    def test_matches_per_category_updates(self):
+        days = {
+            "2025-10-28": [make_paper(1, ["cs.DC", "cs.AI"]), make_paper(2, ["cs.AI"])],
+            "2025-10-30": [make_paper(3, ["cs.DC"])],
+            "2025-10-29": [make_paper(4, ["cs.AI", "cs.LG", "cs.DC"])],
+        }
+        batched, legacy = self.processor("batched"), self.processor("legacy")
+        for date_str, papers in days.items():
+            self.assertEqual(batched.write_category_markdown(papers, date_str, max_workers=2),
+                             len({c for p in papers for c in p["categories"]}))
+            for category in sorted({c for p in papers for c in p["categories"]}):
+                filepath = legacy.find_or_create_weekly_file_for_category(date_str, category)
+                legacy.update_markdown_file_for_category(
+                    filepath, [p for p in papers if category in p["categories"]], date_str, category)
+
+        tree = self.read_tree(batched.docs_daily_path)
+        self.assertEqual(tree, self.read_tree(legacy.docs_daily_path))
+        self.assertIn("cs_LG/20251027-20251102.md", tree)
+        dc = tree["cs_DC/20251027-20251102.md"]
+        self.assertLess(dc.index("## 2025-10-28"), dc.index("## 2025-10-29"))
+        self.assertLess(dc.index("## 2025-10-29"), dc.index("## 2025-10-30"))
+
+
+if __name__ == '__main__':
+    unittest.main()
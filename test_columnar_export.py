@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.getcwd())
+
+import columnar_export
+from columnar_export import export_rows, latest, list_partitions, scan
+
+
+def row(link, day, category="cs_AI", title=None):
+    return {"link": link, "title": title or link, "published_date": day, "category_slug": category,
+            "tags": ["mlsys", "llm"], "institution": "MIT", "authors": "Alice", "summary": "dropped"}
+
+
+@unittest.skipIf(columnar_export.pa is None, "pyarrow not installed")
+class TestColumnarExport(unittest.TestCase):
+    def test_partitioned_upsert_and_scan(self):
+        with tempfile.TemporaryDirectory() as root:
+            export_rows([row("a", "2025-09-30"), row("b", "2025-10-02"), row("c", "2025-10-03", "cs_DC")], root)
+            export_rows([row("b", "2025-10-02", title="B v2"), row("d", "2025-10-05")], root)
+
+            self.assertEqual([(m, c) for m, c, _ in list_partitions(root)],
+                             [("2025-10", "cs_AI"), ("2025-10", "cs_DC"), ("2025-09", "cs_AI")])
+            table = scan(root, categories=["cs_AI"], columns=("link", "title"))
+            self.assertEqual(table.column_names, ["link", "title"])
+            self.assertEqual(table.to_pylist(), [{"link": "d", "title": "d"}, {"link": "b", "title": "B v2"},
+                                                 {"link": "a", "title": "a"}])
+            self.assertEqual(scan(root, months=["2025-10"]).num_rows, 3)
+
+            rows = latest(root, ["cs_AI", "cs_DC"], limit=2, columns=("link", "tags"))
+            self.assertEqual(rows, [{"link": "d", "tags": ["mlsys", "llm"]}, {"link": "c", "tags": ["mlsys", "llm"]}])
+
+    def test_link_moves_between_partitions(self):
+        with tempfile.TemporaryDirectory() as root:
+            export_rows([row("a", "2025-10-02", "cs_DC"), row("b", "2025-10-01", "cs_DC")], root)
+            export_rows([row("a", "2025-10-02", "cs_AI")], root)
+            self.assertEqual([r["link"] for r in latest(root, ["cs_AI", "cs_DC"], limit=5)], ["a", "b"])
+            self.assertEqual(scan(root, categories=["cs_DC"], columns=("link",)).to_pylist(), [{"link": "b"}])
+
+            export_rows([row("b", "2025-09-30", "cs_DC")], root)
+            self.assertEqual([(m, c) for m, c, _ in list_partitions(root)],
+                             [("2025-10", "cs_AI"), ("2025-09", "cs_DC")])
+
+
+if __name__ == '__main__':
+    unittest.main()
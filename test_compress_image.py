@@ -0,0 +1,71 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "scripts"))
+
+import compress_image
+from compress_image import collect_sources, compress_batch, is_up_to_date, parse_args
+
+Image = compress_image.Image
+
+
+class TestCompressImage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def touch(self, *parts):
+        path = os.path.join(self.root, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fmt = "PNG" if path.lower().endswith(".png") else "JPEG"
+        Image.new("RGB", (8, 8), (200, 120, 40)).save(path, format=fmt)
+        return path
+
+    def test_parse_args_quality_forms(self):
+        photo = self.touch("photo.png")
+        args = parse_args([photo, "75"])
+        self.assertEqual((args.paths, args.quality, args.method), ([photo], 75, 6))
+        # 旧的单文件形式：第二个参数不是整数时告警并使用默认质量
+        with patch("builtins.print") as printed:
+            args = parse_args([photo, "abc"])
+        self.assertEqual((args.paths, args.quality), ([photo], 50))
+        printed.assert_called_once_with("Warning: Quality must be an integer. Using default (50).")
+        # 第一个参数不是已有文件时，非整数参数保留为路径，由 collect_sources 报告
+        args = parse_args([self.root, "missing.png"])
+        self.assertEqual((args.paths, args.quality), ([self.root, "missing.png"], 50))
+        args = parse_args([self.root, "-q", "80", "-j", "2", "-f"])
+        self.assertEqual((args.paths, args.quality, args.workers, args.force), ([self.root], 80, 2, True))
+
+    def test_collect_sources(self):
+        a = self.touch("a.png")
+        b = self.touch("sub", "b.JPG")
+        self.touch("sub", "notes.txt")
+        pattern = os.path.join(self.root, "*.png")
+        with patch("builtins.print") as printed:
+            sources = collect_sources([self.root, pattern, a, os.path.join(self.root, "none*.png")])
+        # 目录递归、通配符与重复路径合并，只保留 PNG/JPG
+        self.assertEqual(sources, [a, b])
+        printed.assert_called_once()
+
+    def test_batch_skips_up_to_date(self):
+        a = self.touch("a.png")
+        self.assertFalse(is_up_to_date(a))
+        with patch("builtins.print"):
+            report = compress_batch([self.root], workers=1)
+            self.assertEqual((report["encoded"], report["skipped"]), (1, 0))
+            self.assertTrue(is_up_to_date(a))
+            report = compress_batch([self.root], workers=1)
+            self.assertEqual((report["encoded"], report["skipped"]), (0, 1))
+            report = compress_batch([self.root], workers=1, force=True)
+            self.assertEqual((report["encoded"], report["skipped"]), (1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
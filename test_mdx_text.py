@@ -0,0 +1,32 @@
+import os
+import random
+import sys
+import unittest
+
+sys.path.append(os.getcwd())
+
+from mdx_text import clean_latex, clean_latex_sequential, escape_mdx, render_title
+
+
+class TestMdxText(unittest.TestCase):
+    def test_templates_and_escape(self):
+        self.assertEqual(render_title("\\textbf{Fast} \\texttt{KV} <2ms> {x}"), "**Fast** `KV` &lt;2ms&gt; \\{x\\}")
+        self.assertEqual(render_title("\\underline{Go} \\alpha-Net \\mathcal{O}(n)"), "&lt;u&gt;Go&lt;/u&gt; -Net O(n)")
+        self.assertEqual(escape_mdx(None), None)
+        self.assertEqual(render_title(""), "")
+
+    def test_fallback_cases_match_sequential(self):
+        for title in ("\\textbf{\\textit{Nested}}", "\\alpha\\beta x", "\\\\emph{a}", "\\foo\\textit{b}"):
+            self.assertEqual(clean_latex(title), clean_latex_sequential(title))
+            self.assertEqual(render_title(title), escape_mdx(clean_latex_sequential(title)))
+
+    def test_random_titles_match_sequential(self):
+        rng = random.Random(7)
+        alphabet = ["\\", "textit", "textbf", "emph", "sout", "foo", "{", "}", "a", " ", "<", "-"]
+        for _ in range(3000):
+            title = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 12)))
+            self.assertEqual(render_title(title), escape_mdx(clean_latex_sequential(title)), title)
+
+
+if __name__ == '__main__':
+    unittest.main()
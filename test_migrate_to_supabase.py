@@ -0,0 +1,123 @@
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.getcwd())
+sys.path.append(os.path.join(os.getcwd(), "scripts"))
+
+import migrate_to_supabase
+from migrate_to_supabase import migrate
+from paper_store import SQLitePaperStore
+
+WEEK = "20251027-20251102"
+
+
+def week_md(category, papers):
+    lines = [f"# {WEEK} ({category})", "", "## 2025-10-28", ""]
+    for title, link in papers:
+        lines += [f"- **[arXiv251028] {title}**", f"  - **link:** {link}", ""]
+    return "\n".join(lines)
+
+
+class CountingStore(SQLitePaperStore):
+    """记录每次 upsert 的行数，可配置前若干次调用失败"""
+
+    def __init__(self, path, fail_times=0):
+        super().__init__(path)
+        self.upserted = 0
+        self.fail_times = fail_times
+
+    def upsert(self, rows):
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise RuntimeError("boom")
+        self.upserted += len(rows)
+        super().upsert(rows)
+
+
+class TestMigrate(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.docs = os.path.join(self.tmp, "docs")
+        self.manifest = os.path.join(self.tmp, "manifest.json")
+        self.db = os.path.join(self.tmp, "papers.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def write(self, category, papers):
+        path = os.path.join(self.docs, category, f"{WEEK}.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(week_md(category, papers))
+        return path
+
+    def run_migrate(self, fail_times=0, **kwargs):
+        store = CountingStore(self.db, fail_times=fail_times)
+        with patch.object(migrate_to_supabase.time, "sleep"):
+            migrate(store=store, docs_dir=self.docs, workers=1, chunk_files=1, manifest_path=self.manifest,
+                    **kwargs)
+        store.close()
+        return store.upserted
+
+    def table(self):
+        conn = sqlite3.connect(self.db)
+        try:
+            return conn.execute("select link, category_slug, title from papers order by link").fetchall()
+        finally:
+            conn.close()
+
+    def test_incremental_runs(self):
+        self.write("cs_AI", [("A1", "x/1"), ("A2", "x/2")])
+        cv = self.write("cs_CV", [("C1", "x/3")])
+        self.assertEqual(self.run_migrate(), 3)
+        # 未改动的文件直接按 mtime/size 跳过
+        self.assertEqual(self.run_migrate(), 0)
+
+        # 只改一行：只写这一行
+        self.write("cs_AI", [("A1", "x/1"), ("A2 v2", "x/2")])
+        self.assertEqual(self.run_migrate(), 1)
+        self.assertIn(("x/2", "cs_AI", "A2 v2"), self.table())
+
+        # 只改 mtime：内容哈希相同，不重新解析
+        st = os.stat(cv)
+        os.utime(cv, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+        with patch.object(migrate_to_supabase, "parse_md_content", side_effect=AssertionError("re-parsed")):
+            self.assertEqual(self.run_migrate(), 0)
+
+        # 删除文件：清单中的条目被移除，表中的行保留
+        os.remove(cv)
+        self.assertEqual(self.run_migrate(), 0)
+        self.assertEqual(sorted(migrate_to_supabase.FileManifest(self.manifest).files), ["cs_AI/" + WEEK + ".md"])
+
+        self.assertEqual(self.run_migrate(full=True), 2)
+
+    def test_failed_chunk_is_retried(self):
+        self.write("cs_AI", [("A1", "x/1")])
+        self.write("cs_CV", [("C1", "x/3")])
+        # 第一个分块的所有重试都失败（1 次 + 3 次重试），第二个分块成功
+        self.assertEqual(self.run_migrate(fail_times=4), 1)
+        self.assertEqual([r[0] for r in self.table()], ["x/3"])
+        self.assertEqual(self.run_migrate(), 1)
+        self.assertEqual([r[0] for r in self.table()], ["x/1", "x/3"])
+        self.assertEqual(self.run_migrate(), 0)
+
+    def test_owner_moves_to_unchanged_file(self):
+        self.write("cs_AI", [("shared-ai", "x/s")])
+        self.write("cs_DC", [("shared-dc", "x/s"), ("D1", "x/d")])
+        self.run_migrate()
+        self.assertIn(("x/s", "cs_DC", "shared-dc"), self.table())
+
+        # cs_DC 不再包含 x/s：归属回到未改动的 cs_AI，需要重新写入它的行
+        self.write("cs_DC", [("D1", "x/d")])
+        self.assertEqual(self.run_migrate(), 1)
+        self.assertIn(("x/s", "cs_AI", "shared-ai"), self.table())
+        self.assertEqual(self.run_migrate(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+sys.path.append(os.getcwd())
+
+from get_daily_arxiv_paper import CompletePaperProcessor
+from paper_journal import PaperJournal
+
+
+class TestPaperJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.journal_path = os.path.join(self.tmp, "journal.sqlite3")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_record_and_load(self):
+        with PaperJournal(self.journal_path) as journal:
+            journal.record("2025-11-03", "p1", "downloaded", pdf_path="/tmp/p1.pdf")
+            journal.record("2025-11-03", "p1", "analyzed", paper={"tag1": "mlsys"})
+            journal.record_many("2025-11-03", ["p1", "p2"], "persisted")
+
+            done, pdf_path, payload = journal.load("2025-11-03", "p1")
+            self.assertEqual(done, {"downloaded", "analyzed", "persisted"})
+            self.assertEqual(pdf_path, "/tmp/p1.pdf")
+            self.assertEqual(payload, {"tag1": "mlsys"})
+            self.assertEqual(journal.stages("2025-11-03", "p2"), {"persisted"})
+            self.assertEqual(journal.summary("2025-11-03")["persisted"], 2)
+
+            journal.purge("2025-11-03")
+            self.assertEqual(journal.summary("2025-11-03")["total"], 0)
+
+    def test_record_merges_payload(self):
+        with PaperJournal(self.journal_path) as journal:
+            journal.record("2025-11-03", "p1", "thumbnailed", paper={"thumbnail": "https://r2/t.webp"})
+            # 之后重试分析只写分析字段，不能冲掉已保存的缩略图
+            journal.record("2025-11-03", "p1", "analyzed", paper={"tag1": "mlsys", "llm_summary": "s"})
+            done, _, payload = journal.load("2025-11-03", "p1")
+            self.assertEqual(done, {"analyzed", "thumbnailed"})
+            self.assertEqual(payload, {"thumbnail": "https://r2/t.webp", "tag1": "mlsys", "llm_summary": "s"})
+
+    def test_failed_thumbnail_is_not_recorded(self):
+        with patch.dict(os.environ, {"DEEPSEEK_API_KEY": "fake_key"}):
+            processor = CompletePaperProcessor(docs_daily_path=os.path.join(self.tmp, "docs"),
+                                               temp_dir=os.path.join(self.tmp, "pdfs"),
+                                               enable_thumbnails=True, enable_llm=False,
+                                               journal_path=self.journal_path)
+        paper = {"id": "http://arxiv.org/abs/2511.00002", "title": "T", "summary": "S",
+                 "pdf_link": "https://arxiv.org/pdf/2511.00002", "published": "2025-11-03"}
+        pdf_path = os.path.join(self.tmp, "p.pdf")
+        open(pdf_path, "wb").close()
+        with patch.object(processor, "download_pdf", return_value=pdf_path), \
+                patch.object(processor, "extract_first_page_text", return_value=""), \
+                patch("get_daily_arxiv_paper.PdfScan.open", side_effect=RuntimeError("broken pdf")):
+            result = processor.process_single_paper(dict(paper))
+        self.assertNotIn("thumbnail", result)
+        self.assertEqual(processor.journal.stages("2025-11-03", paper["id"]), {"downloaded", "analyzed"})
+        processor.journal.close()
+
+    def test_no_thumbnail_outcome_is_recorded(self):
+        with patch.dict(os.environ, {"DEEPSEEK_API_KEY": "fake_key"}):
+            processor = CompletePaperProcessor(docs_daily_path=os.path.join(self.tmp, "docs"),
+                                               temp_dir=os.path.join(self.tmp, "pdfs"),
+                                               enable_thumbnails=True, enable_llm=False,
+                                               journal_path=self.journal_path)
+        # 找不到可用的图 / 未配置 R2：结果确定，记为完成，重跑不再下载PDF
+        cases = (("2511.00003", (None, None), {}, None), ("2511.00004", (b"png", "png"), {}, False))
+        for arxiv_id, rendered, uploaded, r2 in cases:
+            paper = {"id": f"http://arxiv.org/abs/{arxiv_id}", "title": "T", "summary": "S",
+                     "pdf_link": f"https://arxiv.org/pdf/{arxiv_id}", "published": "2025-11-03"}
+            pdf_path = os.path.join(self.tmp, f"{arxiv_id}.pdf")
+            open(pdf_path, "wb").close()
+            with patch.object(processor, "download_pdf", return_value=pdf_path), \
+                    patch.object(processor, "extract_first_page_text", return_value=""), \
+                    patch("get_daily_arxiv_paper.PdfScan.open"), \
+                    patch.object(processor, "_render_thumbnail", return_value=rendered), \
+                    patch.object(processor, "upload_thumbnail_variants", return_value=uploaded), \
+                    patch.object(processor, "get_r2", return_value=r2):
+                result = processor.process_single_paper(dict(paper))
+            self.assertNotIn("thumbnail", result)
+            self.assertIn("thumbnailed", processor.journal.stages("2025-11-03", paper["id"]))
+
+            with patch.object(processor, "download_pdf") as download:
+                processor.process_single_paper(dict(paper))
+            download.assert_not_called()
+        processor.journal.close()
+
+    def test_resume_skips_completed_stages(self):
+        with patch.dict(os.environ, {"DEEPSEEK_API_KEY": "fake_key"}):
+            processor = CompletePaperProcessor(docs_daily_path=os.path.join(self.tmp, "docs"),
+                                               temp_dir=os.path.join(self.tmp, "pdfs"),
+                                               enable_thumbnails=False, enable_llm=True,
+                                               journal_path=self.journal_path)
+        processor.client = MagicMock()
+        paper = {"id": "http://arxiv.org/abs/2511.00001", "title": "T", "summary": "S",
+                 "pdf_link": "https://arxiv.org/pdf/2511.00001", "published": "2025-11-03"}
+        processor.journal.record("2025-11-03", paper["id"], "analyzed",
+                                 paper={"tag1": "mlsys", "llm_summary": "cached"})
+
+        with patch.object(processor, "download_pdf") as download:
+            result = processor.process_single_paper(dict(paper))
+        download.assert_not_called()
+        processor.client.chat.completions.create.assert_not_called()
+        self.assertEqual(result["tag1"], "mlsys")
+        self.assertEqual(result["llm_summary"], "cached")
+        self.assertFalse(result["simple_only"])
+
+        processor.journal.record("2025-11-03", paper["id"], "persisted")
+        result = processor.process_single_paper(dict(paper))
+        self.assertTrue(result["persisted"])
+        processor.journal.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import sys
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+sys.path.append(os.getcwd())
+
+from paper_store import open_store, SQLitePaperStore, SupabasePaperStore
+
+
+def make_row(i, day, category="cs_DC", **extra):
+    row = {"category_slug": category, "title": f"Paper {i}", "published_date": day,
+           "authors": "A, B", "link": f"http://arxiv.org/abs/2511.{i:05d}",
+           "tags": ["x", "y"]}
+    row.update(extra)
+    return row
+
+
+class TestSQLitePaperStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_open_store_url(self):
+        store = open_store(f"sqlite:///{os.path.join(self.tmp, 'papers.db')}")
+        self.assertIsInstance(store, SQLitePaperStore)
+        store.close()
+        with self.assertRaises(ValueError):
+            open_store("mysql://nope")
+
+    def test_upsert_and_fetch_latest(self):
+        with SQLitePaperStore(os.path.join(self.tmp, "papers.db")) as store:
+            store.upsert([make_row(1, "2025-11-01"), make_row(2, "2025-11-03"),
+                          make_row(3, "2025-11-02", category="cs_AI")])
+            # 相同 link 再次写入时更新而不是新增
+            store.upsert([make_row(1, "2025-11-04", title="Paper 1 v2")])
+            self.assertEqual(store.count(), 3)
+
+            rows = store.fetch_latest(["cs_DC"], limit=5, columns=("title", "published_date", "tags"))
+            self.assertEqual([r["title"] for r in rows], ["Paper 1 v2", "Paper 2"])
+            self.assertEqual(rows[0]["tags"], ["x", "y"])
+
+    def test_thumbnail_variants_kept_when_missing(self):
+        variants = {"160": "https://r2/a_w160.webp", "640": "https://r2/a_w640.webp"}
+        with SQLitePaperStore(os.path.join(self.tmp, "papers.db")) as store:
+            store.upsert([make_row(1, "2025-11-01", thumbnail_variants=variants)])
+            # 从 markdown 迁移的行没有 thumbnail_variants，不覆盖已有值
+            store.upsert([make_row(1, "2025-11-01", title="Paper 1 v2")])
+            rows = store.fetch_latest(["cs_DC"], columns=("title", "thumbnail_variants"))
+            self.assertEqual(rows, [{"title": "Paper 1 v2", "thumbnail_variants": variants}])
+
+    def test_adds_missing_columns(self):
+        path = os.path.join(self.tmp, "old.db")
+        conn = sqlite3.connect(path)
+        conn.execute("create table papers (id integer primary key autoincrement, category_slug text not null,"
+                     " title text not null, published_date text not null, authors text, institution text,"
+                     " link text unique, code_url text, thumbnail_url text, summary text, contributions text,"
+                     " mindmap text, tags text, created_at text default current_timestamp not null)")
+        conn.close()
+        with SQLitePaperStore(path) as store:
+            store.upsert([make_row(1, "2025-11-01", thumbnail_variants={"320": "u"})])
+            self.assertEqual(store.fetch_latest(["cs_DC"], columns=("thumbnail_variants",)),
+                             [{"thumbnail_variants": {"320": "u"}}])
+
+
+class FakeSupabaseTable:
+    """记录每次 upsert 的行；表中没有 thumbnail_variants 列时按 PostgREST 的方式报错"""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.requests = []
+        self._rows = None
+
+    def table(self, name):
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self._rows = rows
+        return self
+
+    def execute(self):
+        for row in self._rows:
+            for c in row:
+                if c not in self.columns:
+                    raise RuntimeError(f"Could not find the '{c}' column of 'papers' in the schema cache")
+        self.requests.append(self._rows)
+
+
+class TestSupabasePaperStore(unittest.TestCase):
+    def test_null_variants_not_sent(self):
+        client = FakeSupabaseTable({"category_slug", "title", "published_date", "authors", "link", "tags",
+                                    "thumbnail_variants"})
+        store = SupabasePaperStore(client)
+        store.upsert([make_row(1, "2025-11-01", thumbnail_variants={"320": "u"}),
+                      make_row(2, "2025-11-01", thumbnail_variants=None), make_row(3, "2025-11-01")])
+        # 同一请求内列一致：有值的行与不带该列的行分开写入
+        self.assertEqual([[r["link"][-1] for r in req] for req in client.requests], [["1"], ["2", "3"]])
+        self.assertNotIn("thumbnail_variants", client.requests[1][0])
+
+    def test_table_without_variants_column(self):
+        client = FakeSupabaseTable({"category_slug", "title", "published_date", "authors", "link", "tags"})
+        store = SupabasePaperStore(client)
+        store.upsert([make_row(1, "2025-11-01", thumbnail_variants={"320": "u"})])
+        store.upsert([make_row(2, "2025-11-01", thumbnail_variants={"320": "v"})])
+        self.assertEqual([len(req) for req in client.requests], [1, 1])
+        self.assertTrue(all("thumbnail_variants" not in r for req in client.requests for r in req))
+
+
+if __name__ == '__main__':
+    unittest.main()
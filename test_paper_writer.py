@@ -0,0 +1,75 @@
+import os
+import sys
+import threading
+import unittest
+
+sys.path.append(os.getcwd())
+
+from paper_store import PaperStore
+from paper_writer import PaperPersistWriter, paper_to_row
+
+
+def make_paper(i):
+    return {"id": f"http://arxiv.org/abs/2511.{i:05d}", "title": f"Paper {i}",
+            "published": "2025-11-03", "authors": ["A", "B"], "categories": ["cs.DC"],
+            "tag3": "x, y", "code": "None"}
+
+
+class FakeStore(PaperStore):
+    """记录每次 upsert 的批次，可配置前若干次调用失败"""
+    name = "fake"
+
+    def __init__(self, fail_times=0):
+        self.batches = []
+        self.fail_times = fail_times
+        self._lock = threading.Lock()
+
+    def upsert(self, rows):
+        with self._lock:
+            if self.fail_times > 0:
+                self.fail_times -= 1
+                raise RuntimeError("boom")
+            self.batches.append(rows)
+
+
+class TestPaperPersistWriter(unittest.TestCase):
+    def test_paper_to_row(self):
+        row = paper_to_row(make_paper(1))
+        self.assertEqual(row["authors"], "A, B")
+        self.assertEqual(row["tags"], ["x", "y"])
+        self.assertIsNone(row["code_url"])
+        self.assertEqual(row["category_slug"], "cs_DC")
+        self.assertNotIn("thumbnail_variants", row)
+        row = paper_to_row(dict(make_paper(1), thumbnail_variants={"320": "u"}))
+        self.assertEqual(row["thumbnail_variants"], {"320": "u"})
+
+    def test_batches_and_callback(self):
+        store = FakeStore()
+        persisted = []
+        writer = PaperPersistWriter(store=store, batch_size=4, flush_interval=60,
+                                    on_persisted=persisted.extend)
+        for i in range(10):
+            writer.submit(make_paper(i))
+        # 重复提交同一论文，批内去重
+        writer.submit(make_paper(9))
+        self.assertTrue(writer.close())
+        self.assertEqual(sorted(len(b) for b in store.batches), [2, 4, 4])
+        self.assertEqual(writer.persisted_count, 11)
+        self.assertEqual(len(persisted), 11)
+
+    def test_retry_then_fail(self):
+        store = FakeStore(fail_times=1)
+        writer = PaperPersistWriter(store=store, batch_size=50, retry_backoff=0)
+        writer.submit(make_paper(1))
+        self.assertTrue(writer.close())
+        self.assertEqual(len(store.batches), 1)
+
+        store = FakeStore(fail_times=10)
+        writer = PaperPersistWriter(store=store, batch_size=50, max_retries=2, retry_backoff=0)
+        writer.submit(make_paper(1))
+        self.assertFalse(writer.close())
+        self.assertEqual(len(writer.failed), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
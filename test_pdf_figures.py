@@ -0,0 +1,88 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.getcwd())
+
+import pdf_figures
+from pdf_figures import PdfScan
+
+fitz = pdf_figures.fitz
+
+
+def make_doc(image_pages):
+    """image_pages: {页码: 显示区域}，每页插入一张图片"""
+    doc = fitz.open()
+    for i in range(max(image_pages) + 1):
+        page = doc.new_page(width=612, height=792)
+        if i in image_pages:
+            pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 48), False)
+            pix.clear_with(120 + i)
+            page.insert_image(fitz.Rect(*image_pages[i]), pixmap=pix, keep_proportion=False)
+    return doc
+
+
+@unittest.skipIf(fitz is None, "PyMuPDF not installed")
+class TestPdfScan(unittest.TestCase):
+    def test_image_rects_match_get_image_rects(self):
+        doc = make_doc({0: (72, 72, 200, 160), 1: (50, 100, 550, 500)})
+        scan = PdfScan(doc)
+        for i in range(2):
+            page = doc.load_page(i)
+            expected = [r for im in page.get_images(full=True) for r in page.get_image_rects(im[0])]
+            self.assertEqual(scan.image_rects(i), expected)
+        self.assertEqual(scan.image_candidates(0), [])
+
+    def test_largest_image_prefers_first_pages(self):
+        doc = make_doc({0: (72, 72, 200, 160), 1: (50, 100, 350, 400), 5: (20, 20, 590, 600)})
+        page, rect = PdfScan(doc, prescan_pages=3).largest_image()
+        self.assertEqual((page, rect), (1, fitz.Rect(50, 100, 350, 400)))
+        self.assertEqual(PdfScan(doc, prescan_pages=10).largest_image()[0], 5)
+
+    def test_largest_image_falls_back_to_full_scan(self):
+        doc = make_doc({0: (72, 72, 200, 160), 4: (50, 100, 350, 400), 6: (20, 20, 590, 600)})
+        scan = PdfScan(doc, prescan_pages=3)
+        self.assertEqual(scan.largest_image()[0], 6)
+        self.assertIsNone(PdfScan(make_doc({0: (72, 72, 200, 160)})).largest_image())
+
+    def test_captions_index(self):
+        doc = fitz.open()
+        page = doc.new_page(width=612, height=792)
+        page.insert_textbox(fitz.Rect(72, 400, 540, 440), "Figure 1: Late caption.")
+        page.insert_textbox(fitz.Rect(72, 100, 540, 140), "FIG. 1. Early caption.")
+        page.insert_textbox(fitz.Rect(72, 200, 540, 240), "As shown in fig. 1 and Figure 12, it works.")
+        page.insert_textbox(fitz.Rect(72, 300, 540, 340), "Nothing to see here.")
+        captions = PdfScan(doc).captions(0)
+        self.assertEqual([round(c[1]) for c in captions.mentions["1"]], [400, 100, 200])
+        self.assertEqual(len(captions.mentions["12"]), 1)
+        self.assertNotIn("2", captions.mentions)
+        self.assertEqual(round(captions.headings["1"].y0), 100)
+        self.assertNotIn("12", captions.headings)
+
+    def test_drawing_union_matches_rect_fold(self):
+        doc = fitz.open()
+        page = doc.new_page(width=612, height=792)
+        shape = page.new_shape()
+        for draw, arg in ((shape.draw_line, ((100, 300), (400, 300))),  # 高度为 0：空矩形，不参与并集
+                          (shape.draw_rect, (fitz.Rect(150, 120, 250, 260),)),
+                          (shape.draw_rect, (fitz.Rect(300, 200, 302, 203),)),  # 太小，不计入
+                          (shape.draw_rect, (fitz.Rect(80, 250, 500, 290),)),
+                          (shape.draw_rect, (fitz.Rect(60, 500, 560, 600),)),
+                          (shape.draw_circle, ((320, 150), 40))):
+            draw(*arg)
+            shape.finish(color=(0, 0, 0), width=0.5)
+        shape.commit()
+        index = PdfScan(doc).drawings(0)
+        self.assertEqual(len(index), 5)
+        for top, bottom in ((0, 310), (100, 280), (130, 295), (290, 310), (0, 800), (610, 700)):
+            rects = [d["rect"] for d in page.get_drawings()
+                     if d["rect"].y1 <= bottom and d["rect"].y0 >= top
+                     and (d["rect"].width > 5 or d["rect"].height > 5)]
+            expected = None
+            for r in rects:
+                expected = fitz.Rect(r) if expected is None else expected | r
+            self.assertEqual(index.union(top, bottom), expected, (top, bottom))
+
+
+if __name__ == '__main__':
+    unittest.main()
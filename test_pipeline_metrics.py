@@ -0,0 +1,75 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+sys.path.append(os.getcwd())
+
+from pipeline_metrics import PipelineMetrics, active_stages, percentile
+from paper_writer import PaperPersistWriter
+from test_paper_writer import FakeStore, make_paper
+
+
+class TestPipelineMetrics(unittest.TestCase):
+    def test_percentiles_and_counters(self):
+        metrics = PipelineMetrics()
+        for i in range(1, 101):
+            metrics.observe("download", i / 100, counters={"bytes": 10})
+        metrics.observe("download", 5.0, ok=False)
+        stats = metrics.summary()["download"]
+        self.assertEqual(stats["count"], 101)
+        self.assertEqual(stats["errors"], 1)
+        self.assertEqual(stats["p50"], 0.51)
+        self.assertEqual(stats["p99"], 1.0)
+        self.assertEqual(stats["max"], 5.0)
+        self.assertEqual(stats["counters"], {"bytes": 1000})
+        self.assertIsNone(percentile([], 0.5))
+
+    def test_stage_context_tracks_failures_and_active_stage(self):
+        metrics = PipelineMetrics()
+        with metrics.stage("paper"):
+            with metrics.stage("llm") as st:
+                self.assertEqual(active_stages()[threading.get_ident()], "llm")
+                st.add("prompt_tokens", 120)
+            self.assertEqual(active_stages()[threading.get_ident()], "paper")
+        self.assertNotIn(threading.get_ident(), active_stages())
+        with self.assertRaises(ValueError):
+            with metrics.stage("llm"):
+                raise ValueError("boom")
+        stats = metrics.summary()
+        self.assertEqual(stats["llm"]["count"], 2)
+        self.assertEqual(stats["llm"]["errors"], 1)
+        self.assertEqual(stats["llm"]["counters"], {"prompt_tokens": 120})
+
+    def test_reports(self):
+        metrics = PipelineMetrics()
+        metrics.observe("thumbnail.best_page", 0.25, counters={"hits": 1})
+        with tempfile.TemporaryDirectory() as tmp:
+            report_path = os.path.join(tmp, "run.json")
+            prom_path = os.path.join(tmp, "metrics", "pipeline.prom")
+            metrics.write_report(report_path, date="2025-10-28")
+            metrics.write_prometheus(prom_path)
+            with open(report_path) as f:
+                report = json.load(f)
+            with open(prom_path) as f:
+                prom = f.read()
+        self.assertEqual(report["date"], "2025-10-28")
+        self.assertEqual(report["stages"]["thumbnail.best_page"]["p95"], 0.25)
+        self.assertIn('arxiv_pipeline_stage_seconds{stage="thumbnail.best_page",quantile="0.5"} 0.25', prom)
+        self.assertIn('arxiv_pipeline_stage_hits_total{stage="thumbnail.best_page"} 1', prom)
+
+    def test_writer_records_upserts(self):
+        metrics = PipelineMetrics()
+        store = FakeStore(fail_times=1)
+        with PaperPersistWriter(store=store, batch_size=5, retry_backoff=0.0, metrics=metrics) as writer:
+            for i in range(5):
+                writer.submit(make_paper(i))
+        stats = metrics.summary()["upsert"]
+        self.assertEqual((stats["count"], stats["errors"]), (2, 1))
+        self.assertEqual(stats["counters"], {"rows": 5})
+
+
+if __name__ == '__main__':
+    unittest.main()
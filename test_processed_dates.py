@@ -0,0 +1,65 @@
+import multiprocessing
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.getcwd())
+
+from processed_dates import ProcessedDates, open_processed, DONE, PARTIAL, STARTED
+
+
+def _mark_many(path, start):
+    store = ProcessedDates(path)
+    for day in range(start, start + 10):
+        store.mark(f"202510{day:02d}", papers=day)
+
+
+class TestProcessedDates(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "arxiv_date.txt")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_legacy_lines_are_done(self):
+        with open(self.path, "w") as f:
+            f.write("20251030\n20251028\n\n")
+        store = ProcessedDates(self.path)
+        self.assertTrue(store.is_done("2025-10-28"))
+        self.assertTrue(store.is_done("20251030"))
+        self.assertIsNone(store.get("2025-10-29"))
+
+    def test_mark_keeps_sorted_and_tracks_status(self):
+        store = ProcessedDates(self.path)
+        store.mark("2025-10-30")
+        store.mark("2025-10-28", status=STARTED, papers=120)
+        self.assertEqual(store.status("2025-10-28"), STARTED)
+        self.assertFalse(store.is_done("2025-10-28"))
+        store.mark("2025-10-28", status=PARTIAL, papers=118, seconds=42.25)
+        self.assertEqual([r["date"] for r in store.unfinished()], ["20251028"])
+        store.mark("2025-10-28", papers=120, seconds=50)
+        self.assertEqual(store.get("2025-10-28"), {"date": "20251028", "status": DONE, "papers": 120, "seconds": 50.0})
+        with open(self.path) as f:
+            self.assertEqual(f.read(), "20251028\tdone\t120\t50.0\n20251030\n")
+
+    def test_sees_writes_from_other_instances(self):
+        reader = open_processed(self.path)
+        self.assertFalse(reader.is_done("2025-10-28"))
+        ProcessedDates(self.path).mark("2025-10-28")
+        self.assertTrue(reader.is_done("2025-10-28"))
+        self.assertIs(open_processed(self.path), reader)
+
+    def test_concurrent_processes_do_not_lose_dates(self):
+        procs = [multiprocessing.Process(target=_mark_many, args=(self.path, start)) for start in (1, 11, 21)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        store = ProcessedDates(self.path)
+        self.assertTrue(all(store.is_done(f"202510{day:02d}") for day in range(1, 31)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.append(os.getcwd())
+
+from pipeline_metrics import PipelineMetrics
+from sampling_profiler import SamplingProfiler, merge_folded, parse_folded, speedscope_document, stage_totals
+
+
+def busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_samples_are_rooted_at_stage(self):
+        metrics = PipelineMetrics()
+
+        def work():
+            with metrics.stage("webp"):
+                busy_loop(0.2)
+
+        with SamplingProfiler(interval=0.002) as profiler:
+            workers = [threading.Thread(target=work) for _ in range(2)]
+            for t in workers:
+                t.start()
+            for t in workers:
+                t.join()
+        self.assertGreater(profiler.sample_count, 10)
+        roots = dict(stage_totals(profiler.samples))
+        self.assertEqual(set(roots), {"[webp]"})
+        self.assertTrue(any(stack[-1].startswith("busy_loop (") for stack in profiler.samples))
+
+    def test_folded_roundtrip_merge_and_speedscope(self):
+        samples = {("[llm]", "call (a.py:1)", "read (b.py:2)"): 3, ("[download]", "get (c.py:3)"): 2}
+        profiler = SamplingProfiler(interval=0.01)
+        profiler.samples.update(samples)
+        with tempfile.TemporaryDirectory() as tmp:
+            folded_path, speedscope_path = profiler.write(os.path.join(tmp, "run"))
+            self.assertTrue(os.path.exists(speedscope_path))
+            self.assertEqual(parse_folded(profiler.folded()), samples)
+            merged = merge_folded([folded_path, folded_path])
+        self.assertEqual(merged[("[llm]", "call (a.py:1)", "read (b.py:2)")], 6)
+        doc = speedscope_document(samples, interval=0.01)
+        profile = doc["profiles"][0]
+        self.assertEqual(len(profile["samples"]), 2)
+        self.assertAlmostEqual(profile["endValue"], 0.05)
+        names = [f["name"] for f in doc["shared"]["frames"]]
+        self.assertEqual([names[i] for i in profile["samples"][0]], ["[download]", "get (c.py:3)"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.getcwd())
+
+from search_index import SearchIndex, build_search_index, delta_decode, delta_encode, tokenize, write_search_index
+
+CATEGORIES = [
+    {"slug": "csdc", "items": [
+        {"title": "Paged KV Cache for LLM Serving", "day": "2025-10-28", "link": "l1",
+         "tags": ["llm inference", "kv cache"], "authors": "Alice Zhang", "institution": "清华大学"},
+        {"title": "Sparse Attention Kernels", "day": "2025-10-30", "link": "l2",
+         "tags": ["kernels"], "authors": "Bob", "institution": "MIT"},
+    ]},
+    {"slug": "cscl", "items": [
+        {"title": "Paged KV Cache for LLM Serving", "day": "2025-10-28", "link": "l1",
+         "tags": ["llm inference"], "authors": "Alice Zhang", "institution": "清华大学"},
+    ]},
+]
+
+
+class TestSearchIndex(unittest.TestCase):
+    def test_tokenize_and_delta(self):
+        self.assertEqual(tokenize("Efficient LLM-Serving for 推理 a"), ["efficient", "llm", "serving", "推", "理"])
+        self.assertEqual(delta_encode([3, 4, 10]), [3, 1, 6])
+        self.assertEqual(delta_decode([3, 1, 6]), [3, 4, 10])
+
+    def test_build_merges_docs_newest_first(self):
+        docs, postings = build_search_index(CATEGORIES)
+        self.assertEqual([d[3] for d in docs], ["l2", "l1"])
+        self.assertEqual(docs[1][2], ["csdc", "cscl"])
+        self.assertEqual(postings["kernels"], [0])
+        self.assertEqual(postings["cache"], [1])
+
+    def test_search(self):
+        with tempfile.TemporaryDirectory() as index_dir:
+            write_search_index(CATEGORIES, index_dir, docs_per_shard=1)
+            index = SearchIndex(index_dir)
+            self.assertEqual([d["link"] for d in index.search("kv cache")], ["l1"])
+            self.assertEqual([d["link"] for d in index.search("ker")], ["l2"])
+            self.assertEqual([d["link"] for d in index.search("清华")], ["l1"])
+            self.assertEqual([d["link"] for d in index.search("k")], [])
+            self.assertEqual(index.search("sparse serving"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
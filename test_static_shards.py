@@ -0,0 +1,73 @@
+import gzip
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.getcwd())
+
+from static_shards import write_shards, week_of
+
+
+def make_items(n, day):
+    return [{"title": f"{day}-{i}", "link": f"{day}-{i}", "day": day} for i in range(n)]
+
+
+class TestStaticShards(unittest.TestCase):
+    def test_week_of(self):
+        self.assertEqual(week_of("2025-10-29"), "20251027-20251102")
+        self.assertEqual(week_of(None), "undated")
+
+    def test_shards_round_trip_and_cleanup(self):
+        items = make_items(5, "2025-10-29") + make_items(2, "2025-10-20")
+        categories = [{"label": "cs.DC", "slug": "csdc", "week": "20251027-20251102", "items": items}]
+        with tempfile.TemporaryDirectory() as shard_dir:
+            manifest = write_shards(categories, shard_dir, page_size=3)
+            chunks = manifest["categories"][0]["chunks"]
+            self.assertEqual([(c["week"], c["page"], c["count"]) for c in chunks],
+                             [("20251027-20251102", 0, 3), ("20251027-20251102", 1, 2), ("20251020-20251026", 0, 2)])
+            loaded = []
+            for chunk in chunks:
+                path = os.path.join(shard_dir, chunk["file"])
+                with open(path, "rb") as f:
+                    data = f.read()
+                with open(path + ".gz", "rb") as f:
+                    self.assertEqual(gzip.decompress(f.read()), data)
+                loaded += json.loads(data)["items"]
+            self.assertEqual(loaded, items)
+
+            categories[0]["items"] = items[:1]
+            manifest = write_shards(categories, shard_dir, page_size=3, compress=())
+            files = sorted(os.listdir(os.path.join(shard_dir, "csdc")))
+            self.assertEqual(files, [os.path.basename(manifest["categories"][0]["chunks"][0]["file"])])
+
+    def test_cleanup_only_touches_own_shards(self):
+        categories = [{"label": "cs.DC", "slug": "csdc", "week": "", "items": make_items(2, "2025-10-29")}]
+        with tempfile.TemporaryDirectory() as shard_dir:
+            # 与其他静态文件共用目录：没有 manifest 时不删除任何已有文件
+            other = os.path.join(shard_dir, "arxiv_daily.json")
+            lookalike = os.path.join(shard_dir, "csdc", "keep.0123456789ab.json")
+            os.makedirs(os.path.dirname(lookalike))
+            for path in (other, lookalike):
+                with open(path, "w") as f:
+                    f.write("{}")
+            first = write_shards(categories, shard_dir)["categories"][0]["chunks"][0]["file"]
+
+            categories[0]["items"] = make_items(1, "2025-10-29")
+            write_shards(categories, shard_dir)
+            self.assertFalse(os.path.exists(os.path.join(shard_dir, first)))
+            self.assertFalse(os.path.exists(os.path.join(shard_dir, first + ".gz")))
+            self.assertTrue(os.path.exists(other))
+            self.assertTrue(os.path.exists(lookalike))
+
+    def test_refuses_foreign_manifest(self):
+        with tempfile.TemporaryDirectory() as out_dir:
+            with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+                json.dump({"term_shards": {}}, f)
+            with self.assertRaises(ValueError):
+                write_shards([], out_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
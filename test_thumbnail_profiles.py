@@ -0,0 +1,66 @@
+import io
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+sys.path.append(os.getcwd())
+
+import thumbnail_profiles
+from thumbnail_profiles import (THUMBNAIL_PROFILES, encode_image, encode_variants, get_profile, thumbnail_key,
+                                variant_widths)
+
+Image = thumbnail_profiles.Image
+
+
+def png_bytes(width, height):
+    img = Image.new("RGB", (width, height), (200, 120, 40))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class TestThumbnailProfiles(unittest.TestCase):
+    def test_get_profile(self):
+        self.assertEqual(get_profile().name, "fast")
+        self.assertEqual(get_profile("archive").width, 1280)
+        with self.assertRaises(ValueError):
+            get_profile("huge")
+
+    @unittest.skipIf(thumbnail_profiles.features is None, "Pillow not installed")
+    def test_unsupported_format_rejected(self):
+        with patch.object(thumbnail_profiles.features, "check", side_effect=lambda name: name != "avif"):
+            self.assertNotIn("avif", thumbnail_profiles.available_profiles())
+            with self.assertRaises(ValueError):
+                get_profile("avif")
+            self.assertEqual(get_profile("fast").name, "fast")
+
+    def test_key_includes_width_and_profile(self):
+        self.assertEqual(thumbnail_key("ab12", THUMBNAIL_PROFILES["fast"]), "thumbnails/ab12_w640_fast.webp")
+        self.assertEqual(thumbnail_key("ab12", THUMBNAIL_PROFILES["archive"]), "thumbnails/ab12_w1280_archive.webp")
+        self.assertEqual(thumbnail_key("ab12", THUMBNAIL_PROFILES["fast"], 160), "thumbnails/ab12_w160_fast.webp")
+
+    def test_variant_widths(self):
+        self.assertEqual(variant_widths(get_profile("fast")), [160, 320, 640])
+        self.assertEqual(variant_widths(get_profile("archive")), [160, 320, 640, 1280])
+        self.assertEqual(variant_widths(get_profile("fast"), (320, 1000)), [320, 640])
+
+    @unittest.skipIf(Image is None, "Pillow not installed")
+    def test_encode_downscales_to_profile_width(self):
+        out = Image.open(io.BytesIO(encode_image(png_bytes(1600, 800), get_profile("fast"))))
+        self.assertEqual((out.format, out.size), ("WEBP", (640, 320)))
+        out = Image.open(io.BytesIO(encode_image(png_bytes(300, 200), get_profile("archive"))))
+        self.assertEqual(out.size, (300, 200))
+
+    @unittest.skipIf(Image is None, "Pillow not installed")
+    def test_encode_variants_never_upscale(self):
+        sizes = lambda variants: [(w, Image.open(io.BytesIO(data)).size) for w, data in variants]
+        self.assertEqual(sizes(encode_variants(png_bytes(640, 400), [160, 320, 640], get_profile("fast"))),
+                         [(160, (160, 100)), (320, (320, 200)), (640, (640, 400))])
+        # 原图只有 300px：320 按原尺寸编码，不再生成 640
+        self.assertEqual(sizes(encode_variants(png_bytes(300, 200), [160, 320, 640], get_profile("fast"))),
+                         [(160, (160, 106)), (320, (300, 200))])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.append(os.getcwd())
+
+from weekly_md import WeeklyFile, tokenize_week
+
+SAMPLE = """---
+slug: /daily/csdc/20251027-20251102
+---
+# 20251027-20251102 (cs.DC)
+
+## 2025-10-28
+
+- **[arXiv251028] Fast **KV** Cache**
+  - **tags:** [mlsys], [llm inference], [kv cache, paging]
+  - **authors:** Alice, Bob
+  - **institution:** MIT
+  - **link:** https://arxiv.org/pdf/2510.00001 trailing
+  - **code:** https://github.com/example/kv
+  - **Simple LLM Summary:** A <2x speedup.
+  - **Mindmap:**
+
+    ```mermaid
+    graph TB
+        A --> B
+    ```
+
+- **[arXiv251028] Second Paper**
+  - **authors:** Carol
+  - **link:** https://arxiv.org/pdf/2510.00002
+
+## 2025-10-29
+
+- **[arXiv251029] Unclosed Mindmap**
+  - **link:** https://arxiv.org/pdf/2510.00003
+  - **Mindmap:**
+
+    ```mermaid
+    graph TB
+- **[arXiv251029] After Unclosed**
+  - **institution:** CMU
+"""
+
+
+class TestTokenizeWeek(unittest.TestCase):
+    def test_records(self):
+        parsed = tokenize_week(SAMPLE)
+        self.assertEqual(parsed["week"], "20251027-20251102")
+        records = parsed["records"]
+        self.assertEqual([r["title"] for r in records],
+                         ["Fast", "Second Paper", "Unclosed Mindmap", "After Unclosed"])
+        first = records[0]
+        self.assertEqual(first["day"], "2025-10-28")
+        self.assertEqual(first["tags"], "[mlsys], [llm inference], [kv cache, paging]")
+        self.assertEqual(first["link"], "https://arxiv.org/pdf/2510.00001")
+        self.assertEqual(first["code"], "https://github.com/example/kv")
+        self.assertEqual(first["summary"], "A <2x speedup.")
+        self.assertEqual(first["mindmap"], "graph TB\n        A --> B")
+
+        second = records[1]
+        self.assertIsNone(second["thumbnail"])
+        self.assertIsNone(second["mindmap"])
+        self.assertEqual(second["authors"], "Carol")
+
+        self.assertEqual(records[2]["day"], "2025-10-29")
+        self.assertIsNone(records[2]["mindmap"])
+        self.assertEqual(records[3]["institution"], "CMU")
+
+    def test_empty_field_does_not_take_next_line(self):
+        # The old per-field regex `\*\*institution:\*\*\s*(.+)$` let \s* cross the newline and
+        # returned the next line as the value; an empty field is now None
+        content = ("## 2025-10-28\n\n"
+                   "- **[arXiv251028] Failed Analysis**\n"
+                   "  - **authors:** Alice\n"
+                   "  - **institution:**\n"
+                   "  - **link:** https://arxiv.org/pdf/2510.00009\n")
+        record = tokenize_week(content)["records"][0]
+        self.assertIsNone(record["institution"])
+        self.assertEqual(record["link"], "https://arxiv.org/pdf/2510.00009")
+
+
+WEEK_FILE = """---
+slug: /daily/csdc/20251027-20251102
+---
+# 20251027-20251102 (cs.DC)
+
+## 2025-10-28
+
+old 28
+
+## 2025-10-30
+
+old 30
+"""
+
+
+class TestWeeklyFile(unittest.TestCase):
+    def test_sections_and_splice(self):
+        wf = WeeklyFile("unused.md", WEEK_FILE.encode())
+        self.assertEqual(wf.dates(), ["2025-10-28", "2025-10-30"])
+
+        data, action = wf.upsert_section("2025-10-28", "## 2025-10-28\n\nnew 28\n\n")
+        self.assertEqual(action, "replaced")
+        self.assertEqual(data.decode(), WEEK_FILE.replace("old 28", "new 28"))
+
+        data, action = wf.upsert_section("2025-10-29", "## 2025-10-29\n\nnew 29\n\n")
+        self.assertEqual(action, "inserted")
+        self.assertIn("old 28\n\n## 2025-10-29\n\nnew 29\n\n## 2025-10-30", data.decode())
+
+        data, action = wf.upsert_section("2025-10-31", "## 2025-10-31\n\nnew 31\n\n")
+        self.assertEqual(action, "appended")
+        self.assertTrue(data.decode().endswith("old 30\n\n## 2025-10-31\n\nnew 31\n"))
+
+    def test_replace_section_without_trailing_blank_line(self):
+        # The old splice sliced "after" one byte early and leaked the last character of the replaced section
+        wf = WeeklyFile("unused.md", b"# w\n\n## 2025-01-02\n\nx\n## 2025-01-04\n\ny")
+        data, _ = wf.upsert_section("2025-01-04", "## 2025-01-04\n\nz\n\n")
+        self.assertEqual(data, b"# w\n\n## 2025-01-02\n\nx\n\n## 2025-01-04\n\nz\n")
+
+    def test_write_section_is_atomic_rename(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "20251027-20251102.md")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(WEEK_FILE)
+            wf = WeeklyFile(path)
+            self.assertEqual(wf.write_section("2025-10-30", "## 2025-10-30\n\nnew 30\n"), "replaced")
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(f.read(), WEEK_FILE.replace("old 30", "new 30"))
+            self.assertEqual(os.listdir(tmp), ["20251027-20251102.md"])
+            self.assertEqual(wf.dates(), ["2025-10-28", "2025-10-30"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+周报 Markdown（docs/daily/<category>/YYYYMMDD-YYYYMMDD.md）的单遍解析与按日期 section 更新
+- tokenize_week: 逐行扫描一次文件，产出论文记录，供 build_arxiv_daily_json 与 migrate_to_supabase 共用
+- WeeklyFile: 记录每个 "## YYYY-MM-DD" section 的字节偏移，替换/插入单个 section 后原子写回
+  只有 section 的定位与拼接按改动的 section 处理；读取和原子写回（临时文件 + rename）仍涉及整个文件，
+  每次更新的 I/O 成本是 O(文件大小)
+"""
+
+import os
+import re
+import threading
+
+# 周标题: "# 20251027-20251102 (cs.AI)"
+_WEEK_RE = re.compile(r'#\s*([0-9\-]+)')
+# 日期标题: "## 2025-10-28"
+_DAY_RE = re.compile(r'##\s*(\d{4}-\d{2}-\d{2})')
+# 论文标题行: "- **[arXiv251028] Title**"
+_TITLE_RE = re.compile(r'-\s+\*\*\[[^\]]+\]\s*(.*?)\*\*')
+# 字段行: "  - **authors:** ..."
+_FIELD_RE = re.compile(
+    r'\s+-\s+\*\*(tags|authors|institution|link|code|contributions|thumbnail|Simple LLM Summary|Mindmap):\*\*(.*)'
+)
+
+# 字段名 -> 记录键
+_FIELD_KEYS = {
+    'tags': 'tags',
+    'authors': 'authors',
+    'institution': 'institution',
+    'link': 'link',
+    'code': 'code',
+    'contributions': 'contributions',
+    'thumbnail': 'thumbnail',
+    'Simple LLM Summary': 'summary',
+}
+# 只取第一个非空白 token 的字段（URL）
+_TOKEN_FIELDS = frozenset(('link', 'code', 'thumbnail'))
+
+RECORD_KEYS = ('title', 'day', 'authors', 'link', 'thumbnail', 'code', 'institution',
+               'tags', 'contributions', 'summary', 'mindmap')
+
+
+def _new_record(title, day):
+    record = dict.fromkeys(RECORD_KEYS)
+    record['title'] = title
+    record['day'] = day
+    return record
+
+
+def tokenize_week(content):
+    """
+    单遍解析一个周报文件内容
+
+    Args:
+        content (str): 文件内容
+
+    Returns:
+        dict: {"week": 周标识, "records": [论文记录]}，记录中缺失字段为 None，
+              取值均已去除首尾空白
+    """
+    week = ""
+    records = []
+    day = None
+    record = None
+    # mermaid 状态: None / 'fence'（等待 ```mermaid）/ 'body'（收集代码行）
+    mermaid_state = None
+    mermaid_lines = []
+
+    for line in content.split('\n'):
+        if mermaid_state is not None:
+            stripped = line.strip()
+            if mermaid_state == 'body':
+                if stripped.startswith('```'):
+                    if mermaid_lines:
+                        record['mindmap'] = '\n'.join(mermaid_lines).strip()
+                    mermaid_state = None
+                    continue
+                if not ((line.startswith('##') and _DAY_RE.match(line))
+                        or (line.startswith('-') and _TITLE_RE.match(line))):
+                    mermaid_lines.append(line)
+                    continue
+            elif not stripped:
+                continue
+            elif stripped == '```mermaid':
+                mermaid_state = 'body'
+                mermaid_lines = []
+                continue
+            # 未闭合的 mermaid 块：放弃，按普通行继续处理
+            mermaid_state = None
+
+        first = line[:1]
+        if first == '#':
+            if line.startswith('##'):
+                m = _DAY_RE.match(line)
+                if m:
+                    day = m.group(1)
+                    record = None
+                    continue
+            if not week:
+                m = _WEEK_RE.match(line)
+                if m:
+                    week = m.group(1).strip()
+            continue
+        if day is None:
+            continue
+        if first == '-':
+            m = _TITLE_RE.match(line)
+            if m:
+                record = _new_record(m.group(1).strip(), day)
+                records.append(record)
+            continue
+        if record is None or not first.isspace():
+            continue
+        m = _FIELD_RE.match(line)
+        if not m:
+            continue
+        name, value = m.group(1), m.group(2)
+        if name == 'Mindmap':
+            if record['mindmap'] is None:
+                mermaid_state = 'fence'
+            continue
+        key = _FIELD_KEYS[name]
+        if record[key] is not None:
+            continue
+        if name in _TOKEN_FIELDS:
+            parts = value.split(None, 1)
+            if parts:
+                record[key] = parts[0]
+        else:
+            value = value.strip()
+            if value:
+                record[key] = value
+
+    return {"week": week, "records": records}
+
+
+def parse_week_file(file_path):
+    """读取并解析一个周报文件"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return tokenize_week(f.read())
+
+
+# section 起点: 文件开头或换行后的 "## YYYY-MM-DD"
+_SECTION_RE = re.compile(rb'(?:^|\n)##\s*(\d{4}-\d{2}-\d{2})')
+# section 终点: 下一个二级标题之前的换行
+_SECTION_END_RE = re.compile(rb'\n##\s')
+
+
+def write_file_atomic(path, data):
+    """写入同目录临时文件、fsync 后 rename，崩溃时不会留下写了一半的文件"""
+    # 临时文件名带进程/线程号，并发写不同文件时互不干扰；用 open 创建以保持默认权限
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class WeeklyFile:
+    """
+    周报文件的日期 section 索引
+    sections 为 [(日期, 起始字节, 结束字节)]：起点含前导换行，终点在下一个 "## " 标题前的换行处
+    """
+
+    def __init__(self, path, data=None):
+        self.path = path
+        if data is None:
+            data = b""
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    data = f.read()
+        self.data = data
+        self.sections = self._index(data)
+
+    @staticmethod
+    def _index(data):
+        sections = []
+        pos = 0
+        while True:
+            m = _SECTION_RE.search(data, pos)
+            if not m:
+                break
+            end_match = _SECTION_END_RE.search(data, m.end())
+            end = end_match.start() if end_match else len(data)
+            sections.append((m.group(1).decode('ascii'), m.start(), end))
+            pos = end
+        return sections
+
+    def dates(self):
+        return [dt for dt, _, _ in self.sections]
+
+    def _splice(self, start, end, body):
+        # 与旧实现的拼接规则保持一致：前文与新 section 之间空一行，后文紧接新 section
+        before = self.data[:start].rstrip(b'\n')
+        after = self.data[end:]
+        parts = [before, b"\n\n" if before else b"\n", body]
+        if after and not after.startswith(b'\n'):
+            parts.append(b"\n")
+        parts.append(after.lstrip(b'\n'))
+        return b"".join(parts).strip() + b"\n"
+
+    def upsert_section(self, date_str, section):
+        """
+        用新内容替换 date_str 的 section；不存在时按日期升序插入，或追加到末尾
+
+        Args:
+            date_str (str): 'YYYY-MM-DD'
+            section (str): 以 "## date_str" 开头的完整 section 文本
+
+        Returns:
+            tuple: (新文件内容 bytes, 'replaced' / 'inserted' / 'appended')
+        """
+        body = section.encode('utf-8')
+        for dt, start, end in self.sections:
+            if dt == date_str:
+                return self._splice(start, end, body), 'replaced'
+        for dt, start, end in self.sections:
+            if dt > date_str:
+                return self._splice(start, start, body), 'inserted'
+        return (self.data.rstrip() + b"\n\n" + body).strip() + b"\n", 'appended'
+
+    def apply_section(self, date_str, section):
+        """只在内存中更新 section（可连续多次），之后调用 save 一次写回"""
+        data, action = self.upsert_section(date_str, section)
+        self.data = data
+        self.sections = self._index(data)
+        return action
+
+    def save(self):
+        """整文件原子写回（rename 方式无法只写改动的字节范围）"""
+        write_file_atomic(self.path, self.data)
+
+    def write_section(self, date_str, section):
+        """更新 section 并原子写回，返回操作类型"""
+        action = self.apply_section(date_str, section)
+        self.save()
+        return action